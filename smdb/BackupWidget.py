@@ -13,10 +13,11 @@ import json
 
 from .MoviesTableModel import MoviesTableModel, Columns, defaultColumnWidths
 from .MovieTableView import MovieTableView
+from .MovieFilterProxyModel import MovieSortProxyModel
 from .utilities import bToGb, bToMb, bToKb, getFolderSize, getFolderSizes, handleRemoveReadonly, runFile, formatSizeDiff
 
 
-class BackupSortProxyModel(QtCore.QSortFilterProxyModel):
+class BackupSortProxyModel(MovieSortProxyModel):
     """Custom proxy model that provides special sorting for size difference column."""
     
     def lessThan(self, left, right):
@@ -362,8 +363,8 @@ class BackupWidget(QtWidgets.QFrame):
         if progressBar:
             progressBar.setMaximum(numItems)
         
-        # Initialize state
-        self.listTableModel.aboutToChangeLayout()
+        # Initialize state; the cells set below are reported in one batch
+        self.listTableModel.beginUpdate()
         self.bytesToBeCopied = 0
         self.sourceFolderSizes = {}
         self.destFolderSizes = {}
@@ -386,7 +387,7 @@ class BackupWidget(QtWidgets.QFrame):
                 self.parent.isCanceled = False
                 if progressBar:
                     progressBar.setValue(0)
-                self.listTableModel.changedLayout()
+                self.listTableModel.endUpdate()
                 return
 
             # Get source information
@@ -557,21 +558,16 @@ class BackupWidget(QtWidgets.QFrame):
             timing_data['ui_updates'] += time.time() - ui_start
 
         # Finalize
-        self.listTableModel.changedLayout()
+        self.listTableModel.endUpdate()
         
         # Remove entries with no differences
         if statusBar:
             statusBar.showMessage("Removing entries with no differences...")
-        self.listTableModel.aboutToChangeLayout()
         rowsToDelete = list()
         for row in range(self.listTableModel.rowCount()):
             if self.listTableModel.getBackupStatus(row) == "No Difference":
                 rowsToDelete.append(row)
-
-        for row in sorted(rowsToDelete, reverse=True):
-            self.listTableModel.removeMovie(row)
-
-        self.listTableModel.changedLayout()
+        self.listTableModel.removeMovieRows(rowsToDelete)
         
         # Sort by size difference ascending
         if statusBar:
@@ -759,7 +755,7 @@ class BackupWidget(QtWidgets.QFrame):
 
         if hasattr(self.parent, 'isCanceled'):
             self.parent.isCanceled = False
-        self.listTableModel.aboutToChangeLayout()
+        self.listTableModel.beginUpdate()
 
         progress = 0
         lastBytesPerSecond = 0
@@ -798,7 +794,7 @@ class BackupWidget(QtWidgets.QFrame):
                 self.parent.isCanceled = False
                 if progressBar:
                     progressBar.setValue(0)
-                self.listTableModel.changedLayout()
+                self.listTableModel.endUpdate()
                 return
 
 
@@ -910,7 +906,7 @@ class BackupWidget(QtWidgets.QFrame):
                 if progressBar:
                     progressBar.setValue(progress)
             
-        self.listTableModel.changedLayout()
+        self.listTableModel.endUpdate()
         if statusBar:
             statusBar.showMessage("Done")
         if progressBar:
@@ -921,15 +917,13 @@ class BackupWidget(QtWidgets.QFrame):
         if not hasattr(self.parent, 'moviesTableView'):
             return
             
-        self.listTableModel.layoutAboutToBeChanged.emit()
+        moviePaths = []
         for modelIndex in self.parent.moviesTableView.selectionModel().selectedRows():
             if not self.parent.moviesTableView.isRowHidden(modelIndex.row()):
                 sourceIndex = self.parent.moviesTableProxyModel.mapToSource(modelIndex)
                 sourceRow = sourceIndex.row()
-                moviePath = self.parent.moviesTableModel.getPath(sourceRow)
-                self.listTableModel.addMovie(self.moviesSmdbData, moviePath)
-
-        self.listTableModel.changedLayout()
+                moviePaths.append(self.parent.moviesTableModel.getPath(sourceRow))
+        self.listTableModel.addMovies(self.moviesSmdbData, moviePaths)
         self.analysed = False
 
     def listRemove(self):
@@ -938,29 +932,19 @@ class BackupWidget(QtWidgets.QFrame):
         if len(selectedRows) == 0:
             return
 
-        self.listTableModel.aboutToChangeLayout()
         rowsToDelete = list()
         for index in selectedRows:
             sourceIndex = self.listTableProxyModel.mapToSource(index)
             rowsToDelete.append(sourceIndex.row())
-
-        for row in sorted(rowsToDelete, reverse=True):
-            self.listTableModel.removeMovie(row)
-
-        self.listTableModel.changedLayout()
+        self.listTableModel.removeMovieRows(rowsToDelete)
 
     def listRemoveNoDifference(self):
         """Remove all items with 'No Difference' status."""
-        self.listTableModel.aboutToChangeLayout()
         rowsToDelete = list()
         for row in range(self.listTableModel.rowCount()):
             if self.listTableModel.getBackupStatus(row) == "No Difference":
                 rowsToDelete.append(row)
-
-        for row in sorted(rowsToDelete, reverse=True):
-            self.listTableModel.removeMovie(row)
-
-        self.listTableModel.changedLayout()
+        self.listTableModel.removeMovieRows(rowsToDelete)
 
     def listRemoveMissingInSource(self):
         """Remove destination folders that don't exist in source list."""
@@ -1003,13 +987,13 @@ class BackupWidget(QtWidgets.QFrame):
         if not hasattr(self.parent, 'moviesTableModel'):
             return
             
-        self.listTableModel.layoutAboutToBeChanged.emit()
+        moviePaths = []
         numItems = self.parent.moviesTableModel.rowCount()
         for row in range(numItems):
             path = self.parent.moviesTableModel.getPath(row)
             if moviesFolder == os.path.dirname(path):
-                self.listTableModel.addMovie(self.moviesSmdbData, path)
-        self.listTableModel.changedLayout()
+                moviePaths.append(path)
+        self.listTableModel.addMovies(self.moviesSmdbData, moviePaths)
         self.analysed = False
 
     def openSourceFolder(self):
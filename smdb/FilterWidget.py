@@ -1,6 +1,7 @@
 from PyQt5 import QtGui, QtWidgets, QtCore
 
 from .utilities import *
+from .smdb_records import indexEntryKeys
 
 class FilterTable(QtWidgets.QTableWidget):
     def __init__(self):
@@ -76,6 +77,10 @@ class FilterWidget(QtWidgets.QFrame):
         self.moviesSmdbData = None
         self.movieList = list()
         self.useMovieList = useMovieList
+        # With the SQLite library the counts are queried from it, limited to
+        # the (section, keys) selection of the primary filter
+        self.library = None
+        self.facetFilter = None
 
         self.filterByDict = {
             'Director': 'directors',
@@ -215,28 +220,24 @@ class FilterWidget(QtWidgets.QFrame):
         else:
             self.filterTable.setContextMenuPolicy(QtCore.Qt.NoContextMenu)
 
-        if filterByKey not in self.moviesSmdbData:
+        if self.library is not None:
+            counts = self.library.facetCounts(filterByKey,
+                                              self.facetFilter if self.useMovieList else None)
+        elif filterByKey not in self.moviesSmdbData:
             output("Error: '%s' not in smdbData" % filterByKey)
             return
+        else:
+            counts = self.indexCounts(filterByKey)
 
         self.filterTable.clear()
         self.filterTable.setHorizontalHeaderLabels(['Name', 'Count'])
 
         row = 0
         numActualRows = 0
-        numRows = len(self.moviesSmdbData[filterByKey].keys())
+        numRows = len(counts)
         self.filterTable.setRowCount(numRows)
         self.filterTable.setSortingEnabled(False)
-        for name in self.moviesSmdbData[filterByKey].keys():
-            if self.useMovieList:
-                movies = self.moviesSmdbData[filterByKey][name]['movies']
-                count = 0
-                for movie in self.movieList:
-                    if movie in movies:
-                        count = count + 1
-            else:
-                count = self.moviesSmdbData[filterByKey][name]['num movies']
-
+        for name, count in counts:
             if self.filterMinCountCheckbox.isChecked() and count < self.filterMinCountSpinBox.value():
                 continue
 
@@ -251,3 +252,12 @@ class FilterWidget(QtWidgets.QFrame):
         if not self.useMovieList:
             self.filterTable.sortItems(1, QtCore.Qt.DescendingOrder)
         self.filterTable.setSortingEnabled(True)
+
+    def indexCounts(self, filterByKey):
+        """[(name, number of movies)] from an in-memory index section."""
+        index = self.moviesSmdbData[filterByKey]
+        if not self.useMovieList:
+            return [(name, index[name]['num movies']) for name in index.keys()]
+        movieKeys = set(self.movieList)
+        return [(name, len(movieKeys.intersection(indexEntryKeys(index[name]))))
+                for name in index.keys()]
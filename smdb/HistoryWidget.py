@@ -158,7 +158,6 @@ class HistoryWidget(QtWidgets.QFrame):
     
     def listAdd(self, table, proxy):
         """Add selected movie to history list."""
-        self.listTableModel.aboutToChangeLayout()
         modelIndex = table.selectionModel().selectedRows()[0]
         if not table.isRowHidden(modelIndex.row()):
             sourceIndex = proxy.mapToSource(modelIndex)
@@ -173,7 +172,6 @@ class HistoryWidget(QtWidgets.QFrame):
         
         self.listTableModel.renumberRanks()
         
-        self.listTableModel.changedLayout()
         self.parent.writeSmdbFile(self.listSmdbFile,
                                  self.listTableModel,
                                  titlesOnly=True)
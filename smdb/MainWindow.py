@@ -27,7 +27,6 @@ from pathlib import Path
 import json
 import ujson
 import fnmatch
-import pathlib
 import datetime
 import collections
 import shutil
@@ -37,6 +36,7 @@ import requests
 import stat
 import time
 import sys
+import threading
 from pymediainfo import MediaInfo
 import re
 from pprint import pprint
@@ -47,7 +47,7 @@ import io
 
 from .utilities import *
 from . import __version__
-from .MoviesTableModel import MoviesTableModel, Columns, defaultColumnWidths
+from .MoviesTableModel import MoviesTableModel, Columns, defaultColumnWidths, probeMovieFolders
 from .MovieCover import MovieCover
 from .FilterWidget import FilterWidget
 from .MovieInfoListView import MovieInfoListView
@@ -57,9 +57,29 @@ from .HistoryWidget import HistoryWidget
 from .WatchListWidget import WatchListWidget
 from .SimilarMoviesWidget import SimilarMoviesWidget
 from .MovieData import MovieData
-from .MovieFilterProxyModel import MovieFilterProxyModel
+from .MovieFilterProxyModel import MovieFilterProxyModel, MovieSortProxyModel
 from .LightingControlsWidget import LightingControlsWidget
 from .StatisticsWidget import StatisticsWidget
+from .smdb_records import (INDEX_SECTIONS, recordIndexKeys, addRecordToIndexes,
+                           removeRecordFromIndexes, recordsByTitleYear, indexChanges,
+                           normalizeIndex, readManifest, writeManifest, buildTitleRecord,
+                           parseTitleRecords, encodeMovieIds, decodeMovieIds, indexEntryKeys,
+                           moviesForKeys)
+from .columnar_titles import columnarPath, writeColumnarTitles, openColumnarTitles
+from .smdb_journal import (setFieldsRecord, indexRecord, titleRecord, replayJournal,
+                           journalTitleEdits, journalHasTitleRecords, readJournal)
+from .smdb_sqlite import sqlitePath, writeSqliteLibrary, openSqliteLibrary, ftsQuery
+from .smdb_shards import (rootOf, rootAvailable, availableRoots, readShards, readShardManifests,
+                          writeShard, patchShards, shardsNewerThan)
+from .string_pool import poolSize, residentMemoryMb
+from .thumbnail_cache import sharedThumbnailCache, thumbnailCacheFolder
+from .thumbnail_atlas import ThumbnailAtlas
+from .library_watcher import LibraryWatcher
+from .movie_locations import MovieLocationIndex
+from .media_probe import MediaProbeCache, mediaCachePath, probeMovieMedia, formatFolderSize
+from .plot_index import plotIndexPath, writePlotIndex, openPlotIndex, parsePlotQuery, plotText, PlotIndex
+from .plot_scan import PlotScan, MAX_INDEX_CANDIDATES
+from .facet_bitmaps import FacetBitmaps
 
 
 def _default_collections_folder():
@@ -90,6 +110,9 @@ class OperationCanceledError(Exception):
 
 
 class MainWindow(QtWidgets.QMainWindow):
+    # Log panel text from output() calls on worker threads
+    logMessage = QtCore.pyqtSignal(str)
+
     def coverFlowWheelNavigate(self, direction):
         # direction: +1 for next, -1 for previous
         view = self.moviesTableView
@@ -191,6 +214,10 @@ class MainWindow(QtWidgets.QMainWindow):
                 delattr(self, '_pending_source_model')
             if hasattr(self, '_pending_proxy_model'):
                 delattr(self, '_pending_proxy_model')
+        if (getattr(self, '_statisticsStale', False) and
+                self.moviesTabWidget.widget(index) is self.statisticsWidget):
+            self._statisticsStale = False
+            self.statisticsWidget.refresh()
 
     def __init__(self):
         super(MainWindow, self).__init__()
@@ -291,6 +318,46 @@ class MainWindow(QtWidgets.QMainWindow):
         self.showStatistics = self.settings.value('showStatistics', False, type=bool)
         self.showLog = self.settings.value('showLog', True, type=bool)
         self.showLightingControls = self.settings.value('showLightingControls', False, type=bool)
+        # The JSON copy of the SMDB is written in the background at most
+        # once every smdbJsonExportMinutes
+        self.exportSmdbJson = self.settings.value('exportSmdbJson', True, type=bool)
+        self.smdbJsonExportMinutes = self.settings.value('smdbJsonExportMinutes', 10, type=int)
+        # Deduplicate repeated strings when decoding the SMDB; can be turned
+        # off to compare the memory report
+        self.internSmdbStrings = self.settings.value('internSmdbStrings', True, type=bool)
+        set_intern_smdb_strings(self.internSmdbStrings)
+        # Without the columnar titles store, fill the movie list while the
+        # titles are still being decoded
+        self.streamSmdbTitles = self.settings.value('streamSmdbTitles', True, type=bool)
+        # Keep the library in SQLite as well and query it for titles,
+        # filters and plot search
+        self.useSqliteLibrary = self.settings.value('useSqliteLibrary', False, type=bool)
+        self.moviesLibrary = None
+        # Keep cover thumbnails in one packed file instead of a file each
+        self.usePackedThumbnails = self.settings.value('usePackedThumbnails', False, type=bool)
+        # Update the movie list as movie folders are added, removed or changed
+        self.watchMoviesFolders = self.settings.value('watchMoviesFolders', False, type=bool)
+        self.libraryWatcher = None
+        self._applyingLibraryChanges = False
+        # Where movie folders are, for findMovie
+        self.movieLocations = MovieLocationIndex()
+        # Media info of movie files, loaded on first use
+        self._mediaProbeCache = None
+        # Inverted index of plots for the plot search, and the titles it
+        # was opened for
+        self._plotIndex = None
+        self._plotIndexTitles = None
+        # Running regex scan of the plots, and its matches waiting to be
+        # added to the table filter
+        self._plotScan = None
+        self._plotScanMatches = []
+        self._plotScanStart = 0
+        self._plotScanTimer = QtCore.QTimer(self)
+        self._plotScanTimer.setSingleShot(True)
+        self._plotScanTimer.setInterval(200)
+        self._plotScanTimer.timeout.connect(self.addPlotScanMatches)
+        # Row sets of the filter values, for the current data and model
+        self._facetBitmaps = None
 
         # Default state of cancel button
         self.isCanceled = False
@@ -626,6 +693,7 @@ class MainWindow(QtWidgets.QMainWindow):
         
         # Set the global output function so all modules can use it
         set_output_function(self.output)
+        self.logMessage.connect(self.appendLogMessage, QtCore.Qt.QueuedConnection)
         
         self.mainContentLogSplitter.addWidget(self.logWidget)
         if not self.showLog:
@@ -636,6 +704,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.mainContentLogSplitter.setSizes(contentLogSizes)
 
         self.output(f"Welcome to SMDB v{__version__}")
+        if self.usePackedThumbnails:
+            self.usePackedThumbnailsMenu(True)
         
         # Bottom
         # Create bottom layout without parenting to QMainWindow
@@ -727,6 +797,18 @@ class MainWindow(QtWidgets.QMainWindow):
             message = full_message
             if end == '\n':
                 message += '\n'
+            if threading.current_thread() is not threading.main_thread():
+                # Widgets may only be touched from the GUI thread
+                self.logMessage.emit(message)
+                return
+            self.appendLogMessage(message)
+            # Process events so log updates in real-time during loops
+            QtCore.QCoreApplication.processEvents()
+
+    def appendLogMessage(self, message):
+        """Append text to the log panel, keeping it scrolled to the bottom
+        if it was."""
+        if self.logTextWidget is not None:
             scrollbar = self.logTextWidget.verticalScrollBar()
             prev_value = scrollbar.value()
             at_bottom = prev_value >= scrollbar.maximum()
@@ -737,8 +819,6 @@ class MainWindow(QtWidgets.QMainWindow):
                 scrollbar.setValue(scrollbar.maximum())
             else:
                 scrollbar.setValue(min(prev_value, scrollbar.maximum()))
-            # Process events so log updates in real-time during loops
-            QtCore.QCoreApplication.processEvents()
 
     def wheelEvent(self, event):
         dy = event.angleDelta().y()
@@ -845,6 +925,13 @@ class MainWindow(QtWidgets.QMainWindow):
         self.settings.setValue('showStatistics', self.showStatistics)
         self.settings.setValue('showLog', self.showLog)
         self.settings.setValue('showLightingControls', self.showLightingControls)
+        self.settings.setValue('exportSmdbJson', self.exportSmdbJson)
+        self.settings.setValue('smdbJsonExportMinutes', self.smdbJsonExportMinutes)
+        self.settings.setValue('internSmdbStrings', self.internSmdbStrings)
+        self.settings.setValue('streamSmdbTitles', self.streamSmdbTitles)
+        self.settings.setValue('useSqliteLibrary', self.useSqliteLibrary)
+        self.settings.setValue('usePackedThumbnails', self.usePackedThumbnails)
+        self.settings.setValue('watchMoviesFolders', self.watchMoviesFolders)
         self.settings.setValue('fontSize', self.fontSize)
         
         # Save API keys if they have been set
@@ -871,6 +958,9 @@ class MainWindow(QtWidgets.QMainWindow):
         if hasattr(self, 'coverFlowWidget'):
             self.coverFlowWidget.saveCameraSettings(self.settings)
 
+        # Don't lose a JSON export still waiting on its rate limit
+        flushSmdbJsonExports()
+
     def saveTableColumns(self, saveName, tableView, columnsVisible):
         visibleColumns = list()
         for i, c in enumerate(columnsVisible):
@@ -922,13 +1012,45 @@ class MainWindow(QtWidgets.QMainWindow):
         fileMenu.addAction(rescanNewAction)
 
         rebuildSmdbFileAction = QtWidgets.QAction("Rebuild SMDB file", self)
-        rebuildSmdbFileAction.triggered.connect(self.rebuildSmdbFileAndReload)
+        rebuildSmdbFileAction.triggered.connect(lambda: self.rebuildSmdbFileAndReload())
+
+        fullRebuildSmdbFileAction = QtWidgets.QAction("Rebuild SMDB file (full)", self)
+        fullRebuildSmdbFileAction.triggered.connect(lambda: self.rebuildSmdbFileAndReload(full=True))
 
         setCollectionsFolderAction = QtWidgets.QAction("Set collections folder", self)
         setCollectionsFolderAction.triggered.connect(self.setCollectionsFolder)
         fileMenu.addAction(setCollectionsFolderAction)
 
         fileMenu.addAction(rebuildSmdbFileAction)
+        fileMenu.addAction(fullRebuildSmdbFileAction)
+
+        rebuildSmdbRootAction = QtWidgets.QAction("Rebuild SMDB file for one movies folder...", self)
+        rebuildSmdbRootAction.triggered.connect(self.rebuildSmdbRootMenu)
+        fileMenu.addAction(rebuildSmdbRootAction)
+
+        exportSmdbJsonAction = QtWidgets.QAction("Export SMDB JSON copy", self)
+        exportSmdbJsonAction.setCheckable(True)
+        exportSmdbJsonAction.setChecked(self.exportSmdbJson)
+        exportSmdbJsonAction.triggered.connect(self.exportSmdbJsonMenu)
+        fileMenu.addAction(exportSmdbJsonAction)
+
+        useSqliteLibraryAction = QtWidgets.QAction("Use SQLite library", self)
+        useSqliteLibraryAction.setCheckable(True)
+        useSqliteLibraryAction.setChecked(self.useSqliteLibrary)
+        useSqliteLibraryAction.triggered.connect(self.useSqliteLibraryMenu)
+        fileMenu.addAction(useSqliteLibraryAction)
+
+        usePackedThumbnailsAction = QtWidgets.QAction("Use packed thumbnail cache", self)
+        usePackedThumbnailsAction.setCheckable(True)
+        usePackedThumbnailsAction.setChecked(self.usePackedThumbnails)
+        usePackedThumbnailsAction.triggered.connect(self.usePackedThumbnailsMenu)
+        fileMenu.addAction(usePackedThumbnailsAction)
+
+        watchMoviesFoldersAction = QtWidgets.QAction("Watch movies folders for changes", self)
+        watchMoviesFoldersAction.setCheckable(True)
+        watchMoviesFoldersAction.setChecked(self.watchMoviesFolders)
+        watchMoviesFoldersAction.triggered.connect(self.watchMoviesFoldersMenu)
+        fileMenu.addAction(watchMoviesFoldersAction)
 
         conformMoviesAction = QtWidgets.QAction("Conform movies in folder", self)
         conformMoviesAction.triggered.connect(self.conformMovies)
@@ -1353,20 +1475,84 @@ class MainWindow(QtWidgets.QMainWindow):
 
         smdbData = dict()
         read_time = None
+        streamTitles = False
+        library = None
+        if smdbFile == self.moviesSmdbFile:
+            # Stop streaming titles into a model this refresh replaces
+            self._titleStreamModel = None
+            self.moviesLibrary = None
+        # Bring the merged file up to date if a rebuild stopped after writing
+        # the per-root shards
+        if smdbFile == self.moviesSmdbFile and shardsNewerThan(smdbFile, self.moviesRoots()):
+            try:
+                self.mergeSmdbShards(smdbFile)
+            except Exception as e:
+                self.output(f"Warning: failed to merge SMDB shards: {e}")
         # Support binary MessagePack file beside JSON for faster IO
         mpk_path = os.path.splitext(smdbFile)[0] + ".mpk"
         if os.path.exists(smdbFile) or os.path.exists(mpk_path):
+            rss_before = residentMemoryMb()
             t0 = time.perf_counter()
-            smdbData = readSmdbFile(smdbFile)
+            # The main list reads titles lazily from the memory-mapped
+            # columnar store when it is up to date with the .mpk
+            columnarTitles = None
+            if smdbFile == self.moviesSmdbFile and isSmdbMpkCurrent(smdbFile):
+                # The SQLite library takes the place of both when enabled
+                if self.useSqliteLibrary:
+                    library = openSqliteLibrary(smdbFile)
+                if library is None:
+                    columnarTitles = openColumnarTitles(smdbFile)
+                    # Otherwise the titles can be streamed into the table
+                    # after it is shown, unless they are needed to build the
+                    # library.  Titles journaled by the library watcher are
+                    # only in the streamed .mpk once the journal is compacted
+                    streamTitles = (columnarTitles is None and self.streamSmdbTitles and
+                                    not self.useSqliteLibrary and
+                                    not forceScan and modifiedSince is None and
+                                    not journalHasTitleRecords(smdbFile))
+            # Index sections are decoded on first use by the filter and
+            # movie info panels
+            if library is not None:
+                smdbData = readSmdbFile(smdbFile, skipSections=('titles',), lazySections=True)
+                if smdbData is not None:
+                    # Catch up on edits journaled while the library was closed
+                    library.applyJournalRecords(readJournal(smdbFile))
+                    smdbData['titles'] = library.titles
+                    # Titles the library does not hold yet
+                    replayJournal(smdbData, smdbFile, sections=('titles',))
+                else:
+                    library = None
+            elif columnarTitles is not None:
+                smdbData = readSmdbFile(smdbFile, skipSections=('titles',), lazySections=True)
+                if smdbData is not None:
+                    smdbData['titles'] = columnarTitles
+                    # readSmdbFile could not apply journaled title edits
+                    replayJournal(smdbData, smdbFile, sections=('titles',))
+            elif streamTitles:
+                smdbData = readSmdbFile(smdbFile, skipSections=('titles',), lazySections=True)
+                # Titles are only skipped when the .mpk was read
+                if smdbData is not None and 'titles' not in smdbData:
+                    smdbData['titles'] = {}
+                else:
+                    streamTitles = False
+            else:
+                smdbData = readSmdbFile(smdbFile, lazySections=True)
             read_time = time.perf_counter() - t0
             # Ensure new fields exist for backward compatibility with older SMDB files
             if smdbData:
-                smdbData.setdefault('writers', {})
-                smdbData.setdefault('producers', {})
-                smdbData.setdefault('composers', {})
+                for section in ('writers', 'producers', 'composers'):
+                    if section not in smdbData:
+                        smdbData[section] = {}
+
+            # Build the SQLite library when it is enabled but missing or stale
+            if (smdbFile == self.moviesSmdbFile and self.useSqliteLibrary and
+                    library is None and smdbData and 'titles' in smdbData):
+                library = self.updateSqliteLibrary(smdbFile, smdbData)
+            if smdbFile == self.moviesSmdbFile:
+                self.moviesLibrary = library
             
             # Load embeddings from separate binary file if this is the main movies SMDB
-            if smdbFile == self.moviesSmdbFile and smdbData:
+            if smdbFile == self.moviesSmdbFile and smdbData and not streamTitles:
                 # Temporarily set moviesSmdbData so loadEmbeddingsFromBinaryFile can access it
                 old_smdb_data = getattr(self, 'moviesSmdbData', None)
                 self.moviesSmdbData = smdbData
@@ -1384,16 +1570,29 @@ class MainWindow(QtWidgets.QMainWindow):
                             fmt = get_last_smdb_read_format()
                         except Exception:
                             fmt = None
+                        if columnarTitles is not None:
+                            fmt = f"{fmt}, columnar titles" if fmt else "columnar titles"
+                        elif library is not None:
+                            fmt = f"{fmt}, SQLite library" if fmt else "SQLite library"
                         fmt_text = f" ({fmt})" if fmt else ""
                         self.output(f"Read SMDB{fmt_text} in {read_time:.3f}s")
+                        rss_after = residentMemoryMb()
+                        if rss_before is not None and rss_after is not None:
+                            pooling = f"{poolSize():,} pooled strings" if self.internSmdbStrings \
+                                else "string pooling off"
+                            self.output(f"SMDB memory: RSS {rss_before:.1f} MB before read, "
+                                        f"{rss_after:.1f} MB after (+{rss_after - rss_before:.1f} MB, "
+                                        f"{pooling})")
                     self._readMoviesSmdbLogged = True
             except Exception:
                 pass
         else:
             forceScan = False
 
-        moviesFolders = [self.moviesFolder]
-        moviesFolders += self.additionalMoviesFolders
+        moviesFolders = self.moviesRoots()
+        if forceScan or modifiedSince is not None:
+            # Scanning an unavailable drive could stall for a long time
+            moviesFolders = availableRoots(moviesFolders)
         start_time = time.monotonic()
 
         def format_eta(seconds):
@@ -1458,7 +1657,7 @@ class MainWindow(QtWidgets.QMainWindow):
             if tableView == self.moviesTableView:
                 proxyModel = MovieFilterProxyModel()
             else:
-                proxyModel = QtCore.QSortFilterProxyModel()
+                proxyModel = MovieSortProxyModel()
         proxyModel.setSourceModel(model)
         tableView.setModel(proxyModel)
 
@@ -1531,10 +1730,96 @@ class MainWindow(QtWidgets.QMainWindow):
             tableView.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerItem)
             tableView.verticalScrollBar().setSingleStep(5)
 
+        if streamTitles:
+            self.streamTitlesIntoModel(smdbFile, smdbData, model, proxyModel)
+
         refresh_table_remaining_time = time.perf_counter() - t0
         return smdbData, model, proxyModel, columnsVisible, smdbData
 
+    def streamTitlesIntoModel(self, smdbFile, smdbData, model, proxyModel):
+        """Fill the main movies model from the .mpk titles in batches.
+
+        The first batch is loaded before returning so the first screen of
+        movies is available right away; the rest is loaded between events.
+        """
+        titles = smdbData['titles']
+        edits = journalTitleEdits(smdbFile)
+        stream = iterSmdbTitles(smdbFile)
+        self._titleStreamModel = model
+        t0 = time.perf_counter()
+
+        def loadBatch(seconds):
+            """Load rows for about `seconds`; returns True once the stream is done."""
+            deadline = time.perf_counter() + seconds
+            rows = []
+            finished = True
+            for moviePath, record in stream:
+                if moviePath in edits:
+                    record.update(edits[moviePath])
+                titles[moviePath] = record
+                rows.append(model.createMovieData(record, moviePath, record.get('folder')))
+                if len(rows) % 64 == 0 and time.perf_counter() > deadline:
+                    finished = False
+                    break
+            model.appendMovieRows(rows)
+            return finished
+
+        def finish():
+            self._titleStreamModel = None
+            # Rows were appended unsorted
+            if proxyModel.sortColumn() >= 0:
+                proxyModel.sort(proxyModel.sortColumn(), proxyModel.sortOrder())
+            if self.moviesSmdbData is smdbData:
+                self.loadEmbeddingsFromBinaryFile()
+            if self.moviesTableModel is model:
+                self.numVisibleMovies = proxyModel.rowCount()
+                self.showMoviesTableSelectionStatus()
+                if self.moviesTabWidget.currentWidget() is self.statisticsWidget:
+                    self.statisticsWidget.refresh()
+                else:
+                    self._statisticsStale = True
+            self.output(f"Streamed {len(titles)} titles in {time.perf_counter() - t0:.3f}s")
+
+        def finishNow():
+            try:
+                loadBatch(float('inf'))
+            except Exception as e:
+                self.output(f"Error reading SMDB titles: {e}")
+            finish()
+
+        self._finishTitleStream = finishNow
+
+        def step():
+            # A newer refresh replaced this model, or it was finished early
+            if self._titleStreamModel is not model:
+                stream.close()
+                return
+            try:
+                finished = loadBatch(0.03)
+            except Exception as e:
+                self.output(f"Error reading SMDB titles: {e}")
+                finished = True
+            if finished:
+                finish()
+            else:
+                QtCore.QTimer.singleShot(0, step)
+
+        if loadBatch(0.1):
+            finish()
+        else:
+            if proxyModel.sortColumn() >= 0:
+                proxyModel.sort(proxyModel.sortColumn(), proxyModel.sortOrder())
+            QtCore.QTimer.singleShot(0, step)
+
+    def finishTitleStream(self):
+        """Load the rest of the titles being streamed into the movies model
+        right away."""
+        if getattr(self, '_titleStreamModel', None) is not None:
+            self._finishTitleStream()
+
     def refreshMoviesList(self, forceScan=False, writeToLog=False, modifiedSince=None):
+        # Movie folders may have moved since the roots were last listed
+        self.movieLocations.invalidate()
         if forceScan or (modifiedSince is not None):
             self.isCanceled = False
             self.progressBar.setValue(0)
@@ -1556,6 +1841,8 @@ class MainWindow(QtWidgets.QMainWindow):
                                                       neverScan=True,
                                                       modifiedSince=modifiedSince,
                                                       writeToLog=writeToLog)
+            self.primaryFilterWidget.library = self.moviesLibrary
+            self.secondaryFilterWidget.library = self.moviesLibrary
         except OperationCanceledError:
             self.statusBar().showMessage("Cancelled")
             self.output("Cancelled")
@@ -1579,10 +1866,16 @@ class MainWindow(QtWidgets.QMainWindow):
         self.numVisibleMovies = self.moviesTableProxyModel.rowCount()
         self.showMoviesTableSelectionStatus()
         self.pickRandomMovie()
+        self.updateLibraryWatcher()
         
-        # Auto-refresh statistics when movies list is loaded
+        # Auto-refresh statistics when movies list is loaded.  Statistics
+        # decode every title record, so wait until the tab is shown.
         if hasattr(self, 'statisticsWidget') and self.statisticsWidget:
-            self.statisticsWidget.refresh()
+            if self.moviesTabWidget.currentWidget() is self.statisticsWidget:
+                self.statisticsWidget.refresh()
+                self._statisticsStale = False
+            else:
+                self._statisticsStale = True
 
     def refreshWatchList(self):
         """Delegate to WatchListWidget."""
@@ -1865,16 +2158,12 @@ class MainWindow(QtWidgets.QMainWindow):
         progress = 0
         self.isCanceled = False
 
-        self.moviesTableModel.aboutToChangeLayout()
-        titleYearSet = set()
-        duplicates = set()
         for row in range(numItems):
             QtCore.QCoreApplication.processEvents()
             if self.isCanceled:
                 self.statusBar().showMessage('Cancelled')
                 self.isCanceled = False
                 self.progressBar.setValue(0)
-                self.movieTableModel.changedLayout()
                 return
 
             progress += 1
@@ -1884,14 +2173,16 @@ class MainWindow(QtWidgets.QMainWindow):
             movieFolderName = self.moviesTableModel.getFolderName(modelIndex.row())
             moviePath = self.moviesTableModel.getPath(modelIndex.row())
             moviePath = self.findMovie(moviePath, movieFolderName)
-            if not moviePath or not os.path.exists(moviePath):
+            if not moviePath:
+                continue
+            try:
+                with os.scandir(moviePath) as files:
+                    for f in files:
+                        if f.is_dir() and fnmatch.fnmatch(f, '*(*)'):
+                            self.output(f"Movie: {moviePath} contains other movie: {f.name}")
+            except OSError:
                 continue
-            with os.scandir(moviePath) as files:
-                for f in files:
-                    if f.is_dir() and fnmatch.fnmatch(f, '*(*)'):
-                        self.output(f"Movie: {moviePath} contains other movie: {f.name}")
 
-        self.moviesTableModel.changedLayout()
         self.progressBar.setValue(0)
 
     def markAsKnownDuplicate(self):
@@ -1920,6 +2211,9 @@ class MainWindow(QtWidgets.QMainWindow):
                     
                     with open(jsonFile, 'w', encoding='utf-8') as f:
                         ujson.dump(jsonData, f, indent=4)
+
+                    self.journalSmdbEdits(self.moviesSmdbFile, self.moviesSmdbData,
+                                          [setFieldsRecord(moviePath, {'known duplicate': True})])
                     
                     self.output(f"Marked as known duplicate: {folderName}")
                 except Exception as e:
@@ -1954,6 +2248,9 @@ class MainWindow(QtWidgets.QMainWindow):
                     
                     with open(jsonFile, 'w', encoding='utf-8') as f:
                         ujson.dump(jsonData, f, indent=4)
+
+                    self.journalSmdbEdits(self.moviesSmdbFile, self.moviesSmdbData,
+                                          [setFieldsRecord(moviePath, {'known duplicate': False})])
                     
                     self.output(f"Unmarked as known duplicate: {folderName}")
                 except Exception as e:
@@ -1970,7 +2267,8 @@ class MainWindow(QtWidgets.QMainWindow):
         progress = 0
         self.isCanceled = False
 
-        self.moviesTableModel.aboutToChangeLayout()
+        # The Duplicate column is reported in one batch at the end
+        self.moviesTableModel.beginUpdate()
         titleYearSet = set()
         duplicates = set()
         # Track all instances of each title/year with their row, path, and size
@@ -1983,7 +2281,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 self.statusBar().showMessage('Cancelled')
                 self.isCanceled = False
                 self.progressBar.setValue(0)
-                self.moviesTableModel.changedLayout()
+                self.moviesTableModel.endUpdate()
                 return
 
             progress += 1
@@ -2008,15 +2306,14 @@ class MainWindow(QtWidgets.QMainWindow):
             
             # Check if this is a known duplicate
             isKnownDuplicate = False
-            if moviePath and os.path.exists(moviePath):
+            if moviePath:
                 jsonFile = os.path.join(moviePath, f"{folderName}.json")
-                if os.path.exists(jsonFile):
-                    try:
-                        with open(jsonFile, 'r', encoding='utf-8') as f:
-                            jsonData = ujson.load(f)
-                            isKnownDuplicate = jsonData.get('known duplicate', False)
-                    except Exception:
-                        pass
+                try:
+                    with open(jsonFile, 'r', encoding='utf-8') as f:
+                        jsonData = ujson.load(f)
+                        isKnownDuplicate = jsonData.get('known duplicate', False)
+                except Exception:
+                    pass
             
             # Convert year to int for consistent comparison
             try:
@@ -2055,15 +2352,14 @@ class MainWindow(QtWidgets.QMainWindow):
             # Find the actual movie path and check known duplicate status
             moviePath = self.findMovie(moviePath, folderName)
             isKnownDuplicate = False
-            if moviePath and os.path.exists(moviePath):
+            if moviePath:
                 jsonFile = os.path.join(moviePath, f"{folderName}.json")
-                if os.path.exists(jsonFile):
-                    try:
-                        with open(jsonFile, 'r', encoding='utf-8') as f:
-                            jsonData = ujson.load(f)
-                            isKnownDuplicate = jsonData.get('known duplicate', False)
-                    except Exception:
-                        pass
+                try:
+                    with open(jsonFile, 'r', encoding='utf-8') as f:
+                        jsonData = ujson.load(f)
+                        isKnownDuplicate = jsonData.get('known duplicate', False)
+                except Exception:
+                    pass
             
             # Convert year to int for consistent comparison
             try:
@@ -2075,7 +2371,7 @@ class MainWindow(QtWidgets.QMainWindow):
             if titleYear in duplicates and not isKnownDuplicate:
                 self.moviesTableModel.setDuplicate(modelIndex, 'Yes')
 
-        self.moviesTableModel.changedLayout()
+        self.moviesTableModel.endUpdate()
         
         # Filter to show only duplicates using the proxy model
         self.statusBar().showMessage('Filtering duplicates...')
@@ -2309,11 +2605,7 @@ class MainWindow(QtWidgets.QMainWindow):
                         self.output(f'Error deleting {folder}: {str(e)}')
                 
                 # Remove rows from model (delete from highest to lowest to avoid index shifting)
-                self.moviesTableModel.aboutToChangeLayout()
-                rowsToDelete.sort(reverse=True)
-                for row in rowsToDelete:
-                    self.moviesTableModel.removeMovie(row)
-                self.moviesTableModel.changedLayout()
+                self.moviesTableModel.removeMovieRows(rowsToDelete)
                 
                 self.output(f"Deleted {len(foldersToDelete)} exact duplicate folder(s) and removed their rows from the list")
                 QtWidgets.QMessageBox.information(
@@ -2349,6 +2641,7 @@ class MainWindow(QtWidgets.QMainWindow):
     def cancelButtonClicked(self):
         self.isCanceled = True
         self.statusBar().showMessage('Cancelling...')
+        self.cancelPlotScan()
 
     def showMoviesTableSelectionStatus(self):
         numSelected = len(self.moviesTableView.selectionModel().selectedRows())
@@ -2571,6 +2864,7 @@ class MainWindow(QtWidgets.QMainWindow):
         QtCore.QTimer.singleShot(100, restoreSelection)
 
     def searchPlots(self):
+        self.cancelPlotScan(report=False)
         self.moviesTableTitleFilterBox.clear()
 
         searchText = self.moviesTableSearchPlotsBox.text()
@@ -2694,6 +2988,48 @@ class MainWindow(QtWidgets.QMainWindow):
         # Store the search regex for highlighting in summary display (before search starts)
         self.plotSearchRegex = search_regex
 
+        # The plot index answers from its postings, running the regex only
+        # on the candidates of wildcard alternatives
+        alternatives = parsePlotQuery(searchText)
+        plotIndex = self.plotIndex() if alternatives else None
+        if plotIndex is not None and plotIndex.verifyCount(alternatives) <= MAX_INDEX_CANDIDATES:
+            titles = self.moviesSmdbData['titles']
+            t0 = time.perf_counter()
+            movies = plotIndex.search(
+                alternatives, lambda moviePath: plotText(titles[moviePath]) if moviePath in titles else '')
+            matching_movies = [plotIndex.titleYear(movie) for movie in movies]
+            elapsed = time.perf_counter() - t0
+            self.moviesTableProxyModel.setMovieListFilter(matching_movies, mode='include')
+            self.numVisibleMovies = self.moviesTableProxyModel.rowCount()
+            self.showMoviesTableSelectionStatus()
+            self.statusBar().showMessage(f'Plot search completed: {len(matching_movies)} matches found')
+            self.output(f"Plot search completed: {len(matching_movies)} movies found "
+                        f"in {elapsed * 1000:.1f} ms")
+            return
+
+        # The SQLite library answers searches without wildcards from its
+        # full text index
+        query = ftsQuery(searchText) if self.moviesLibrary is not None else None
+        if query is not None and self.moviesLibrary.hasFullTextSearch:
+            try:
+                matching_movies = self.moviesLibrary.searchText(query)
+            except Exception as e:
+                self.output(f"Full text search failed, searching plots instead: {e}")
+            else:
+                self.moviesTableProxyModel.setMovieListFilter(matching_movies, mode='include')
+                self.numVisibleMovies = self.moviesTableProxyModel.rowCount()
+                self.showMoviesTableSelectionStatus()
+                self.statusBar().showMessage(f'Plot search completed: {len(matching_movies)} matches found')
+                self.output(f"Plot search completed: {len(matching_movies)} movies found")
+                return
+
+        # Anything else scans the text of every movie, in worker processes
+        # reading the plot index's copy of the texts
+        plotIndex = self.plotIndex()
+        if plotIndex is not None:
+            self.startPlotScan(plotIndex, search_regex, searchTextLower)
+            return
+
         # Get row count from SOURCE model (not proxy) to search all movies
         rowCount = self.moviesTableModel.rowCount()
         self.progressBar.setMaximum(rowCount)
@@ -2712,7 +3048,6 @@ class MainWindow(QtWidgets.QMainWindow):
         progress_update_interval = max(1, rowCount // 100)
         
         # Track timing for ETA
-        import time
         start_time = time.time()
         
         # Search through all movies in the SOURCE model
@@ -2809,6 +3144,109 @@ class MainWindow(QtWidgets.QMainWindow):
         self.statusBar().showMessage(f'Plot search completed: {len(matching_movies)} matches found')
         self.output(f"Plot search completed: {len(matching_movies)} movies found")
 
+    def startPlotScan(self, plotIndex, searchRegex, searchTextLower):
+        """Scan the plots in the background, adding matches to the table as
+        they are found."""
+        self.moviesTableProxyModel.setMovieListFilter([], mode='include')
+        self.numVisibleMovies = 0
+        self.progressBar.setMaximum(len(plotIndex))
+        self.isCanceled = False
+        scan = PlotScan(plotIndex.folder, len(plotIndex), searchRegex, searchTextLower, self)
+        scan.matchesFound.connect(
+            lambda movies: self.plotScanMatchesFound(scan, plotIndex, movies),
+            QtCore.Qt.QueuedConnection)
+        scan.progress.connect(
+            lambda done, total: self.plotScanProgress(scan, done, total),
+            QtCore.Qt.QueuedConnection)
+        scan.finished.connect(
+            lambda completed: self.plotScanFinished(scan, completed),
+            QtCore.Qt.QueuedConnection)
+        self._plotScan = scan
+        self._plotScanMatches = []
+        self._plotScanStart = time.perf_counter()
+        self._plotScanTimer.setInterval(200)
+        scan.start()
+
+    def plotScanMatchesFound(self, scan, plotIndex, movies):
+        if scan is not self._plotScan:
+            return
+        self._plotScanMatches.extend(plotIndex.titleYear(movie) for movie in movies)
+        # Matches arriving together are added to the filter in one go
+        if not self._plotScanTimer.isActive():
+            self._plotScanTimer.start()
+
+    def addPlotScanMatches(self):
+        if not self._plotScanMatches:
+            return
+        matches, self._plotScanMatches = self._plotScanMatches, []
+        t0 = time.perf_counter()
+        self.moviesTableProxyModel.addToMovieListFilter(matches)
+        # Each batch filters every row again, so batches are spaced to keep
+        # that to a tenth of the time on large tables
+        self._plotScanTimer.setInterval(max(200, int((time.perf_counter() - t0) * 10000)))
+        self.numVisibleMovies = self.moviesTableProxyModel.rowCount()
+        self.showMoviesTableSelectionStatus()
+
+    def plotScanProgress(self, scan, done, total):
+        if scan is not self._plotScan:
+            return
+        self.progressBar.setValue(done)
+        numMatches = len(self.moviesTableProxyModel.filter_movie_list) + len(self._plotScanMatches)
+        self.statusBar().showMessage(f'Plot search: {numMatches} matches | {done}/{total}')
+
+    def plotScanFinished(self, scan, completed):
+        scan.deleteLater()
+        if scan is not self._plotScan:
+            return
+        self._plotScan = None
+        self._plotScanTimer.stop()
+        self.addPlotScanMatches()
+        self.progressBar.setValue(0)
+        numMatches = len(self.moviesTableProxyModel.filter_movie_list)
+        self.statusBar().showMessage(f'Plot search completed: {numMatches} matches found')
+        self.output(f"Plot search completed: {numMatches} movies found in "
+                    f"{time.perf_counter() - self._plotScanStart:.2f}s")
+
+    def cancelPlotScan(self, report=True):
+        """Stop a running plot scan; matches still coming in are dropped."""
+        scan, self._plotScan = self._plotScan, None
+        if scan is None:
+            return
+        scan.cancel()
+        self._plotScanTimer.stop()
+        self._plotScanMatches = []
+        self.progressBar.setValue(0)
+        if report:
+            self.statusBar().showMessage('Cancelled')
+            self.output("Plot search cancelled")
+
+    def plotIndex(self):
+        """The plot index of the movie titles, built from them when the
+        one on disk is missing or stale.  None without numpy."""
+        titles = self.moviesSmdbData.get('titles') if self.moviesSmdbData else None
+        if not titles:
+            return None
+        if self._plotIndex is not None and self._plotIndexTitles is titles:
+            return self._plotIndex
+        plotIndex = openPlotIndex(self.moviesSmdbFile)
+        if plotIndex is None or len(plotIndex) != len(titles):
+            mpk_path = os.path.splitext(self.moviesSmdbFile)[0] + ".mpk"
+            sourceFile = mpk_path if (os.path.exists(mpk_path) and
+                                      isSmdbMpkCurrent(self.moviesSmdbFile)) else None
+            t0 = time.perf_counter()
+            try:
+                if not writePlotIndex(plotIndexPath(self.moviesSmdbFile), titles, sourceFile):
+                    return None
+                plotIndex = PlotIndex(plotIndexPath(self.moviesSmdbFile))
+            except Exception as e:
+                self.output(f"Warning: failed to build plot index: {e}")
+                return None
+            self.output(f"Built plot index of {len(plotIndex)} movies in "
+                        f"{time.perf_counter() - t0:.2f}s")
+        self._plotIndex = plotIndex
+        self._plotIndexTitles = titles
+        return plotIndex
+
     def searchMoviesTableView(self):
         searchText = self.moviesTableTitleFilterBox.text()
         if not searchText:
@@ -2984,6 +3422,205 @@ class MainWindow(QtWidgets.QMainWindow):
         else:
             self.similarMoviesWidget.clearSimilarMovies()
 
+    def exportSmdbJsonMenu(self, checked):
+        self.exportSmdbJson = checked
+        if checked and os.path.exists(os.path.splitext(self.moviesSmdbFile)[0] + ".mpk"):
+            scheduleSmdbJsonExport(self.moviesSmdbFile, self.smdbJsonExportMinutes * 60)
+
+    def useSqliteLibraryMenu(self, checked):
+        self.useSqliteLibrary = checked
+        # Opens (or builds) the library, or goes back to the .mpk
+        self.refreshMoviesList()
+
+    def usePackedThumbnailsMenu(self, checked):
+        self.usePackedThumbnails = checked
+        thumbnails = sharedThumbnailCache()
+        if not checked:
+            thumbnails.setAtlas(None)
+            return
+        try:
+            thumbnails.setAtlas(ThumbnailAtlas(thumbnailCacheFolder()))
+        except OSError as e:
+            self.output(f"Could not open the packed thumbnail cache: {e}")
+
+    def watchMoviesFoldersMenu(self, checked):
+        self.watchMoviesFolders = checked
+        self.updateLibraryWatcher()
+
+    def updateLibraryWatcher(self):
+        """Start, restart or stop the movies folder watcher to match the
+        setting and the movies folders."""
+        roots = []
+        if self.watchMoviesFolders:
+            roots = availableRoots(self.moviesRoots())
+        if self.libraryWatcher is not None:
+            if self.libraryWatcher.roots == roots:
+                return
+            self.libraryWatcher.stop()
+            self.libraryWatcher.deleteLater()
+            self.libraryWatcher = None
+        if not roots:
+            return
+        self.libraryWatcher = LibraryWatcher(roots, self)
+        self.libraryWatcher.libraryChanged.connect(self.applyLibraryChanges)
+        self.libraryWatcher.start()
+        self.output(f"Watching {len(self.libraryWatcher.watchedRoots())} movies folders, "
+                    f"polling {len(self.libraryWatcher.polledRoots())}")
+
+    def applyLibraryChanges(self, added, removed, changed):
+        """Update the movie list and the SMDB data for movie folders that were
+        added, removed or changed on disk.
+
+        The rows of those movies are inserted, removed or updated in place,
+        and their title records and index entries are patched in the SMDB
+        data and journaled (see `journalLibraryChanges`).
+        """
+        model = self.moviesTableModel
+        if (model is None or self._applyingLibraryChanges or
+                getattr(self, '_titleStreamModel', None) is not None):
+            # Not now; try again with the next batch
+            if self.libraryWatcher is not None:
+                self.libraryWatcher.requeue(added, removed, changed)
+            return
+        self._applyingLibraryChanges = True
+        try:
+            self.output(f"Movies folders changed: {len(added)} added, "
+                        f"{len(removed)} removed, {len(changed)} changed")
+            # Changed folders that are not in the list yet are new to it,
+            # and added folders that are in it already have changed
+            listed = model.rowsForPaths(set(added) | set(changed))
+            added, changed = ([path for path in added + changed if path not in listed],
+                              [path for path in added + changed if path in listed])
+
+            model.removeMoviePaths(removed)
+            self.movieLocations.removeFolders(removed)
+            self.movieLocations.addFolders(added)
+
+            folders = [(path, os.path.basename(path)) for path in added + changed]
+            probes = probeMovieFolders(folders)
+            for (moviePath, folderName), probe in zip(folders, probes):
+                if probe.error:
+                    self.output("Error reading %s" % os.path.join(moviePath, f'{folderName}.json'))
+            model.appendMovieRows([model.createMovieData(probe.data, moviePath, folderName,
+                                                         False, True, probe)
+                                   for (moviePath, folderName), probe
+                                   in zip(folders[:len(added)], probes)])
+            rows = model.rowsForPaths(set(changed))
+            for (moviePath, folderName), probe in zip(folders[len(added):], probes[len(added):]):
+                model.setMovieData(rows[moviePath], probe.data, moviePath, folderName, probe)
+
+            # New rows go at the end; put them in the current sort order
+            proxy = self.moviesTableProxyModel
+            if added and proxy is not None and proxy.sortColumn() >= 0:
+                proxy.sort(proxy.sortColumn(), proxy.sortOrder())
+
+            self.journalLibraryChanges(model, removed, folders, probes)
+            self.numVisibleMovies = self.moviesTableProxyModel.rowCount()
+            self.showMoviesTableSelectionStatus()
+        finally:
+            self._applyingLibraryChanges = False
+
+    def journalLibraryChanges(self, model, removed, folders, probes):
+        """Patch the title records and index entries of the movies SMDB data
+        for movie folders that were removed, or added or changed and probed.
+
+        The edits are journaled, and the shards are brought up to date on a
+        background thread (see `patchShardsInBackground`).
+        """
+        smdbData = self.moviesSmdbData
+        if not smdbData or smdbData.get('titles') is None:
+            # Nothing to patch; the next rebuild picks the movies up
+            return
+        titles = smdbData['titles']
+
+        newRecords = dict.fromkeys(removed)
+        rows = model.rowsForPaths({moviePath for moviePath, _ in folders})
+        for (moviePath, folderName), probe in zip(folders, probes):
+            record = buildTitleRecord(probe.data, moviePath, folderName) if probe.data else None
+            row = rows.get(moviePath)
+            if record and row is not None:
+                record['rank'] = model.getRank(row)
+                record['subtitles exist'] = model.getSubtitlesExist(row) or "unknown"
+                record['date watched'] = model.getDateWatched(row)
+            newRecords[moviePath] = record
+        oldRecords = {moviePath: titles.get(moviePath) for moviePath in newRecords}
+
+        # Other copies of a movie keep its index entries
+        oldTitles = {record.get('title') for record in oldRecords.values() if record}
+        copies = model.pathsForTitles(oldTitles) if oldTitles else []
+
+        def recordAfter(moviePath):
+            return newRecords[moviePath] if moviePath in newRecords else titles.get(moviePath)
+
+        records = []
+        titleChanges = {}
+        for moviePath, record in newRecords.items():
+            oldRecord = oldRecords[moviePath]
+            if oldRecord is None and record is None:
+                continue
+            others = []
+            if oldRecord:
+                oldTitleYear = recordIndexKeys(oldRecord)[0]
+                for path in copies:
+                    other = recordAfter(path) if path != moviePath else None
+                    if other and recordIndexKeys(other)[0] == oldTitleYear:
+                        others.append(other)
+            records.append(titleRecord(moviePath, record))
+            records.extend(indexRecord(op, section, key, titleYear) for op, section, key, titleYear
+                           in indexChanges(oldRecord, record, others))
+            titleChanges[moviePath] = record
+        if not titleChanges:
+            return
+
+        self.journalSmdbEdits(self.moviesSmdbFile, smdbData, records)
+        self.output(f"Journaled SMDB changes for {len(titleChanges)} titles")
+        for filterWidget in (self.primaryFilterWidget, self.secondaryFilterWidget):
+            filterWidget.populateFiltersTable()
+        self._plotIndex = None
+        self._statisticsStale = True
+        self.patchShardsInBackground(self.moviesSmdbFile, titleChanges)
+
+    def patchShardsInBackground(self, fileName, titleChanges):
+        """Write journaled title changes into the shards of their roots on a
+        background thread.  The SMDB file itself picks them up when its
+        journal is compacted (see `appendSmdbJournal`)."""
+        movieRoots = self.moviesRoots()
+
+        def update():
+            try:
+                with smdbWriteLock:
+                    patchShards(fileName, movieRoots, titleChanges)
+            except Exception as e:
+                output(f"Warning: failed to update SMDB shards of '{fileName}': {e}")
+
+        threading.Thread(target=update, daemon=True).start()
+
+    def setMoviesSmdbData(self, smdbData):
+        """Use freshly written SMDB data without reloading the movie list."""
+        self.moviesSmdbData = smdbData
+        self.moviesTableModel.setTitleRecords(smdbData.get('titles'))
+        if self.useSqliteLibrary:
+            self.moviesLibrary = openSqliteLibrary(self.moviesSmdbFile)
+        self.loadEmbeddingsFromBinaryFile()
+        if hasattr(self, 'backupListWidget'):
+            self.backupListWidget.moviesSmdbData = smdbData
+        for filterWidget in (self.primaryFilterWidget, self.secondaryFilterWidget):
+            filterWidget.moviesSmdbData = smdbData
+            filterWidget.library = self.moviesLibrary
+            filterWidget.populateFiltersTable()
+        self._statisticsStale = True
+
+    def updateSqliteLibrary(self, smdbFile, smdbData):
+        """Rebuild the SQLite library from SMDB data and open it."""
+        t0 = time.perf_counter()
+        try:
+            writeSqliteLibrary(smdbFile, smdbData)
+        except Exception as e:
+            self.output(f"Warning: failed to write SQLite library: {e}")
+            return None
+        self.output(f"Wrote {sqlitePath(smdbFile)} in {time.perf_counter() - t0:.3f}s")
+        return openSqliteLibrary(smdbFile)
+
     def showLogMenu(self):
         if self.logWidget:
             self.showLog = not self.showLog
@@ -3058,11 +3695,10 @@ class MainWindow(QtWidgets.QMainWindow):
                 continue
 
             if smdbKey in self.moviesSmdbData and name in self.moviesSmdbData[smdbKey]:
-                movies = self.moviesSmdbData[smdbKey][name]['movies']
-                for movie in movies:
-                    movieList.append(movie)
+                movieList.extend(indexEntryKeys(self.moviesSmdbData[smdbKey][name]))
 
         # Apply the filter using the proxy model
+        movieList = moviesForKeys(self.moviesSmdbData, movieList)
         self.moviesTableProxyModel.setMovieListFilter(movieList, mode='include')
         self.numVisibleMovies = self.moviesTableProxyModel.rowCount()
         self.showMoviesTableSelectionStatus()
@@ -3109,55 +3745,83 @@ class MainWindow(QtWidgets.QMainWindow):
         self.moviesTableView.scrollTo(match_proxy_index, QtWidgets.QAbstractItemView.PositionAtCenter)
         return True
 
-    def filterTableSelectionChanged(self, mainFilter=True):
-        if len(self.primaryFilterWidget.filterTable.selectedItems()) == 0:
-            self.showAllMoviesTableView()
-            return
-
-        filterByText = self.primaryFilterWidget.filterByComboBox.currentText()
-        filterByKey = self.primaryFilterWidget.filterByDict[filterByText]
-
-        movieList = []
-        for item in self.primaryFilterWidget.filterTable.selectedItems():
-            name = self.primaryFilterWidget.filterTable.item(item.row(), 0).text()
+    def filterSelection(self, filterWidget):
+        """(index section, keys) selected in a filter widget."""
+        filterByText = filterWidget.filterByComboBox.currentText()
+        filterByKey = filterWidget.filterByDict[filterByText]
+        keys = set()
+        for item in filterWidget.filterTable.selectedItems():
+            name = filterWidget.filterTable.item(item.row(), 0).text()
             # Convert string back to appropriate type for dictionary lookup
             lookup_key = name
             if filterByKey == 'ratings':
                 lookup_key = float(name)
             elif filterByKey == 'years':
                 lookup_key = int(name)
-            movies = self.moviesSmdbData[filterByKey][lookup_key]['movies']
-            for movie in movies:
-                movieList.append(movie)
+            keys.add(lookup_key)
+        return filterByKey, keys
+
+    def filterSelectionKeys(self, selections):
+        """Movie keys matching filter selections, see indexEntryKeys."""
+        # Index entries hold movie ids (or (title, year) tuples in older
+        # files), so the selections combine as set unions and intersections
+        movieKeys = None
+        for section, keys in selections:
+            selectionKeys = set()
+            for key in keys:
+                selectionKeys.update(indexEntryKeys(self.moviesSmdbData[section][key]))
+            movieKeys = selectionKeys if movieKeys is None else movieKeys & selectionKeys
+        return movieKeys or set()
+
+    def facetBitmaps(self):
+        """Row sets of the filter values over the movies table, or None."""
+        if not self.moviesSmdbData or self.moviesTableModel is None:
+            return None
+        if (self._facetBitmaps is None or
+                self._facetBitmaps.smdbData is not self.moviesSmdbData or
+                self._facetBitmaps.model is not self.moviesTableModel):
+            if self._facetBitmaps is not None:
+                try:
+                    self._facetBitmaps.deleteLater()
+                except RuntimeError:
+                    # Already deleted along with its model
+                    pass
+            self._facetBitmaps = FacetBitmaps(self.moviesSmdbData, self.moviesTableModel)
+        return self._facetBitmaps
+
+    def filterTableSelectionChanged(self, mainFilter=True):
+        if len(self.primaryFilterWidget.filterTable.selectedItems()) == 0:
+            self.showAllMoviesTableView()
+            return
+
+        primary = self.filterSelection(self.primaryFilterWidget)
+        library = self.moviesLibrary
 
         if mainFilter:
-            self.secondaryFilterWidget.movieList = movieList
+            # The secondary filter lists the values of the primary's movies
+            if library is not None:
+                self.secondaryFilterWidget.movieList = library.filterMovies(primary)
+            else:
+                self.secondaryFilterWidget.movieList = self.filterSelectionKeys([primary])
+            self.secondaryFilterWidget.facetFilter = primary
             self.secondaryFilterWidget.populateFiltersTable()
 
-        filter2ByText = self.secondaryFilterWidget.filterByComboBox.currentText()
-        filter2ByKey = self.secondaryFilterWidget.filterByDict[filter2ByText]
+        selections = [primary]
         if len(self.secondaryFilterWidget.filterTable.selectedItems()) != 0:
-            movieList2 = list()
-            for movie in movieList:
-                foundMovie = False
-                for item in self.secondaryFilterWidget.filterTable.selectedItems():
-                    name = self.secondaryFilterWidget.filterTable.item(item.row(), 0).text()
-                    # Convert string back to appropriate type for dictionary lookup
-                    lookup_key = name
-                    if filter2ByKey == 'ratings':
-                        lookup_key = float(name)
-                    elif filter2ByKey == 'years':
-                        lookup_key = int(name)
-                    movies = self.moviesSmdbData[filter2ByKey][lookup_key]['movies']
-                    if movie in movies:
-                        foundMovie = True
-                        break
-                if foundMovie:
-                    movieList2.append(movie)
-            movieList = movieList2
-
-        # Apply the filter using the proxy model
-        self.moviesTableProxyModel.setMovieListFilter(movieList, mode='include')
+            selections.append(self.filterSelection(self.secondaryFilterWidget))
+
+        # Apply the filter using the proxy model: a row mask combined from
+        # the row sets of the selected values, or else the matching movies
+        facetBitmaps = self.facetBitmaps()
+        mask = facetBitmaps.selectionMask(selections) if facetBitmaps is not None else None
+        if mask is not None:
+            self.moviesTableProxyModel.setRowIdFilter(mask)
+        else:
+            if library is not None:
+                movieList = library.filterMovies(*selections)
+            else:
+                movieList = moviesForKeys(self.moviesSmdbData, self.filterSelectionKeys(selections))
+            self.moviesTableProxyModel.setMovieListFilter(movieList, mode='include')
         self.numVisibleMovies = self.moviesTableProxyModel.rowCount()
         
         # Select first visible row if any
@@ -3468,81 +4132,107 @@ class MainWindow(QtWidgets.QMainWindow):
         else:
             self.summary.clear()
 
-    def rebuildSmdbFileAndReload(self):
-        """Rebuild SMDB file and reload the movie list"""
-        self.writeSmdbFile(self.moviesSmdbFile, self.moviesTableModel, titlesOnly=False)
+    def rebuildSmdbFileAndReload(self, full=False, roots=None):
+        """Rebuild SMDB file and reload the movie list.
+
+        By default only JSON files that changed since the last rebuild are
+        re-read; `full` re-reads every file and rebuilds all indexes.
+        `roots` limits the rebuild to some of the movies folders.
+        """
+        self.writeSmdbFile(self.moviesSmdbFile,
+                           self.moviesTableModel,
+                           titlesOnly=False,
+                           incremental=not full,
+                           roots=roots)
         self.statusBar().showMessage('Reloading movies...')
         QtCore.QCoreApplication.processEvents()
         self.refreshMoviesList()
         self.statusBar().showMessage('Rebuild complete')
 
-    def writeSmdbFile(self, fileName, model, titlesOnly=False):
+    def rebuildSmdbRootMenu(self):
+        roots = self.moviesRoots()
+        root, ok = QtWidgets.QInputDialog.getItem(self,
+                                                  "Rebuild SMDB file",
+                                                  "Movies folder to rebuild:",
+                                                  roots,
+                                                  0,
+                                                  False)
+        if ok and root:
+            self.rebuildSmdbFileAndReload(roots=[root])
+
+    def writeSmdbFile(self, fileName, model, titlesOnly=False, incremental=False, roots=None):
+        """Build the SMDB data from the movie JSON files and write it to disk.
+
+        When `incremental` is set, JSON files whose size and mtime match the
+        rebuild manifest reuse their cached title record, and the index
+        sections of the existing SMDB file are patched only for new, changed
+        or removed titles.  A full rebuild is done whenever the manifest or
+        the previous SMDB data is unavailable.
+
+        The main SMDB file also keeps the titles of each movies root in a
+        shard (see `smdb_shards`).  Movies under roots that are unavailable,
+        or not listed in `roots` when it is given, are taken from their
+        root's shard without touching the disk, and only the shards of the
+        other roots are rewritten.
+        """
+        # Rows still being streamed in would be missing from the file
+        if model is getattr(self, '_titleStreamModel', None):
+            self.finishTitleStream()
+
         titles = {}
-        directors = {}
-        actors = {}
-        writers = {}
-        producers = {}
-        composers = {}
-        mpaaRatings = {}
-        ratings = {}
-        genres = {}
-        years = {}
-        companies = {}
-        countries = {}
-        userTags = {}
-
-        # Small helpers to index aggregate dicts efficiently
-        # Use dict-as-set for O(1) membership and to preserve insertion order
-        def add_to_index(index_dict, key, title_year):
-            if key is None:
-                return
-            entry = index_dict.get(key)
-            if entry is None:
-                entry = {'num movies': 0, 'movies': {}}
-                index_dict[key] = entry
-            movies = entry.get('movies')
-            if isinstance(movies, list):
-                # Backward compatibility if a list slips in
-                if title_year not in movies:
-                    movies.append(title_year)
-                    entry['num movies'] += 1
-            else:
-                # dict-as-set path
-                if title_year not in movies:
-                    movies[title_year] = None
-                    entry['num movies'] += 1
-
-        def normalize_index_for_json(index_dict):
-            for _, entry in index_dict.items():
-                movies = entry.get('movies')
-                if isinstance(movies, dict):
-                    entry['movies'] = list(movies.keys())
-                    entry['num movies'] = len(entry['movies'])
+        indexes = {section: {} for section, _ in INDEX_SECTIONS}
+
+        previousData = None
+        manifest = {}
+        sharded = not titlesOnly and fileName == self.moviesSmdbFile
+        movieRoots = self.moviesRoots() if sharded else []
+        shards = {}
+        keepRoots = set()
+        if sharded:
+            keepRoots = set(movieRoots) - set(availableRoots(movieRoots))
+            for root in keepRoots:
+                self.output(f"Movies folder unavailable, keeping its titles from the last rebuild: {root}")
+            if roots is not None:
+                keepRoots |= set(movieRoots) - set(roots)
+            shards = readShards(fileName, [root for root in movieRoots if root in keepRoots])
+        if incremental and not titlesOnly:
+            # Older files have a single manifest for all roots
+            rebuiltRoots = [root for root in movieRoots if root not in keepRoots]
+            manifest = readShardManifests(fileName, rebuiltRoots) or readManifest(fileName)
+            if manifest:
+                previousData = readSmdbFile(fileName)
+                if previousData:
+                    # Patch the indexes by (title, year); ids are reassigned below
+                    decodeMovieIds(previousData)
+            if (not previousData or 'titles' not in previousData or
+                    any(section not in previousData for section in indexes)):
+                self.output("No usable SMDB manifest, doing a full rebuild")
+                previousData = None
+                manifest = {}
+        newManifest = {}
+        numReparsed = 0
 
         count = model.rowCount()
         self.progressBar.setMaximum(count)
-        progress = 0
         self.isCanceled = False
 
-        # For box office $
-        reMoneyValue = re.compile(r'(\d+(?:,\d+)*(?:\.\d+)?)')
-        reCurrency = re.compile(r'^([A-Z][A-Z][A-Z])(.*)')
-
         # Throttle UI updates to reduce overhead while keeping responsiveness
         import time
         ui_update_interval = 0.1  # seconds
         loop_start_time = time.perf_counter()
         ui_last_update = loop_start_time
 
-        for row in range(count):
-            # advance progress and throttle UI updates
-            progress += 1
+        def showProgress(progress, total, label):
+            """Update progress bar/status; returns False if the user cancelled."""
+            nonlocal ui_last_update, loop_start_time
+            if progress <= 1:
+                loop_start_time = time.perf_counter()
             now = time.perf_counter()
-            if (now - ui_last_update) >= ui_update_interval or row == (count - 1):
+            if (now - ui_last_update) >= ui_update_interval or progress == total:
                 # Show percentage, throughput, and ETA in status
                 elapsed = now - loop_start_time
                 avg_per_item = (elapsed / progress) if progress else 0.0
-                remaining = max(0, count - progress)
+                remaining = max(0, total - progress)
                 eta_seconds = remaining * avg_per_item
                 eta_h = int(eta_seconds // 3600)
                 eta_m = int((eta_seconds % 3600) // 60)
@@ -3551,9 +4241,10 @@ class MainWindow(QtWidgets.QMainWindow):
                     eta_str = f"{eta_h}:{eta_m:02d}:{eta_s:02d}"
                 else:
                     eta_str = f"{eta_m:02d}:{eta_s:02d}"
-                pct = (progress / count * 100.0) if count else 0.0
+                pct = (progress / total * 100.0) if total else 0.0
                 ips = (progress / elapsed) if elapsed > 0 else 0.0
-                message = "Processing (%d/%d, %4.1f%%, %4.1f it/s): ETA %s" % (progress, count, pct, ips, eta_str)
+                message = "%s (%d/%d, %4.1f%%, %4.1f it/s): ETA %s" % (label, progress, total, pct, ips, eta_str)
+                self.progressBar.setMaximum(total)
                 self.progressBar.setValue(progress)
                 self.statusBar().showMessage(message)
                 QtCore.QCoreApplication.processEvents()
@@ -3563,245 +4254,144 @@ class MainWindow(QtWidgets.QMainWindow):
                     self.statusBar().showMessage('Cancelled')
                     self.isCanceled = False
                     self.progressBar.setValue(0)
-                    return
+                    return False
+            return True
+
+        # Titles of the last build, for kept movies missing from their shard
+        keptTitles = None
+        numUnlisted = 0
+
+        # Locate each movie and decide whether its JSON file must be parsed
+        rows = []
+        jobs = []
+        for row in range(count):
+            if not showProgress(row + 1, count, "Processing"):
+                return
 
-            dateWatched = model.getDateWatched(row)
-            rank = model.getRank(row)
             moviePath = model.getPath(row)
             folderName = model.getFolderName(row)
+            root = rootOf(moviePath, movieRoots) if sharded else None
+            if root in keepRoots:
+                # Never touch the disk under a kept root
+                record = shards.get(root, {}).get(moviePath)
+                if record is None:
+                    if keptTitles is None:
+                        lastData = previousData or readSmdbFile(fileName)
+                        keptTitles = (lastData or {}).get('titles') or {}
+                    record = keptTitles.get(moviePath)
+                if record is None:
+                    # Keep the movie listed with what the table has of it
+                    record = buildTitleRecord({'title': model.getTitle(row),
+                                               'year': model.getYear(row),
+                                               'id': model.getId(row),
+                                               'date': ''}, moviePath, folderName)
+                    numUnlisted += 1
+                if record is None:
+                    continue
+                jsonFile = os.path.join(moviePath, '%s.json' % folderName)
+                rows.append((row, moviePath, folderName, jsonFile, None, dict(record)))
+                continue
             moviePath = self.findMovie(moviePath, folderName)
-            if not moviePath or not os.path.exists(moviePath):
+            if not moviePath:
                 self.output(f"path does not exist: {moviePath}")
                 continue
 
             jsonFile = os.path.join(moviePath, '%s.json' % folderName)
-            if not os.path.exists(jsonFile):
+            try:
+                jsonStat = os.stat(jsonFile)
+            except OSError:
                 continue
 
-            with open(jsonFile, encoding="utf-8") as f:
-                try:
-                    jsonData = ujson.load(f)
-                except UnicodeDecodeError:
-                    self.output("Error reading %s" % jsonFile)
-                    continue
-
-            # Use 'date' from JSON if available, otherwise fall back to file modification time
-            if 'date' in jsonData:
-                # Date from JSON is already in YYYY-MM-DD format, convert to YYYY/MM/DD
-                jsonDate = jsonData.get('date')
-                dateModified = jsonDate.replace('-', '/')
+            # Reuse the cached record when the JSON file is unchanged
+            record = None
+            entry = manifest.get(jsonFile)
+            if (entry and entry.get('record') and
+                    entry.get('path') == moviePath and
+                    entry.get('mtime') == jsonStat.st_mtime and
+                    entry.get('size') == jsonStat.st_size):
+                record = dict(entry['record'])
             else:
-                dateModified = datetime.datetime.fromtimestamp(pathlib.Path(moviePath).stat().st_mtime)
-                dateModified = f"{dateModified.year}/{str(dateModified.month).zfill(2)}/{str(dateModified.day).zfill(2)}"
-
-            if 'title' in jsonData and 'year' in jsonData:
-                jsonTitle = jsonData.get('title')
-
-                jsonWidth = jsonData.get('width') or 0
-                jsonHeight = jsonData.get('height') or 0
-                jsonChannels = jsonData.get('channels') or 0
-                jsonSize = jsonData.get('size') or 0
-
-                # Parse numeric year for indexing
-                jsonYearInt = 0
-                if jsonData.get('year'):
-                    try:
-                        jsonYearInt = int(jsonData.get('year'))
-                    except ValueError:
-                        try:
-                            jy = str(jsonData.get('year')).split('–')[0]
-                            jsonYearInt = int(jy)
-                        except Exception:
-                            jsonYearInt = 0
-                
-                # Use integer year in tuple to match stored format
-                titleYearTuple = (jsonTitle, jsonYearInt)
-
-                # Indexing block
-                if not titlesOnly and jsonYearInt:
-                    add_to_index(years, jsonYearInt, titleYearTuple)
-
-                # Directors
-                movieDirectorList = []
-                jsonDirectors = jsonData.get('directors') or []
-                for director in jsonDirectors:
-                    movieDirectorList.append(director)
-                    if not titlesOnly:
-                        add_to_index(directors, director, titleYearTuple)
-
-                # Actors
-                movieActorsList = []
-                jsonCast = jsonData.get('cast') or []
-                for actor in jsonCast:
-                    movieActorsList.append(actor)
-                    if not titlesOnly:
-                        add_to_index(actors, actor, titleYearTuple)
-
-                # Writers
-                movieWritersList = []
-                jsonWriters = jsonData.get('writers') or []
-                for writer in jsonWriters:
-                    movieWritersList.append(writer)
-                    if not titlesOnly:
-                        add_to_index(writers, writer, titleYearTuple)
-
-                # Producers
-                movieProducersList = []
-                jsonProducers = jsonData.get('producers') or []
-                for producer in jsonProducers:
-                    movieProducersList.append(producer)
-                    if not titlesOnly:
-                        add_to_index(producers, producer, titleYearTuple)
-
-                # Composers
-                movieComposersList = []
-                jsonComposers = jsonData.get('composers') or []
-                for composer in jsonComposers:
-                    movieComposersList.append(composer)
-                    if not titlesOnly:
-                        add_to_index(composers, composer, titleYearTuple)
-
-                # User tags
-                jsonUserTags = jsonData.get('user tags') or []
-                if not titlesOnly:
-                    for tag in jsonUserTags:
-                        add_to_index(userTags, tag, titleYearTuple)
-
-                # Genres
-                jsonGenres = jsonData.get('genres') or []
-                if not titlesOnly:
-                    for genre in jsonGenres:
-                        add_to_index(genres, genre, titleYearTuple)
-
-                # Companies
-                jsonCompanies = jsonData.get('companies') or []
-                if not titlesOnly:
-                    for company in jsonCompanies:
-                        add_to_index(companies, company, titleYearTuple)
-
-                # Countries
-                jsonCountries = jsonData.get('countries') or []
-                if not titlesOnly:
-                    for country in jsonCountries:
-                        add_to_index(countries, country, titleYearTuple)
-
-                # IDs and ratings
-                jsonId = jsonData.get('id') or None
-
-                jsonRating = None
-                if jsonData.get('rating'):
-                    try:
-                        jsonRating = float(jsonData.get('rating'))
-                    except ValueError:
-                        jsonRating = 0.0
-                    if not titlesOnly:
-                        add_to_index(ratings, jsonRating, titleYearTuple)
-
-                jsonMpaaRating = None
-                if jsonData.get('mpaa rating'):
-                    jsonMpaaRating = jsonData.get('mpaa rating')
-                    if not titlesOnly:
-                        add_to_index(mpaaRatings, jsonMpaaRating, titleYearTuple)
-
-                # Box office formatting and other fields
-                jsonBoxOffice = None
-                if jsonData.get('box office'):
-                    jsonBoxOffice = jsonData.get('box office')
-                    try:
-                        currency = 'USD'
-                        if jsonBoxOffice:
-                            jsonBoxOffice = jsonBoxOffice.replace(' (estimated)', '')
-                            match = re.match(reCurrency, jsonBoxOffice)
-                            if match:
-                                currency = match.group(1)
-                                jsonBoxOffice = '$%s' % match.group(2)
-                            results = re.findall(reMoneyValue, jsonBoxOffice)
-                            if results:
-                                amount = ('$' + results[0]) if currency == 'USD' else results[0]
-                            else:
-                                amount = '$0'
-                        else:
-                            amount = '$0'
-                        jsonBoxOffice = '%-3s %15s' % (currency, amount)
-                    except Exception:
-                        pass
-
-                jsonRuntime = jsonData.get('runtime') or None
-
-                # Known duplicate status
-                knownDuplicate = jsonData.get('known duplicate', False)
-
-                # Extract plot for caching in smdb file
-                jsonPlot = None
-                if jsonData.get('plot'):
-                    plot_data = jsonData.get('plot')
-                    if isinstance(plot_data, list):
-                        jsonPlot = plot_data[0] if plot_data else None
-                    else:
-                        jsonPlot = plot_data
-                    # Remove the author of the plot's name
-                    if jsonPlot:
-                        jsonPlot = jsonPlot.split('::')[0]
-
-                # Extract synopsis for caching in smdb file
-                jsonSynopsis = None
-                if jsonData.get('synopsis'):
-                    synopsis_data = jsonData.get('synopsis')
-                    if isinstance(synopsis_data, list):
-                        jsonSynopsis = synopsis_data[0] if synopsis_data else None
-                    else:
-                        jsonSynopsis = synopsis_data
-                    # Remove the author of the synopsis's name
-                    if jsonSynopsis:
-                        jsonSynopsis = jsonSynopsis.split('::')[0]
+                jobs.append((jsonFile, moviePath, folderName))
+            rows.append((row, moviePath, folderName, jsonFile, jsonStat, record))
+
+        if numUnlisted:
+            self.output(f"{numUnlisted} movies under unavailable or skipped movies folders have no "
+                        f"title record yet, keeping them listed until their folder is rebuilt")
+
+        # Parse new and changed JSON files, in worker processes for large batches
+        parsed = parseTitleRecords(jobs,
+                                   lambda done, total: showProgress(done, total, "Parsing"),
+                                   output=self.output)
+        if parsed is None:
+            return
 
-                # NOTE: Embeddings are now stored in a separate binary file (smdb_embeddings.npz)
-                # and are no longer written to or read from the SMDB file for better performance
+        # Merge the per-movie records in row order
+        for row, moviePath, folderName, jsonFile, jsonStat, record in rows:
+            if record is None:
+                ok, record = parsed[jsonFile]
+                if not ok:
+                    self.output("Error reading %s" % jsonFile)
+                    continue
+                numReparsed += 1
+
+            # Titles kept from a shard keep the manifest entries of that shard
+            if not titlesOnly and jsonStat is not None:
+                newManifest[jsonFile] = {'mtime': jsonStat.st_mtime,
+                                         'size': jsonStat.st_size,
+                                         'path': moviePath,
+                                         'record': dict(record) if record else None}
+            if not record:
+                continue
 
-                # Subtitles exist status comes from current model value if present
-                try:
-                    if len(model._data[row]) > Columns.SubtitlesExist.value:
-                        subtitlesExist = model._data[row][Columns.SubtitlesExist.value] or "unknown"
-                    else:
-                        subtitlesExist = "unknown"
-                except Exception:
-                    subtitlesExist = "unknown"
-
-                # Build title entry
-                titles[moviePath] = {
-                    'folder': folderName,
-                    'id': jsonId,
-                    'title': jsonTitle,
-                    'year': jsonYearInt,
-                    'rating': jsonRating,
-                    'mpaa rating': jsonMpaaRating,
-                    'runtime': jsonRuntime,
-                    'box office': jsonBoxOffice,
-                    'directors': movieDirectorList,
-                    'genres': jsonGenres or None,
-                    'user tags': jsonUserTags or None,
-                    'countries': jsonCountries or None,
-                    'companies': jsonCompanies or None,
-                    'actors': movieActorsList,
-                    'writers': movieWritersList,
-                    'producers': movieProducersList,
-                    'composers': movieComposersList,
-                    'rank': rank,
-                    'width': jsonWidth,
-                    'height': jsonHeight,
-                    'channels': jsonChannels,
-                    'size': jsonSize,
-                    'path': moviePath,
-                    'date': dateModified,
-                    'subtitles exist': subtitlesExist,
-                    'date watched': dateWatched,
-                    'known duplicate': knownDuplicate,
-                    'plot': jsonPlot,
-                    'synopsis': jsonSynopsis,
-                }
-                
-                # NOTE: Embeddings are no longer written to SMDB file
-                # They are stored separately in smdb_embeddings.npz
+            # Subtitles exist status comes from current model value if present
+            try:
+                subtitlesExist = model.getSubtitlesExist(row) or "unknown"
+            except Exception:
+                subtitlesExist = "unknown"
+
+            record['rank'] = model.getRank(row)
+            record['subtitles exist'] = subtitlesExist
+            record['date watched'] = model.getDateWatched(row)
+            titles[moviePath] = record
+            if not titlesOnly and previousData is None:
+                addRecordToIndexes(indexes, record)
+
+        if previousData is not None:
+            # Patch the previous index sections for titles that were added,
+            # changed or removed since the last build
+            self.statusBar().showMessage('Updating indexes...')
+            QtCore.QCoreApplication.processEvents()
+            indexes = {section: dict(previousData[section]) for section in indexes}
+            previousTitles = previousData['titles']
+            byTitleYear = None
+            numPatched = 0
+            for path in set(previousTitles) | set(titles):
+                oldRecord = previousTitles.get(path)
+                newRecord = titles.get(path)
+                if (oldRecord and newRecord and
+                        recordIndexKeys(oldRecord) == recordIndexKeys(newRecord)):
+                    continue
+                if oldRecord:
+                    # Keep the entries of other copies of the same movie
+                    if byTitleYear is None:
+                        byTitleYear = recordsByTitleYear(titles)
+                    titleYear = (oldRecord.get('title'), oldRecord.get('year') or 0)
+                    others = [record for record in byTitleYear.get(titleYear, ())
+                              if record is not newRecord]
+                    removeRecordFromIndexes(indexes, oldRecord, others)
+                if newRecord:
+                    addRecordToIndexes(indexes, newRecord)
+                numPatched += 1
+            self.output(f"Incremental rebuild: re-read {numReparsed} of {len(titles)} JSON files, "
+                        f"patched indexes for {numPatched} titles")
+
+        if sharded:
+            self.writeSmdbShards(fileName, movieRoots, keepRoots, titles, newManifest)
+        elif not titlesOnly:
+            try:
+                writeManifest(fileName, newManifest)
+            except Exception as e:
+                self.output(f"Warning: failed to write SMDB manifest: {e}")
 
         self.progressBar.setValue(0)
 
@@ -3819,34 +4409,17 @@ class MainWindow(QtWidgets.QMainWindow):
         else:
             self.output(f"Collected {plot_count} plots, {synopsis_count} synopses, and {embedding_count} embeddings out of {len(titles)} movies")
 
-        # Normalize indexes (convert dict-as-set to lists) before serializing
-        data = {'titles': collections.OrderedDict(sorted(titles.items()))}
-        if not titlesOnly:
-            normalize_index_for_json(years)
-            normalize_index_for_json(genres)
-            normalize_index_for_json(directors)
-            normalize_index_for_json(actors)
-            normalize_index_for_json(writers)
-            normalize_index_for_json(producers)
-            normalize_index_for_json(composers)
-            normalize_index_for_json(companies)
-            normalize_index_for_json(countries)
-            normalize_index_for_json(userTags)
-            normalize_index_for_json(mpaaRatings)
-            normalize_index_for_json(ratings)
-            data['years'] = collections.OrderedDict(sorted(years.items()))
-            data['genres'] = collections.OrderedDict(sorted(genres.items()))
-            data['directors'] = collections.OrderedDict(sorted(directors.items()))
-            data['actors'] = collections.OrderedDict(sorted(actors.items()))
-            data['writers'] = collections.OrderedDict(sorted(writers.items()))
-            data['producers'] = collections.OrderedDict(sorted(producers.items()))
-            data['composers'] = collections.OrderedDict(sorted(composers.items()))
-            data['companies'] = collections.OrderedDict(sorted(companies.items()))
-            data['countries'] = collections.OrderedDict(sorted(countries.items()))
-            data['user tags'] = collections.OrderedDict(sorted(userTags.items()))
-            data['mpaa ratings'] = collections.OrderedDict(sorted(mpaaRatings.items()))
-            data['ratings'] = collections.OrderedDict(sorted(ratings.items()))
+        data = self.smdbDataFromTitles(titles, indexes, titlesOnly)
+
+        self.writeSmdbData(fileName, data, titlesOnly)
+
+        self.statusBar().showMessage('Done')
+        QtCore.QCoreApplication.processEvents()
+
+        return data
 
+    def writeSmdbData(self, fileName, data, titlesOnly=False):
+        """Write SMDB data and the caches derived from it."""
         # Try to write fast binary format (.mpk) if msgpack is available
         # Otherwise fall back to JSON (human-readable, backward-compatible)
         try:
@@ -3854,47 +4427,107 @@ class MainWindow(QtWidgets.QMainWindow):
         except Exception:
             msgpack = None
         
-        if msgpack:
-            try:
-                base, ext = os.path.splitext(fileName)
-                mpk_path = f"{base}.mpk" if ext.lower() != ".mpk" else fileName
-                self.statusBar().showMessage('Writing %s' % mpk_path)
-                QtCore.QCoreApplication.processEvents()
-                with open(mpk_path, "wb") as bf:
-                    msgpack.pack(data, bf, use_bin_type=True)
-                
-                # Get file size for logging
-                mpk_size_mb = os.path.getsize(mpk_path) / (1024 * 1024)
-                self.output(f"Wrote {mpk_path} ({mpk_size_mb:.2f} MB)")
+        with smdbWriteLock:
+            if msgpack:
+                try:
+                    base, ext = os.path.splitext(fileName)
+                    mpk_path = f"{base}.mpk" if ext.lower() != ".mpk" else fileName
+                    self.statusBar().showMessage('Writing %s' % mpk_path)
+                    QtCore.QCoreApplication.processEvents()
+                    writeSmdbMpk(mpk_path, data)
                 
-                # Also write JSON for human readability and backup
-                self.statusBar().showMessage('Writing %s' % fileName)
-                QtCore.QCoreApplication.processEvents()
-                with open(fileName, "w", encoding="utf-8") as f:
-                    ujson.dump(data, f, indent=4)
+                    # Get file size for logging
+                    mpk_size_mb = os.path.getsize(mpk_path) / (1024 * 1024)
+                    self.output(f"Wrote {mpk_path} ({mpk_size_mb:.2f} MB)")
+
+                    # Memory-mapped titles for fast startup of the main list
+                    if not titlesOnly:
+                        try:
+                            writeColumnarTitles(columnarPath(fileName), data['titles'], mpk_path)
+                        except Exception as e:
+                            self.output(f"Warning: failed to write columnar titles: {e}")
+                        if self.useSqliteLibrary and fileName == self.moviesSmdbFile:
+                            self.updateSqliteLibrary(fileName, data)
+                        if fileName == self.moviesSmdbFile:
+                            try:
+                                writePlotIndex(plotIndexPath(fileName), data['titles'], mpk_path)
+                            except Exception as e:
+                                self.output(f"Warning: failed to write plot index: {e}")
+                            self._plotIndex = None
                 
-                json_size_mb = os.path.getsize(fileName) / (1024 * 1024)
-                self.output(f"Wrote {fileName} ({json_size_mb:.2f} MB)")
+                    # Also write JSON for human readability and backup, from
+                    # the .mpk on a background thread
+                    if self.exportSmdbJson:
+                        scheduleSmdbJsonExport(fileName, self.smdbJsonExportMinutes * 60)
                 
-            except Exception as e:
-                # Fall back to JSON if msgpack write fails
-                self.output(f"Warning: failed to write MessagePack SMDB: {e}, falling back to JSON")
+                except Exception as e:
+                    # Fall back to JSON if msgpack write fails
+                    self.output(f"Warning: failed to write MessagePack SMDB: {e}, falling back to JSON")
+                    self.statusBar().showMessage('Writing %s' % fileName)
+                    QtCore.QCoreApplication.processEvents()
+                    writeSmdbJson(fileName, data)
+            else:
+                # Write JSON when msgpack is not available
                 self.statusBar().showMessage('Writing %s' % fileName)
                 QtCore.QCoreApplication.processEvents()
-                with open(fileName, "w", encoding="utf-8") as f:
-                    ujson.dump(data, f, indent=4)
-        else:
-            # Write JSON when msgpack is not available
-            self.statusBar().showMessage('Writing %s' % fileName)
-            QtCore.QCoreApplication.processEvents()
-            with open(fileName, "w", encoding="utf-8") as f:
-                ujson.dump(data, f, indent=4)
-
-        self.statusBar().showMessage('Done')
-        QtCore.QCoreApplication.processEvents()
+                writeSmdbJson(fileName, data)
+
+            # The journaled edits are now part of the written file
+            truncateJournal(fileName)
+
+    def writeSmdbShards(self, fileName, movieRoots, keepRoots, titles, manifest):
+        """Rewrite the shards of the movies roots that were rebuilt."""
+        rebuiltRoots = [root for root in movieRoots if root not in keepRoots]
+        shardTitles = {root: {} for root in rebuiltRoots}
+        for moviePath, record in titles.items():
+            root = rootOf(moviePath, movieRoots)
+            if root in shardTitles:
+                shardTitles[root][moviePath] = record
+        shardManifests = {root: {} for root in rebuiltRoots}
+        for jsonFile, entry in manifest.items():
+            root = rootOf(entry['path'], movieRoots)
+            if root in shardManifests:
+                shardManifests[root][jsonFile] = entry
+        for root in rebuiltRoots:
+            try:
+                writeShard(fileName, root,
+                           collections.OrderedDict(sorted(shardTitles[root].items())),
+                           shardManifests[root])
+            except Exception as e:
+                self.output(f"Warning: failed to write SMDB shard for {root}: {e}")
 
+    def mergeSmdbShards(self, fileName):
+        """Rebuild the merged SMDB file from the per-root shards."""
+        t0 = time.perf_counter()
+        shards = readShards(fileName, self.moviesRoots())
+        titles = {}
+        for shardTitles in shards.values():
+            titles.update(shardTitles)
+        indexes = {section: {} for section, _ in INDEX_SECTIONS}
+        for record in titles.values():
+            addRecordToIndexes(indexes, record)
+        data = self.smdbDataFromTitles(titles, indexes)
+        # Edits journaled since the merged file was last written
+        replayJournal(data, fileName)
+        self.writeSmdbData(fileName, data)
+        self.output(f"Merged {len(shards)} SMDB shards ({len(titles)} titles) "
+                    f"in {time.perf_counter() - t0:.3f}s")
+
+    def smdbDataFromTitles(self, titles, indexes, titlesOnly=False):
+        """Sort the titles and index sections into SMDB data."""
+        # Normalize indexes (convert dict-as-set to lists) before serializing
+        data = {'titles': collections.OrderedDict(sorted(titles.items()))}
+        if not titlesOnly:
+            for section, _ in INDEX_SECTIONS:
+                normalizeIndex(indexes[section])
+                data[section] = collections.OrderedDict(sorted(indexes[section].items()))
+            encodeMovieIds(data)
         return data
 
+    def moviesRoots(self):
+        """The movies folder followed by the additional movies folders."""
+        return [self.moviesFolder] + list(self.additionalMoviesFolders or [])
+
     # Context Menus -----------------------------------------------------------
 
     def movieInfoRightMenu(self):
@@ -3975,7 +4608,6 @@ class MainWindow(QtWidgets.QMainWindow):
         
         self.progressBar.setValue(0)
         self.showMoviesTableSelectionStatus()
-        self.moviesTableModel.aboutToChangeLayout()
 
         # Add missing films
         for i, item in enumerate(collection_mod):
@@ -3987,8 +4619,6 @@ class MainWindow(QtWidgets.QMainWindow):
                 data = {"title": t2, "year": y2, "rank": r2, "backup status": "Folder Missing"}
                 self.moviesTableModel.addMovieData(data, "Not Found", "Not Found")
 
-        self.moviesTableModel.changedLayout()
-
         name = os.path.splitext(os.path.basename(str(collection_type)))[0].lower()
         sort_column = Columns.Rank.value if name == 'criterion' else Columns.Year.value
         self.moviesTableProxyModel.sort(sort_column, QtCore.Qt.AscendingOrder)
@@ -4113,6 +4743,12 @@ class MainWindow(QtWidgets.QMainWindow):
         forceDownloadSynopsisAction.triggered.connect(lambda: self.downloadSynopsisMenu(force=True))
         downloadSubmenu.addAction(forceDownloadSynopsisAction)
 
+        downloadSubmenu.addSeparator()
+
+        updateMediaInfoAction = QtWidgets.QAction("Update Media Info", self)
+        updateMediaInfoAction.triggered.connect(self.updateMediaInfoMenu)
+        downloadSubmenu.addAction(updateMediaInfoAction)
+
         moviesTableRightMenu.addMenu(downloadSubmenu)
 
         # Duplicates & Search submenu
@@ -4191,6 +4827,9 @@ class MainWindow(QtWidgets.QMainWindow):
         """
         Find a movie folder, first checking the given path, then searching alternate folders.
         If multiple paths are found during fallback, prompts user to choose.
+
+        Movie folders directly in the movies folders are looked up in the
+        listings of `movieLocations` instead of on disk.
         
         Args:
             moviePath: The original/stored path to check first
@@ -4199,25 +4838,32 @@ class MainWindow(QtWidgets.QMainWindow):
         Returns:
             Full path to the movie folder if found, None otherwise
         """
-        # First check if the original path exists
-        if os.path.exists(moviePath):
+        roots = self.moviesRoots()
+        listed = self.movieLocations.listed(moviePath, roots) if moviePath else None
+        if listed:
             return moviePath
-        
-        # Build list of all folders to search
-        foldersToSearch = []
-        if self.moviesFolder and self.moviesFolder != "No movies folder set.  Use the \"File->Set movies folder\" menu to set it.":
-            foldersToSearch.append(self.moviesFolder)
-        if self.additionalMoviesFolders:
-            foldersToSearch.extend(self.additionalMoviesFolders)
-        
-        # Search each folder for the movie and collect all matches
-        foundPaths = []
-        for folder in foldersToSearch:
-            if not os.path.exists(folder):
-                continue
-            candidatePath = os.path.join(folder, folderName)
-            if os.path.exists(candidatePath) and os.path.isdir(candidatePath):
-                foundPaths.append(candidatePath)
+        # Otherwise check if the original path exists, unless its drive is
+        # unavailable; checking an offline network share can stall
+        if listed is None and moviePath:
+            root = rootOf(moviePath, roots)
+            if (root is None or rootAvailable(root)) and os.path.exists(moviePath):
+                return moviePath
+
+        foundPaths = self.movieLocations.pathsFor(folderName, roots)
+        if foundPaths is None:
+            # Not a movie folder name the listings can have; search on disk
+            foldersToSearch = []
+            if self.moviesFolder and self.moviesFolder != "No movies folder set.  Use the \"File->Set movies folder\" menu to set it.":
+                foldersToSearch.append(self.moviesFolder)
+            if self.additionalMoviesFolders:
+                foldersToSearch.extend(self.additionalMoviesFolders)
+
+            # Search each folder for the movie and collect all matches
+            foundPaths = []
+            for folder in availableRoots(foldersToSearch):
+                candidatePath = os.path.join(folder, folderName)
+                if os.path.exists(candidatePath) and os.path.isdir(candidatePath):
+                    foundPaths.append(candidatePath)
         
         # Return based on number of matches found
         if len(foundPaths) == 0:
@@ -4274,7 +4920,8 @@ class MainWindow(QtWidgets.QMainWindow):
                       f"{str(now.hour).zfill(2)}:{str(now.minute).zfill(2)}"
         proxy.sourceModel().setDateWatched(sourceIndex, dateWatched)
         if moviePath in self.moviesSmdbData['titles']:
-            self.moviesSmdbData['titles'][moviePath]['date watched'] = dateWatched
+            self.journalSmdbEdits(self.moviesSmdbFile, self.moviesSmdbData,
+                                  [setFieldsRecord(moviePath, {'date watched': dateWatched})])
 
         if tableView != self.historyListWidget.listTableView:
             self.historyListAdd(tableView, proxy)
@@ -4335,6 +4982,7 @@ class MainWindow(QtWidgets.QMainWindow):
             except UnicodeDecodeError:
                 self.output("Error reading %s" % jsonFile)
 
+        oldUserTags = data.get("user tags") or []
         data["user tags"] = []
 
         try:
@@ -4345,6 +4993,12 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.moviesTableModel.setMovieData(sourceRow, data, moviePath, movieFolderName)
 
+        titleYear = (self.moviesTableModel.getTitle(sourceRow),
+                     self.moviesTableModel.getYear(sourceRow))
+        records = [setFieldsRecord(moviePath, {'user tags': None})]
+        records.extend(indexRecord('remove', 'user tags', tag, titleYear) for tag in oldUserTags)
+        self.journalSmdbEdits(self.moviesSmdbFile, self.moviesSmdbData, records)
+
     def addUserTag(self, userTag):
         modelIndex = self.moviesTableView.selectionModel().selectedRows()[0]
         sourceIndex = self.moviesTableProxyModel.mapToSource(modelIndex)
@@ -4366,8 +5020,9 @@ class MainWindow(QtWidgets.QMainWindow):
         if "user tags" not in data:
             data["user tags"] = []
 
-        if userTag not in data["user tags"]:
-            data["user tags"].append(userTag)
+        if userTag in data["user tags"]:
+            return
+        data["user tags"].append(userTag)
 
         try:
             with open(jsonFile, "w") as f:
@@ -4377,20 +5032,31 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.moviesTableModel.setMovieData(sourceRow, data, moviePath, movieFolderName)
 
-        if 'user tags' in self.moviesSmdbData:
-            if userTag in self.moviesSmdbData['user tags']:
-                numMovies = self.moviesSmdbData['user tags'][userTag]['num movies']
-                self.moviesSmdbData['user tags'][userTag]['num movies'] = numMovies + 1
-            else:
-                self.moviesSmdbData['user tags'][userTag] = {}
-                self.moviesSmdbData['user tags'][userTag]['movies'] = []
-                self.moviesSmdbData['user tags'][userTag]['num movies'] = 1
+        title = self.moviesTableModel.getTitle(sourceRow)
+        year = self.moviesTableModel.getYear(sourceRow)
+        titleYear = (title, year)
 
-            title = self.moviesTableModel.getTitle(sourceRow)
-            year = self.moviesTableModel.getYear(sourceRow)
-            titleYear = (title, year)
+        self.journalSmdbEdits(self.moviesSmdbFile, self.moviesSmdbData,
+                              [setFieldsRecord(moviePath, {'user tags': list(data["user tags"])}),
+                               indexRecord('add', 'user tags', userTag, titleYear)])
 
-            self.moviesSmdbData['user tags'][userTag]['movies'].append(titleYear)
+    def journalSmdbEdits(self, smdbFile, smdbData, records):
+        """Apply edits to in-memory SMDB data and append them to the file's journal."""
+        if smdbData:
+            for record in records:
+                applyJournalRecord(smdbData, record)
+        try:
+            appendSmdbJournal(smdbFile, records)
+        except Exception as e:
+            self.output(f"Warning: failed to journal SMDB edits: {e}")
+        if self._facetBitmaps is not None and smdbData is self._facetBitmaps.smdbData:
+            # Index entries such as user tags may have changed
+            self._facetBitmaps.invalidate()
+        if self.moviesLibrary is not None and smdbFile == self.moviesSmdbFile:
+            try:
+                self.moviesLibrary.applyJournalRecords(records)
+            except Exception as e:
+                self.output(f"Warning: failed to update SQLite library: {e}")
 
     class MoveTo(Enum):
         DOWN = 0
@@ -4818,7 +5484,7 @@ class MainWindow(QtWidgets.QMainWindow):
             movieFolderName = self.moviesTableModel.getFolderName(sourceRow)
             moviePath = self.moviesTableModel.getPath(sourceRow)
             moviePath = self.findMovie(moviePath, movieFolderName)
-            if not os.path.exists(moviePath):
+            if not moviePath or not os.path.exists(moviePath):
                 continue
 
             self.movieData.downloadMovieData(proxyIndex, force, doJson=doJson, doCover=doCover)
@@ -4829,6 +5495,89 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.progressBar.setValue(0)
 
+    def mediaProbeCache(self):
+        """The media info cache next to the current SMDB file."""
+        fileName = mediaCachePath(self.moviesSmdbFile)
+        if self._mediaProbeCache is None or self._mediaProbeCache.fileName != fileName:
+            self._mediaProbeCache = MediaProbeCache(fileName)
+        return self._mediaProbeCache
+
+    def updateMediaInfoMenu(self):
+        """Update size, dimensions and channels of the selected movies from
+        their movie files, probing only files not in the media info cache."""
+        movies = []
+        for proxyIndex in self.moviesTableView.selectionModel().selectedRows():
+            sourceRow = self.getSourceRow(proxyIndex)
+            movieFolderName = self.moviesTableModel.getFolderName(sourceRow)
+            moviePath = self.findMovie(self.moviesTableModel.getPath(sourceRow), movieFolderName)
+            if moviePath:
+                movies.append((sourceRow, moviePath, movieFolderName))
+        if not movies:
+            return
+
+        self.isCanceled = False
+        self.statusBar().showMessage('Scanning movie folders...')
+        QtCore.QCoreApplication.processEvents()
+
+        numProbed = 0
+
+        def progress(done, total):
+            nonlocal numProbed
+            numProbed = total
+            self.progressBar.setMaximum(total)
+            self.progressBar.setValue(done)
+            self.statusBar().showMessage("Probing media info (%d/%d)" % (done, total))
+            QtCore.QCoreApplication.processEvents()
+            return not self.isCanceled
+
+        startTime = time.perf_counter()
+        media = probeMovieMedia([moviePath for _, moviePath, _ in movies],
+                                self.mediaProbeCache(), progress)
+        elapsed = time.perf_counter() - startTime
+        self.progressBar.setValue(0)
+        if media is None:
+            self.statusBar().showMessage('Cancelled')
+            self.isCanceled = False
+            return
+
+        numUpdated = 0
+        codecs = collections.Counter()
+        with self.moviesTableModel.batchUpdate():
+            for sourceRow, moviePath, movieFolderName in movies:
+                info = media.get(moviePath)
+                if info is None:
+                    continue
+                if info['codec']:
+                    codecs[info['codec']] += 1
+                values = {'size': formatFolderSize(info['folder size']),
+                          'width': info['width'],
+                          'height': info['height'],
+                          'channels': info['channels']}
+                jsonFile = os.path.join(moviePath, '%s.json' % movieFolderName)
+                if os.path.exists(jsonFile):
+                    try:
+                        with open(jsonFile, encoding='utf-8') as f:
+                            jsonData = ujson.load(f)
+                        if any(jsonData.get(key) != value for key, value in values.items()):
+                            jsonData.update(values)
+                            with open(jsonFile, 'w', encoding='utf-8') as f:
+                                ujson.dump(jsonData, f, indent=4)
+                            numUpdated += 1
+                    except (OSError, ValueError) as e:
+                        self.output(f"Error updating media info in {jsonFile}: {e}")
+                modelIndex = self.moviesTableModel.index(sourceRow, 0)
+                self.moviesTableModel.setSize(modelIndex, values['size'])
+                self.moviesTableModel.setDimensions(modelIndex, values['width'], values['height'])
+                self.moviesTableModel.setChannels(modelIndex, values['channels'])
+
+        self.output(f"Media info of {len(media)} movies in {elapsed:.1f}s: "
+                    f"{numProbed} files probed, {len(media) - numProbed} not probed, "
+                    f"{numUpdated} JSON files updated")
+        if codecs:
+            self.output("Video codecs: " +
+                        ', '.join(f"{codec} {count}" for codec, count in codecs.most_common()))
+        self.statusBar().showMessage('Done')
+
     def downloadSynopsisMenu(self, force=False):
         """Download Wikipedia synopsis for selected movies.
         
@@ -4855,7 +5604,7 @@ class MainWindow(QtWidgets.QMainWindow):
             moviePath = self.moviesTableModel.getPath(sourceRow)
             moviePath = self.findMovie(moviePath, movieFolderName)
             
-            if not os.path.exists(moviePath):
+            if not moviePath or not os.path.exists(moviePath):
                 continue
             
             jsonFile = os.path.join(moviePath, '%s.json' % movieFolderName)
@@ -5109,7 +5858,7 @@ class MainWindow(QtWidgets.QMainWindow):
             movieData = {
                 'title': self.moviesTableModel.getTitle(sourceRow),
                 'year': self.moviesTableModel.getYear(sourceRow),
-                'genres': self.moviesTableModel._data[sourceRow][Columns.Genres.value].split(', ') if self.moviesTableModel._data[sourceRow][Columns.Genres.value] else [],
+                'genres': self.moviesTableModel.getGenres(sourceRow).split(', ') if self.moviesTableModel.getGenres(sourceRow) else [],
                 'tagline': '',
                 'plot': '',
                 'synopsis': ''
@@ -5340,7 +6089,7 @@ class MainWindow(QtWidgets.QMainWindow):
             movieData = {
                 'title': self.moviesTableModel.getTitle(sourceRow),
                 'year': self.moviesTableModel.getYear(sourceRow),
-                'genres': self.moviesTableModel._data[sourceRow][Columns.Genres.value].split(', ') if self.moviesTableModel._data[sourceRow][Columns.Genres.value] else [],
+                'genres': self.moviesTableModel.getGenres(sourceRow).split(', ') if self.moviesTableModel.getGenres(sourceRow) else [],
                 'tagline': '',
                 'plot': '',
                 'synopsis': ''
@@ -5991,7 +6740,7 @@ class MainWindow(QtWidgets.QMainWindow):
             movieFolderName = self.moviesTableModel.getFolderName(sourceRow)
             moviePath = self.moviesTableModel.getPath(sourceRow)
             moviePath = self.findMovie(moviePath, movieFolderName)
-            if not os.path.exists(moviePath):
+            if not moviePath or not os.path.exists(moviePath):
                 failed_count += 1
                 continue
 
@@ -6270,8 +7019,10 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def removeCoverFilesMenu(self):
         filesToDelete = []
+        sourceRows = []
         for modelIndex in self.moviesTableView.selectionModel().selectedRows():
             sourceRow = self.getSourceRow(modelIndex)
+            sourceRows.append(sourceRow)
             moviePath = self.moviesTableModel.getPath(sourceRow)
             movieFolder = self.moviesTableModel.getFolderName(sourceRow)
 
@@ -6284,6 +7035,8 @@ class MainWindow(QtWidgets.QMainWindow):
                     filesToDelete.append(coverFile)
 
         removeFiles(self, filesToDelete, '.jpg')
+        for sourceRow in sourceRows:
+            self.moviesTableModel.invalidateCover(sourceRow)
 
     def removeMovieMenu(self):
         foldersToDelete = []
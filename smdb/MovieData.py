@@ -5,8 +5,8 @@ import requests
 import urllib.request
 import ujson
 from datetime import datetime
-from pymediainfo import MediaInfo
 from .utilities import *
+from .media_probe import probeMovieMedia, formatFolderSize
 
 
 class MovieData:
@@ -185,58 +185,23 @@ class MovieData:
 
         return coverFile
 
-    def _calculateFolderSize(self, moviePath):
-        """Calculate the total size of a movie folder in MB.
-        
-        Args:
-            moviePath: Path to the movie folder
-            
-        Returns:
-            Formatted size string like '01234 Mb'
-        """
-        total_size = 0
-        for dirpath, dirnames, filenames in os.walk(moviePath):
-            for f in filenames:
-                fp = os.path.join(dirpath, f)
-                if not os.path.islink(fp):
-                    total_size += os.path.getsize(fp)
-        return '%05d Mb' % (total_size / (2**20))
-    
     def _getMovieFileInfo(self, moviePath, movie):
         """Extract video file metadata and folder size, adding them to the movie dict.
         
+        The media info comes from the media probe cache when the movie file
+        is unchanged since it was last probed.
+        
         Args:
             moviePath: Path to the movie folder
             movie: Movie dictionary to update with size and file info
         """
-        # Calculate folder size
-        folderSize = self._calculateFolderSize(moviePath)
-        
-        # Extract video file metadata
-        width, height, channels = 0, 0, 0
-        validExtentions = ['.mkv', '.mpg', '.mp4', '.avi', '.flv', '.wmv', '.m4v', '.divx', '.ogm']
-        movieFiles = []
-        
-        for file in os.listdir(moviePath):
-            extension = os.path.splitext(file)[1].lower()
-            if extension in validExtentions:
-                movieFiles.append(file)
-        
-        if len(movieFiles) > 0:
-            movieFile = os.path.join(moviePath, movieFiles[0])
-            info = MediaInfo.parse(movieFile)
-            for track in info.tracks:
-                if track.track_type == 'Video':
-                    width = track.width
-                    height = track.height
-                elif track.track_type == 'Audio':
-                    channels = track.channel_s
+        media = probeMovieMedia([moviePath], self.parent.mediaProbeCache()).get(moviePath, {})
         
         # Add size and movie info to movie dict
-        movie['size'] = folderSize
-        movie['width'] = width
-        movie['height'] = height
-        movie['channels'] = channels
+        movie['size'] = formatFolderSize(media.get('folder size', 0))
+        movie['width'] = media.get('width', 0)
+        movie['height'] = media.get('height', 0)
+        movie['channels'] = media.get('channels', 0)
 
     def _output(self, *args, **kwargs):
         return self.parent.output(*args, **kwargs)
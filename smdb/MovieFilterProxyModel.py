@@ -2,7 +2,24 @@ from PyQt5 import QtCore
 from .MoviesTableModel import Columns
 
 
-class MovieFilterProxyModel(QtCore.QSortFilterProxyModel):
+class MovieSortProxyModel(QtCore.QSortFilterProxyModel):
+    """
+    Proxy model that sorts movie tables by the model's precomputed sort ranks,
+    so numbers like ratings and runtimes sort by value and each comparison is
+    an integer compare instead of a string compare of the cell text.
+    """
+
+    def lessThan(self, left, right):
+        model = self.sourceModel()
+        if (self.sortRole() != QtCore.Qt.DisplayRole or
+                left.column() != right.column() or
+                not hasattr(model, 'getSortRanks')):
+            return super().lessThan(left, right)
+        ranks = model.getSortRanks(left.column())
+        return ranks[left.row()] < ranks[right.row()]
+
+
+class MovieFilterProxyModel(MovieSortProxyModel):
     """
     Custom proxy model that handles filtering movies by multiple criteria.
     This replaces the manual row hiding approach with proper proxy-based filtering.
@@ -16,6 +33,16 @@ class MovieFilterProxyModel(QtCore.QSortFilterProxyModel):
         self.filter_mode = 'none'  # 'none', 'include', or 'exclude'
         self._filter_set = set()
         self._filter_set_dirty = True
+        # Whether each source row is in the movie list, or None when stale
+        self._in_list = None
+        # Mask over source model row ids set by setRowIdFilter, used
+        # instead of the movie list
+        self._row_id_mask = None
+        # Source rows of each (title, year), or None when stale
+        self._rows_by_movie = None
+        # The rows are sorted in the source model, see sort()
+        self._sort_column = -1
+        self._sort_order = QtCore.Qt.AscendingOrder
         
         # Enable dynamic sorting/filtering
         self.setDynamicSortFilter(False)
@@ -31,15 +58,160 @@ class MovieFilterProxyModel(QtCore.QSortFilterProxyModel):
         """
         self.filter_movie_list = movie_list if movie_list else []
         self.filter_mode = mode  # Keep the mode even if list is empty
+        self._row_id_mask = None
         self._filter_set_dirty = True
+        self._in_list = None
         self.invalidateFilter()
     
+    def addToMovieListFilter(self, movie_list):
+        """
+        Add movies to the movie list filter, e.g. as search results stream in.
+        
+        The movie list mask is updated for the rows of the added movies only,
+        instead of being rebuilt over the whole source model, and the rows
+        are only filtered again when one of them changes.  Qt 5 has no way
+        to filter some rows again (invalidateRowsFilter is Qt 6), so that
+        is a pass over every row.
+        
+        Args:
+            movie_list: List of (title, year) tuples
+        """
+        added = [(item[0], item[1]) for item in movie_list
+                 if isinstance(item, (list, tuple)) and len(item) >= 2]
+        filter_set = self._getFilterSet()
+        added = [movie for movie in added if movie not in filter_set]
+        if not added:
+            return
+        self.filter_movie_list = list(self.filter_movie_list) + added
+        filter_set.update(added)
+        model = self.sourceModel()
+        if self._in_list is not None and model is not None:
+            rows_by_movie = self._rowsByMovie(model)
+            changed = False
+            for movie in added:
+                for row in rows_by_movie.get(movie, ()):
+                    if not self._in_list[row]:
+                        self._in_list[row] = True
+                        changed = True
+            if not changed:
+                # None of the added movies is in the table
+                return
+        self.invalidateFilter()
+
+    def _rowsByMovie(self, model):
+        """Source rows of each (title, year), built with the movie list mask."""
+        if self._rows_by_movie is None:
+            years = model.getColumnValues(Columns.Year.value)
+            titles = model.getColumnValues(Columns.Title.value)
+            yearInt = self._yearInt
+            self._rows_by_movie = {}
+            for row, (title, year) in enumerate(zip(titles, years)):
+                self._rows_by_movie.setdefault((title, yearInt(year)), []).append(row)
+        return self._rows_by_movie
+
+    def setRowIdFilter(self, mask):
+        """
+        Show only the rows whose source model row id is set in a mask.
+        
+        Args:
+            mask: Boolean numpy array indexed by row id (see getRowIds),
+                  e.g. from FacetBitmaps.selectionMask
+        """
+        self.filter_movie_list = []
+        self.filter_mode = 'include'
+        self._row_id_mask = mask
+        self._filter_set_dirty = True
+        self._in_list = None
+        self.invalidateFilter()
+
     def clearMovieListFilter(self):
         """Clear the movie list filter, showing all movies."""
         self.filter_movie_list = []
         self.filter_mode = 'none'
+        self._row_id_mask = None
         self._filter_set_dirty = True
+        self._in_list = None
         self.invalidateFilter()
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        if model is None:
+            return
+        # The movie list column pass is redone after any change to the rows
+        for signal in (model.rowsAboutToBeInserted, model.rowsAboutToBeRemoved,
+                       model.rowsAboutToBeMoved, model.layoutAboutToBeChanged,
+                       model.modelAboutToBeReset, model.dataChanged):
+            signal.connect(self._sourceRowsChanged)
+
+    def _sourceRowsChanged(self, *args):
+        self._in_list = None
+        self._rows_by_movie = None
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        """
+        Sort by putting the source model's rows in order.
+        
+        Qt's own sort calls lessThan, in Python, for every comparison; the
+        source model sorts all its rows in one pass over the column's sort
+        keys instead, and this proxy keeps the source order.
+        """
+        model = self.sourceModel()
+        if not hasattr(model, 'sortRows'):
+            super().sort(column, order)
+            return
+        self._sort_column = column
+        self._sort_order = order
+        if column >= 0:
+            model.sortRows(column, order)
+        if super().sortColumn() != -1:
+            super().sort(-1)
+
+    def sortColumn(self):
+        if hasattr(self.sourceModel(), 'sortRows'):
+            return self._sort_column
+        return super().sortColumn()
+
+    def sortOrder(self):
+        if hasattr(self.sourceModel(), 'sortRows'):
+            return self._sort_order
+        return super().sortOrder()
+
+    def _getFilterSet(self):
+        # Use a set for faster lookup - convert lists to tuples when building set
+        if self._filter_set_dirty:
+            self._filter_set = set()
+            for item in self.filter_movie_list:
+                if isinstance(item, (list, tuple)) and len(item) >= 2:
+                    # Convert to tuple (title, year)
+                    self._filter_set.add((item[0], item[1]))
+            self._filter_set_dirty = False
+        return self._filter_set
+
+    @staticmethod
+    def _yearInt(year):
+        # Convert year to int for comparison (matching the format in moviesSmdbData)
+        try:
+            return int(year) if year else 0
+        except (ValueError, TypeError):
+            return 0
+
+    def _inListMask(self, model):
+        """Whether each source row is in the movie list, computed in one pass
+        over the title and year columns."""
+        if self._in_list is None and self._row_id_mask is not None:
+            # Rows added since the mask was made are not in it
+            row_ids = model.getRowIds()
+            in_mask = row_ids < len(self._row_id_mask)
+            in_mask[in_mask] = self._row_id_mask[row_ids[in_mask]]
+            self._in_list = in_mask.tolist()
+        elif self._in_list is None:
+            filter_set = self._getFilterSet()
+            years = model.getColumnValues(Columns.Year.value)
+            titles = model.getColumnValues(Columns.Title.value)
+            yearInt = self._yearInt
+            self._in_list = [(title, yearInt(year)) in filter_set
+                             for title, year in zip(titles, years)]
+        return self._in_list
     
     def filterAcceptsRow(self, source_row, source_parent):
         """
@@ -47,6 +219,12 @@ class MovieFilterProxyModel(QtCore.QSortFilterProxyModel):
         
         This method is called by Qt for each row to determine visibility.
         """
+        # Rows outside a row id mask are rejected before anything else
+        if self._row_id_mask is not None:
+            in_list = self._inListMask(self.sourceModel())
+            if source_row < len(in_list) and not in_list[source_row]:
+                return False
+
         # First check the built-in filter (used for title search)
         if not super().filterAcceptsRow(source_row, source_parent):
             return False
@@ -56,7 +234,8 @@ class MovieFilterProxyModel(QtCore.QSortFilterProxyModel):
             return True
         
         # If mode is 'include' and list is empty, show nothing
-        if self.filter_mode == 'include' and not self.filter_movie_list:
+        if (self.filter_mode == 'include' and not self.filter_movie_list and
+                self._row_id_mask is None):
             return False
         
         # Get the source model
@@ -64,31 +243,17 @@ class MovieFilterProxyModel(QtCore.QSortFilterProxyModel):
         if not model:
             return True
         
-        # Get title and year from the source model
+        # Look the row up in the movie list mask built over whole columns
         try:
-            title = model.getTitle(source_row)
-            year = model.getYear(source_row)
-            
-            # Convert year to int for comparison (matching the format in moviesSmdbData)
-            try:
-                year_int = int(year) if year else 0
-            except (ValueError, TypeError):
-                year_int = 0
-            
-            # The filter list contains items from moviesSmdbData which may be lists [title, year]
-            # Convert to tuples for hashing in the set
-            movie_tuple = (title, year_int)
-            
-            # Use a set for faster lookup - convert lists to tuples when building set
-            if not hasattr(self, '_filter_set') or self._filter_set_dirty:
-                self._filter_set = set()
-                for item in self.filter_movie_list:
-                    if isinstance(item, (list, tuple)) and len(item) >= 2:
-                        # Convert to tuple (title, year)
-                        self._filter_set.add((item[0], item[1]))
-                self._filter_set_dirty = False
-            
-            is_in_list = movie_tuple in self._filter_set
+            in_list = self._inListMask(model)
+            if source_row < len(in_list):
+                is_in_list = in_list[source_row]
+            elif self._row_id_mask is not None:
+                is_in_list = False
+            else:
+                movie_tuple = (model.getTitle(source_row),
+                               self._yearInt(model.getYear(source_row)))
+                is_in_list = movie_tuple in self._getFilterSet()
             
             # Return based on filter mode
             if self.filter_mode == 'include':
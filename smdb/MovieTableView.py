@@ -54,8 +54,15 @@ class MovieTableView(QtWidgets.QTableView):
                         source_index = model.mapToSource(index)
                         source_model = model.sourceModel()
                     
+                    # Tooltips are kept by the model until the row changes
+                    if hasattr(source_model, 'getMovieTooltip'):
+                        tooltip = source_model.getMovieTooltip(source_index.row(),
+                                                               self.generateMovieTooltip)
+                        if tooltip:
+                            QtWidgets.QToolTip.showText(help_event.globalPos(), tooltip, self)
+                            return True
                     # Get movie data from the source model
-                    if hasattr(source_model, 'getMovieData'):
+                    elif hasattr(source_model, 'getMovieData'):
                         movie_data = source_model.getMovieData(source_index.row())
                         if movie_data:
                             tooltip = self.generateMovieTooltip(movie_data)
@@ -1,5 +1,9 @@
 import json
 import os
+import array
+import collections
+import concurrent.futures
+import contextlib
 import fnmatch
 import pathlib
 import datetime
@@ -8,6 +12,10 @@ from enum import Enum, auto
 from PyQt5 import QtGui, QtCore
 
 from .utilities import *
+from .columnar_titles import ColumnarTitles, RECORD_FIELDS
+from .smdb_sqlite import SqliteTitles
+from .column_store import ColumnStore, IntCodec, FormattedIntCodec, FloatTextCodec
+from .thumbnail_cache import sharedThumbnailCache
 
 class Columns(Enum):
     Cover = 0
@@ -73,6 +81,153 @@ defaultColumnWidths = {Columns.Cover.value: 150,
                        Columns.DateWatched.value: 150,
                        Columns.SubtitlesExist.value: 65}
 
+# Columns kept as typed arrays in the model's column store
+numericColumnCodecs = {Columns.Year.value: IntCodec(),
+                       Columns.Rating.value: FloatTextCodec(),
+                       Columns.Runtime.value: FormattedIntCodec('%03d'),
+                       Columns.Rank.value: IntCodec(),
+                       Columns.Width.value: IntCodec(),
+                       Columns.Height.value: IntCodec(),
+                       Columns.Channels.value: IntCodec(),
+                       Columns.Size.value: FormattedIntCodec('%05d Mb', 'q')}
+
+# Columns sorted by the number in their text, e.g. '095' or '$1,000'
+numericSortColumns = set(numericColumnCodecs) | {Columns.BoxOffice.value,
+                                                 Columns.SrcSize.value,
+                                                 Columns.DstSize.value}
+
+# Role of the precomputed sort key of a cell (its rank in its column)
+SortKeyRole = QtCore.Qt.UserRole + 1
+
+
+def sortKey(value, numeric=False):
+    """Typed sort key of a cell value: blanks first, then numbers, then text."""
+    if value is None or value == '':
+        return (0, 0)
+    if numeric:
+        if isinstance(value, (int, float)):
+            return (1, value)
+        try:
+            return (1, float(str(value).split()[0].lstrip('$').replace(',', '')))
+        except (ValueError, IndexError):
+            pass
+    return (2, str(value))
+
+def _comma_join(items):
+    if not items:
+        return ''
+    if isinstance(items, (list, tuple)):
+        return ', '.join(str(item) for item in items if item)
+    return str(items)
+
+
+def _formatRuntime(runtime):
+    if not runtime:
+        return '000'
+    try:
+        return f"{int(str(runtime).split()[0]):03d}"
+    except ValueError:
+        # Fall back to original
+        return runtime
+
+
+def _formatRating(rating):
+    if not rating:
+        return '0.0'
+    s = str(rating)
+    return s if ('.' in s) else f"{s}.0"
+
+
+def _formatSubtitlesExist(value):
+    if isinstance(value, bool):
+        return "True" if value else "False"
+    return str(value) if value is not None else ""
+
+# Store column past the table columns holding each movie's cover path: None
+# when the folder was not probed, '' when it has no cover
+COVER_PATH_COLUMN = len(Columns)
+
+# Movie folders probed at once during scans; network shares answer many
+# requests in parallel much faster than one after another
+PROBE_WORKERS = 16
+
+FolderProbe = collections.namedtuple(
+    'FolderProbe', ['jsonExists', 'coverExists', 'coverPath', 'subtitlesExist', 'data', 'error'])
+
+
+def probeMovieFolder(moviePath, movieFolderName, readJson=True):
+    """Find the JSON file, cover and subtitles of a movie folder with one
+    scandir, and read the JSON file.
+
+    Returns:
+        FolderProbe; `coverExists` is for the .jpg cover as in the Cover
+        Exists column, `coverPath` is the .jpg or else the .png cover or ''.
+        `error` is set when the JSON file could not be decoded.
+    """
+    jsonName = os.path.normcase(f"{movieFolderName}.json")
+    jpgName = os.path.normcase(f"{movieFolderName}.jpg")
+    pngName = os.path.normcase(f"{movieFolderName}.png")
+    jsonExists = jpgExists = pngExists = subtitlesExist = False
+    try:
+        with os.scandir(moviePath) as entries:
+            for entry in entries:
+                name = os.path.normcase(entry.name)
+                if name == jsonName:
+                    jsonExists = True
+                elif name == jpgName:
+                    jpgExists = True
+                elif name == pngName:
+                    pngExists = True
+                elif name.lower().endswith('.srt'):
+                    subtitlesExist = True
+    except OSError:
+        pass
+    coverPath = ''
+    if jpgExists:
+        coverPath = os.path.join(moviePath, f"{movieFolderName}.jpg")
+    elif pngExists:
+        coverPath = os.path.join(moviePath, f"{movieFolderName}.png")
+    data = {}
+    error = False
+    if readJson and jsonExists:
+        with open(os.path.join(moviePath, f"{movieFolderName}.json")) as f:
+            try:
+                data = json.load(f)
+            except UnicodeDecodeError:
+                error = True
+    return FolderProbe(jsonExists, jpgExists, coverPath, subtitlesExist, data, error)
+
+
+def probeMovieFolders(folders, progress=None):
+    """probeMovieFolder for (moviePath, movieFolderName) pairs on a thread
+    pool, in order.  `progress(done, total)` is called as they finish."""
+    if not folders:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=PROBE_WORKERS) as executor:
+        probes = []
+        for probe in executor.map(lambda folder: probeMovieFolder(*folder), folders):
+            probes.append(probe)
+            if progress:
+                progress(len(probes) - 1, len(folders))
+        return probes
+
+
+# Fields shown in movie tooltips
+tooltipFields = ('title', 'year', 'genres', 'directors', 'actors', 'rating',
+                 'runtime', 'box office', 'companies', 'plot', 'synopsis')
+
+# Movie JSON files kept in memory for tooltips of movies without a title
+# record, or with one that lacks tooltip fields
+JSON_DOCUMENT_CACHE_SIZE = 256
+
+# Text columns with many repeated values, whose strings are pooled
+pooledColumns = {Columns.Directors.value,
+                 Columns.Countries.value,
+                 Columns.Companies.value,
+                 Columns.Genres.value,
+                 Columns.UserTags.value}
+
+
 class MoviesTableModel(QtCore.QAbstractTableModel):
     emitCoverSignal = QtCore.pyqtSignal(int)
 
@@ -86,8 +241,25 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
 
         super().__init__()
 
-        self.movieSet = set()
-        self._data = []
+        self._movieSet = set()
+        # Column -> (data version, rank of each row) for sorting
+        self._sortRanks = {}
+        # Cover path -> cell waiting for its thumbnail
+        self._coverCells = {}
+        self._thumbnails = None
+        # Title records of the smdb data for tooltips, and an LRU of movie
+        # JSON files by path for movies without one
+        self._records = smdbData.get('titles') if smdbData else None
+        self._documents = collections.OrderedDict()
+        # Row id -> tooltip, until the row's data changes
+        self._tooltips = {}
+        # Open beginUpdate calls, and row -> (first, last) changed column
+        # collected until the last of them ends
+        self._updateDepth = 0
+        self._pendingChanges = {}
+        self.dataChanged.connect(self._rowDataChanged)
+        self._data = ColumnStore(len(Columns) + 1, numericColumnCodecs,
+                                 pooledColumns=pooledColumns)
 
         # Create the header text from the enums
         self._headers = []
@@ -141,6 +313,26 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
         if neverScan and (not smdbData or 'titles' not in smdbData):
             return
 
+        if (modifiedSince is None and not forceScan and smdbData and
+                isinstance(smdbData.get('titles'), (ColumnarTitles, SqliteTitles))):
+            # Rows are built from the memory-mapped titles (or the SQLite
+            # library) as they are shown
+            titles = smdbData['titles']
+            self._titles = titles
+            self._data = ColumnStore(len(Columns) + 1, numericColumnCodecs,
+                                     count=titles.storeLength(),
+                                     buildRow=self._buildColumnarRow,
+                                     pooledColumns=pooledColumns)
+            self._movieSet = None
+            # Titles added, replaced or removed since the store was written
+            changes = titles.changedRecords()
+            if changes:
+                for row in sorted(self.rowsForPaths(changes).values(), reverse=True):
+                    self._data.deleteRows(row, row + 1)
+                self._data.extend([self.createMovieData(record, moviePath, record.get('folder'))
+                                   for moviePath, record in changes.items() if record is not None])
+            return
+
         if modifiedSince is None and not forceScan and smdbData and 'titles' in smdbData:
             # Fast path: use smdb data as-is
             useSmdbData = True
@@ -178,7 +370,6 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
 
                 output(f"Scanned {numMovies} movies for {moviesFolder}")
 
-        totalFolders = len(moviesFolderDict)
         # Precompute threshold for modifiedSince if provided
         threshold_ts = None
         if modifiedSince is not None:
@@ -194,53 +385,50 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
                 except Exception:
                     threshold_ts = None
 
-        for idx, key in enumerate(moviesFolderDict.keys()):
-            movieFolderName = moviesFolderDict[key][0]
+        # Work out which folders are read from disk: all of them unless the
+        # smdb data is used, or only those modified since the given date
+        diskKeys = []
+        for key in moviesFolderDict.keys():
             moviePath = moviesFolderDict[key][1]
-            data = {}
-            force_flag = False
             if modifiedSince is not None and threshold_ts is not None:
                 # Decide per-folder based on mtime
                 mtime_ts = folderMtimes.get(key)
                 is_newer = (mtime_ts is not None and mtime_ts > threshold_ts)
                 if not is_newer and smdbData and 'titles' in smdbData and moviePath in smdbData['titles']:
-                    data = smdbData['titles'][moviePath]
-                    force_flag = False
-                else:
-                    # Process from disk
-                    maybe_progress(idx, totalFolders)
-                    output(f"Processing movie folder: {movieFolderName} at {moviePath}")
-                    jsonFile = os.path.join(moviePath, f'{movieFolderName}.json')
-                    if os.path.exists(jsonFile):
-                        with open(jsonFile) as f:
-                            try:
-                                data = json.load(f)
-                            except UnicodeDecodeError:
-                                output("Error reading %s" % jsonFile)
-                    force_flag = True
+                    continue
+                diskKeys.append(key)
+            elif not useSmdbData:
+                diskKeys.append(key)
+
+        # One scandir and JSON read per folder, many folders at once
+        if forceScan or modifiedSince is not None:
+            output(f"Probing {len(diskKeys)} movie folders ...")
+        probes = dict(zip(diskKeys, probeMovieFolders(
+            [(moviesFolderDict[key][1], moviesFolderDict[key][0]) for key in diskKeys],
+            maybe_progress if (forceScan or modifiedSince is not None) else None)))
+
+        for idx, key in enumerate(moviesFolderDict.keys()):
+            movieFolderName = moviesFolderDict[key][0]
+            moviePath = moviesFolderDict[key][1]
+            data = {}
+            force_flag = False
+            probe = probes.get(key)
+            if probe is None:
+                data = smdbData['titles'][moviePath]
             else:
-                if useSmdbData:
-                    data = smdbData['titles'][moviePath]
-                    force_flag = False
-                else:
-                    if forceScan:
-                        maybe_progress(idx, totalFolders)
-                    if forceScan:
-                        output(f"Processing movie folder: {movieFolderName} at {moviePath}")
-                    jsonFile = os.path.join(moviePath, f'{movieFolderName}.json')
-                    if os.path.exists(jsonFile):
-                        with open(jsonFile) as f:
-                            try:
-                                data = json.load(f)
-                            except UnicodeDecodeError:
-                                output("Error reading %s" % jsonFile)
-                    force_flag = forceScan
+                if forceScan or modifiedSince is not None:
+                    output(f"Processing movie folder: {movieFolderName} at {moviePath}")
+                if probe.error:
+                    output("Error reading %s" % os.path.join(moviePath, f'{movieFolderName}.json'))
+                data = probe.data
+                force_flag = forceScan or modifiedSince is not None
 
             movieData = self.createMovieData(data,
                                              moviePath,
                                              movieFolderName,
                                              False,  # Don't generate new rank here, it's for watch list
-                                             force_flag)
+                                             force_flag,
+                                             probe)
 
             folderName = movieData[Columns.Folder.value]
             self.movieSet.add(folderName)
@@ -250,6 +438,38 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
         self.sort(Columns.Year.value, QtCore.Qt.AscendingOrder)
 
 
+    @property
+    def movieSet(self):
+        """Folder names in the model; built on demand for lazily loaded rows."""
+        if self._movieSet is None:
+            self._movieSet = set()
+            for i, row in self._data.unbuiltRows():
+                self._movieSet.add(self._titles.value(row, 'folder'))
+            for row in self._data.builtRows():
+                self._movieSet.add(self._data.get(row, Columns.Folder.value))
+        return self._movieSet
+
+    @movieSet.setter
+    def movieSet(self, value):
+        self._movieSet = value
+
+    def _buildColumnarRow(self, row):
+        record = self._titles.recordAt(row)
+        return self.createMovieData(record,
+                                    self._titles.keyAt(row),
+                                    record.get('folder'))
+
+    def appendMovieRows(self, rows):
+        """Append a batch of rows built with createMovieData."""
+        if not rows:
+            return
+        first = len(self._data)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(rows) - 1)
+        for movieData in rows:
+            self.movieSet.add(movieData[Columns.Folder.value])
+        self._data.extend(rows)
+        self.endInsertRows()
+
     def addMovieData(self,
                      data,
                      moviePath,
@@ -261,7 +481,9 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
                                          movieFolderName,
                                          generateRank,
                                          force)
-        self.beginInsertRows(self.index(0, 0), 0, 0)
+        row = len(self._data)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.movieSet.add(movieData[Columns.Folder.value])
         self._data.append(movieData)
         self.endInsertRows()
 
@@ -270,14 +492,8 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
                         moviePath,
                         movieFolderName,
                         generateNewRank=False,
-                        force=False):
-
-        def _comma_join(items):
-            if not items:
-                return ''
-            if isinstance(items, (list, tuple)):
-                return ', '.join(str(item) for item in items if item)
-            return str(items)
+                        force=False,
+                        probe=None):
 
         movieData = []
         title_year_cache = None
@@ -288,10 +504,9 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
         keys_by_col = self._keys_by_col
         list_columns = self._list_columns_map
 
-        # Precompute frequently used paths when forcing filesystem checks
-        if force:
-            json_path = os.path.join(moviePath, f"{movieFolderName}.json")
-            cover_path = os.path.join(moviePath, f"{movieFolderName}.jpg")
+        # Check the folder's files with one scandir when forcing filesystem checks
+        if force and probe is None:
+            probe = probeMovieFolder(moviePath, movieFolderName, readJson=False)
 
         for column in Columns:
             if column == Columns.DateModified:
@@ -302,29 +517,20 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
                 movieData.append(moviePath)
             elif column == Columns.JsonExists:
                 if force:
-                    movieData.append("True" if os.path.exists(json_path) else "False")
+                    movieData.append("True" if probe.jsonExists else "False")
                 else:
                     movieData.append("")
             elif column == Columns.CoverExists:
                 if force:
-                    movieData.append("True" if os.path.exists(cover_path) else "False")
+                    movieData.append("True" if probe.coverExists else "False")
                 else:
                     movieData.append("")
             elif column == Columns.SubtitlesExist:
                 if force:
-                    has_srt = any(
-                        f.lower().endswith('.srt') for f in os.listdir(moviePath)
-                    ) if os.path.exists(moviePath) else False
-                    movieData.append("True" if has_srt else "False")
+                    movieData.append("True" if probe.subtitlesExist else "False")
                 else:
                     # Populate from smdb_data.json if available, otherwise blank
-                    val = data_get('subtitles exist')
-                    if isinstance(val, bool):
-                        movieData.append("True" if val else "False")
-                    elif val is not None:
-                        movieData.append(str(val))
-                    else:
-                        movieData.append("")
+                    movieData.append(_formatSubtitlesExist(data_get('subtitles exist')))
             elif column == Columns.Folder:
                 movieData.append(movieFolderName)
             elif column == Columns.Rank and generateNewRank:
@@ -349,29 +555,15 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
                         movieData.append('')
                 else:
                     if column == Columns.Runtime:
-                        runtime = value
-                        if not runtime:
-                            runtime = '000'
-                        else:
-                            try:
-                                runtime = str(runtime).split()[0]
-                                runtime = f"{int(runtime):03d}"
-                            except ValueError:
-                                # Fall back to original
-                                pass
-                        movieData.append(runtime)
+                        movieData.append(_formatRuntime(value))
                     elif column == Columns.Rating:
-                        rating = value
-                        if not rating:
-                            rating = '0.0'
-                        else:
-                            s = str(rating)
-                            rating = s if ('.' in s) else f"{s}.0"
-                        movieData.append(rating)
+                        movieData.append(_formatRating(value))
                     elif column == Columns.MpaaRating:
                         movieData.append(value if value else "No Rating")
                     else:
                         movieData.append(value)
+        # Cover path found by the folder probe, kept past the table columns
+        movieData.append(probe.coverPath if probe is not None else None)
         return movieData
 
     def setMovieDataWithJson(self, row, jsonFile, moviePath, movieFolderName):
@@ -383,12 +575,19 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
                     output("Error reading %s" % jsonFile)
         self.setMovieData(row, data, moviePath, movieFolderName)
 
-    def setMovieData(self, row, data, moviePath, movieFolderName):
-        movieData = self.createMovieData(data, moviePath, movieFolderName)
-        self._data[row] = movieData
-        minIndex = self.index(row, 0)
-        maxIndex = self.index(row, self.getLastColumn())
-        self.dataChanged.emit(minIndex, maxIndex)
+    def setMovieData(self, row, data, moviePath, movieFolderName, probe=None):
+        movieData = self.createMovieData(data, moviePath, movieFolderName,
+                                         force=probe is not None, probe=probe)
+        self._data.setRow(row, movieData)
+        # The data was just read from the movie's JSON file
+        if data:
+            self._cacheDocument(moviePath, data)
+        if probe is None:
+            self.invalidateCover(row)
+        else:
+            # Keep the cover path the probe just found
+            self._reloadThumbnail(row)
+        self._cellsChanged(row, row, 0, self.getLastColumn())
 
     def getHeaders(self):
         return self._headers
@@ -400,66 +599,71 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
         return len(Columns) - 1
 
     def getMpaaRating(self, row):
-        return self._data[row][Columns.MpaaRating.value]
+        return self._data.get(row, Columns.MpaaRating.value)
 
     def getBackupStatus(self, row):
-        return self._data[row][Columns.BackupStatus.value]
+        return self._data.get(row, Columns.BackupStatus.value)
 
     def getSrcSize(self, row):
-        return self._data[row][Columns.SrcSize.value]
+        return self._data.get(row, Columns.SrcSize.value)
 
     def getDstSize(self, row):
-        return self._data[row][Columns.DstSize.value]
+        return self._data.get(row, Columns.DstSize.value)
 
     def getSizeDiff(self, row):
-        return self._data[row][Columns.SizeDiff.value]
+        return self._data.get(row, Columns.SizeDiff.value)
 
     def getYear(self, row):
-        return self._data[row][Columns.Year.value]
+        return self._data.get(row, Columns.Year.value)
 
     def getTitle(self, row):
-        return self._data[row][Columns.Title.value]
+        return self._data.get(row, Columns.Title.value)
 
     def getDateWatched(self, row):
-        return self._data[row][Columns.DateWatched.value]
+        return self._data.get(row, Columns.DateWatched.value)
 
     def getRating(self, row):
-        return self._data[row][Columns.Rating.value]
+        return self._data.get(row, Columns.Rating.value)
 
     def getBoxOffice(self, row):
-        return self._data[row][Columns.BoxOffice.value]
+        return self._data.get(row, Columns.BoxOffice.value)
 
     def getRuntime(self, row):
-        return self._data[row][Columns.Runtime.value]
+        return self._data.get(row, Columns.Runtime.value)
 
     def getId(self, row):
-        return self._data[row][Columns.Id.value]
+        return self._data.get(row, Columns.Id.value)
 
     def getChannels(self, row):
-        return self._data[row][Columns.Channels.value]
+        return self._data.get(row, Columns.Channels.value)
 
     def getDimensions(self, row):
-        width = self._data[row][Columns.Width.value]
-        height = self._data[row][Columns.Height.value]
+        width = self._data.get(row, Columns.Width.value)
+        height = self._data.get(row, Columns.Height.value)
         return width, height
 
     def getFolderName(self, row):
-        return self._data[row][Columns.Folder.value]
+        return self._data.get(row, Columns.Folder.value)
 
     def getPath(self, row):
-        return self._data[row][Columns.Path.value]
+        return self._data.get(row, Columns.Path.value)
 
     def getJsonExists(self, row):
-        return self._data[row][Columns.JsonExists.value]
+        return self._data.get(row, Columns.JsonExists.value)
 
     def getCoverExists(self, row):
-        return self._data[row][Columns.CoverExists.value]
+        return self._data.get(row, Columns.CoverExists.value)
     
     def getCoverPath(self, row):
         """Get the full path to the cover image file for a given row"""
         if row < 0 or row >= len(self._data):
             return None
-        
+
+        # Found when the folder was probed during a scan
+        coverPath = self._data.get(row, COVER_PATH_COLUMN)
+        if coverPath is not None:
+            return coverPath or None
+
         moviePath = self.getPath(row)
         folderName = self.getFolderName(row)
         
@@ -477,48 +681,230 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
         
         return None
 
+    def getThumbnailPath(self, row):
+        return os.path.join(self.getPath(row), '%s.jpg' % self.getFolderName(row))
+
+    def thumbnails(self):
+        if self._thumbnails is None:
+            self._thumbnails = sharedThumbnailCache()
+            self._thumbnails.thumbnailReady.connect(self._thumbnailReady)
+        return self._thumbnails
+
+    def _thumbnailReady(self, coverPath):
+        cell = self._coverCells.pop(coverPath, None)
+        if cell is not None and cell.isValid():
+            index = self.index(cell.row(), cell.column())
+            self.dataChanged.emit(index, index, [QtCore.Qt.DecorationRole])
+
+    def invalidateCover(self, row):
+        """Reload the cover thumbnail of a row, e.g. after a new cover was
+        downloaded."""
+        # Probe the folder again next time the cover path is needed
+        self._data.set(row, COVER_PATH_COLUMN, None)
+        self._reloadThumbnail(row)
+
+    def _reloadThumbnail(self, row):
+        self.thumbnails().invalidate(self.getThumbnailPath(row))
+        index = self.index(row, Columns.Cover.value)
+        self.dataChanged.emit(index, index, [QtCore.Qt.DecorationRole])
+
     def getRank(self, row):
-        return self._data[row][Columns.Rank.value]
+        return self._data.get(row, Columns.Rank.value)
 
     def getSize(self, row):
-        return self._data[row][Columns.Size.value]
+        return self._data.get(row, Columns.Size.value)
+
+    def getGenres(self, row):
+        return self._data.get(row, Columns.Genres.value)
+
+    def getSubtitlesExist(self, row):
+        return self._data.get(row, Columns.SubtitlesExist.value)
 
     def getDuplicate(self, row):
-        return self._data[row][Columns.Duplicate.value]
+        return self._data.get(row, Columns.Duplicate.value)
+
+    def getColumnValues(self, column):
+        """The values of a column for every source row.  Lazily loaded rows
+        are not built; their values are read from the title store."""
+        values = [None] * len(self._data)
+        for row in self._data.builtRows():
+            values[row] = self._data.get(row, column)
+        storedValue = None
+        for row, source in self._data.unbuiltRows():
+            if storedValue is None:
+                storedValue = self._storedValueReader(column)
+            values[row] = storedValue(source)
+        return values
+
+    def _storedValueReader(self, column):
+        """Function of a title store row returning the value createMovieData
+        gives a column for it."""
+        titles = self._titles
+        column = Columns(column)
+        if column == Columns.Path:
+            return titles.keyAt
+        if column in (Columns.JsonExists, Columns.CoverExists):
+            return lambda source: ''
+        if column == Columns.SubtitlesExist:
+            return lambda source: _formatSubtitlesExist(titles.value(source, 'subtitles exist'))
+        if column in self._list_columns_map:
+            field = self._list_columns_map[column]
+            return lambda source: _comma_join(titles.value(source, field))
+        if column == Columns.DateModified:
+            field = 'date'
+        elif column == Columns.DateWatched:
+            field = 'date watched'
+        else:
+            field = self._keys_by_col[column.value]
+        if field not in RECORD_FIELDS:
+            # Not a field of stored title records, so blank
+            return lambda source: ''
+        if column == Columns.Runtime:
+            return lambda source: _formatRuntime(titles.value(source, field))
+        if column == Columns.Rating:
+            return lambda source: _formatRating(titles.value(source, field))
+        if column == Columns.MpaaRating:
+            return lambda source: titles.value(source, field) or "No Rating"
+        return lambda source: titles.value(source, field)
+
+    def getRowIds(self):
+        """Ids of the source rows that stay the same when rows are sorted,
+        moved or deleted, as a numpy array (None without numpy)."""
+        return self._data.rowIds()
+
+    def getColumnArray(self, column):
+        """A numeric column as a numpy array (None without numpy or for a
+        text column); values that are not plain numbers are negative."""
+        return self._data.columnArray(column)
+
+    def getSortRanks(self, column):
+        """Rank of each source row when sorted by a column; equal values
+        share a rank.  Computed once per column until the data changes."""
+        cached = self._sortRanks.get(column)
+        if cached is not None and cached[0] == self._data.version:
+            return cached[1]
+        numeric = column in numericSortColumns
+        keys = [sortKey(value, numeric) for value in self.getColumnValues(column)]
+        ranks = array.array('l', bytes(len(keys) * array.array('l').itemsize))
+        previousKey = None
+        rank = 0
+        for position, row in enumerate(sorted(range(len(keys)), key=keys.__getitem__)):
+            key = keys[row]
+            if key != previousKey:
+                rank = position
+                previousKey = key
+            ranks[row] = rank
+        self._sortRanks[column] = (self._data.version, ranks)
+        return ranks
+
+    def sortRows(self, column, order=QtCore.Qt.AscendingOrder):
+        """Put the rows themselves in sorted order by one pass over the column's
+        sort ranks.  Rows with equal values keep their relative order."""
+        self.emitPendingChanges()
+        ranks = self.getSortRanks(column)
+        newOrder = sorted(range(len(ranks)), key=ranks.__getitem__,
+                          reverse=(order == QtCore.Qt.DescendingOrder))
+        self.layoutAboutToBeChanged.emit([], QtCore.QAbstractItemModel.VerticalSortHint)
+        self._data.permute(newOrder)
+        newRows = array.array('l', bytes(len(newOrder) * array.array('l').itemsize))
+        for newRow, oldRow in enumerate(newOrder):
+            newRows[oldRow] = newRow
+        # Cached ranks of other columns move with their rows
+        for cachedColumn, (version, cachedRanks) in list(self._sortRanks.items()):
+            self._sortRanks[cachedColumn] = (
+                self._data.version,
+                array.array('l', map(cachedRanks.__getitem__, newOrder)))
+        oldIndexes = self.persistentIndexList()
+        self.changePersistentIndexList(
+            oldIndexes,
+            [self.index(newRows[index.row()], index.column()) for index in oldIndexes])
+        self.layoutChanged.emit([], QtCore.QAbstractItemModel.VerticalSortHint)
 
     def getDataSize(self):
         return len(self._data)
 
     def getMovieData(self, row):
         """Get movie data dictionary for tooltip display.
-        
+
+        The title record in memory is used when it has all the tooltip
+        fields; otherwise the movie's JSON file fills in the rest, and is
+        kept in a small LRU.
+
         Args:
             row: Row index in the model
-            
+
         Returns:
             Dictionary with movie information for tooltip
         """
         if row < 0 or row >= len(self._data):
             return None
-        
+
         moviePath = self.getPath(row)
         folderName = self.getFolderName(row)
-        
+
         if not moviePath or not folderName:
             return None
-        
+
+        document = self._documents.get(moviePath)
+        if document is not None:
+            self._documents.move_to_end(moviePath)
+            return document
+
+        record = self._records.get(moviePath) if self._records is not None else None
+        if record and all(field in record for field in tooltipFields):
+            return record
+
         # Read JSON file to get full movie data
         jsonFile = os.path.join(moviePath, f'{folderName}.json')
-        if not os.path.exists(jsonFile):
-            return None
-        
         try:
             with open(jsonFile, 'r', encoding='utf-8') as f:
-                import json
-                movie_data = json.load(f)
-                return movie_data
+                document = json.load(f)
         except Exception:
-            return None
+            document = None
+        if document is None:
+            return record or None
+        document = self._cacheDocument(moviePath, document)
+        if record:
+            movieData = dict(document)
+            movieData.update(record)
+            return movieData
+        return document
+
+    def setTitleRecords(self, titles):
+        """Use new title records of the smdb data for tooltips."""
+        self._records = titles
+        self._documents.clear()
+        self._tooltips.clear()
+
+    def _cacheDocument(self, moviePath, document):
+        """Add a movie JSON document to the LRU, with its cast as the
+        'actors' field of title records."""
+        if 'actors' not in document and 'cast' in document:
+            document = dict(document, actors=document['cast'])
+        self._documents[moviePath] = document
+        self._documents.move_to_end(moviePath)
+        while len(self._documents) > JSON_DOCUMENT_CACHE_SIZE:
+            self._documents.popitem(last=False)
+        return document
+
+    def getMovieTooltip(self, row, generateTooltip):
+        """Tooltip of a row made by `generateTooltip(movieData)`, kept until
+        the row's data changes."""
+        rowId = self._data.rowId(row)
+        tooltip = self._tooltips.get(rowId)
+        if tooltip is None:
+            movieData = self.getMovieData(row)
+            if not movieData:
+                return None
+            tooltip = generateTooltip(movieData)
+            self._tooltips[rowId] = tooltip
+        return tooltip
+
+    def _rowDataChanged(self, topLeft, bottomRight, roles=()):
+        if roles and all(role == QtCore.Qt.DecorationRole for role in roles):
+            return
+        for row in range(topLeft.row(), bottomRight.row() + 1):
+            self._tooltips.pop(self._data.rowId(row), None)
 
     def aboutToChangeLayout(self):
         self.layoutAboutToBeChanged.emit()
@@ -527,57 +913,156 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
         self.layoutChanged.emit()
 
     def addMovie(self, smdbData, moviePath):
-        if moviePath not in smdbData['titles']:
-            return
-
-        movieFolderName = smdbData['titles'][moviePath]['folder']
-
-        data = smdbData['titles'][moviePath]
-        movieData = self.createMovieData(data,
-                                         moviePath,
-                                         movieFolderName,
-                                         generateNewRank=True)
-        folderName = movieData[Columns.Folder.value]
-        if folderName not in self.movieSet:
-            self.movieSet.add(folderName)
-            self._data.append(movieData)
+        self.addMovies(smdbData, [moviePath])
+
+    def addMovies(self, smdbData, moviePaths):
+        """Append the movies of smdb title records that are not in the model
+        yet, ranked after the existing rows, as one row insert."""
+        rows = []
+        folderNames = set()
+        for moviePath in moviePaths:
+            if moviePath not in smdbData['titles']:
+                continue
+            data = smdbData['titles'][moviePath]
+            movieData = self.createMovieData(data, moviePath, data['folder'])
+            folderName = movieData[Columns.Folder.value]
+            if folderName in self.movieSet or folderName in folderNames:
+                continue
+            folderNames.add(folderName)
+            movieData[Columns.Rank.value] = len(self._data) + len(rows)
+            rows.append(movieData)
+        self.appendMovieRows(rows)
 
     def removeMovie(self, row):
-        folderName = self.getFolderName(row)
-        if folderName in self.movieSet:
-            self.movieSet.remove(folderName)
-        del self._data[row]
+        self.removeMovieRows([row])
+
+    def removeMovieRows(self, rows):
+        """Remove rows, with one row removal per run of adjacent rows."""
+        self.emitPendingChanges()
+        rows = sorted(set(rows))
+        while rows:
+            last = rows.pop()
+            first = last
+            while rows and rows[-1] == first - 1:
+                first = rows.pop()
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+            for row in range(first, last + 1):
+                self.movieSet.discard(self.getFolderName(row))
+            self._data.deleteRows(first, last + 1)
+            self.endRemoveRows()
+
+    def rowsForPaths(self, paths):
+        """Movie path -> row for those of `paths` that are in the model,
+        without building lazily loaded rows."""
+        rows = {}
+        for row, source in self._data.unbuiltRows():
+            path = self._titles.keyAt(source)
+            if path in paths:
+                rows[path] = row
+        for row in self._data.builtRows():
+            path = self._data.get(row, Columns.Path.value)
+            if path in paths:
+                rows[path] = row
+        return rows
+
+    def pathsForTitles(self, titles):
+        """Movie paths of the rows with one of `titles`, without building
+        lazily loaded rows."""
+        paths = []
+        for row, source in self._data.unbuiltRows():
+            if self._titles.value(source, 'title') in titles:
+                paths.append(self._titles.keyAt(source))
+        for row in self._data.builtRows():
+            if self._data.get(row, Columns.Title.value) in titles:
+                paths.append(self._data.get(row, Columns.Path.value))
+        return paths
+
+    def removeMoviePaths(self, paths):
+        """Remove the rows of movies by path."""
+        self.removeMovieRows(self.rowsForPaths(set(paths)).values())
 
     def removeMovies(self, minRow, maxRow):
-        # Remove folderName from movieSet
-        for row in range(minRow, maxRow + 1, 1):
-            folderName = self.getFolderName(row)
-            if folderName in self.movieSet:
-                self.movieSet.remove(folderName)
-
-        self.layoutAboutToBeChanged.emit()
-        del self._data[minRow:maxRow+1]
-
-        # Re-number ranks
-        for i in range(len(self._data)):
-            self._data[i][9] = i
-
-        self.layoutChanged.emit()
-
-    def renumberRanks(self):
-        for i in range(len(self._data)):
-            self._data[i][Columns.Rank.value] = i
+        self.removeMovieRows(range(minRow, maxRow + 1))
+        self.renumberRanks(minRow)
+
+    def renumberRanks(self, first=0, last=None):
+        """Set the rank of rows `first` to `last` (default: the last row)
+        to their row number."""
+        if last is None:
+            last = len(self._data) - 1
+        if first > last:
+            return
+        for row in range(first, last + 1):
+            self._data.set(row, Columns.Rank.value, row)
+        self._cellsChanged(first, last, Columns.Rank.value)
 
     def moveRow(self, minRow, maxRow, dstRow):
-        maxRow = maxRow + 1
-        tmpData = self._data[minRow:maxRow]
-        self.layoutAboutToBeChanged.emit()
-        del self._data[minRow:maxRow]
-        self._data[dstRow:dstRow] = tmpData
-
-        self.renumberRanks()
-
-        self.layoutChanged.emit()
+        """Move rows `minRow` to `maxRow` so they start at `dstRow` of the
+        rows that remain, and renumber the ranks of the rows in between."""
+        self.emitPendingChanges()
+        count = maxRow - minRow + 1
+        # Qt counts the destination in rows before the move
+        destination = dstRow if dstRow <= minRow else dstRow + count
+        if not self.beginMoveRows(QtCore.QModelIndex(), minRow, maxRow,
+                                  QtCore.QModelIndex(), destination):
+            return
+        self._data.moveRows(minRow, maxRow + 1, dstRow)
+        self.endMoveRows()
+
+        self.renumberRanks(min(minRow, dstRow), max(maxRow, dstRow + count - 1))
+
+    def beginUpdate(self):
+        """Collect cell changes until the matching endUpdate, which emits
+        them as a few dataChanged ranges instead of one signal per cell.
+        Calls can be nested."""
+        self._updateDepth += 1
+
+    def endUpdate(self):
+        self._updateDepth -= 1
+        if self._updateDepth == 0:
+            self.emitPendingChanges()
+
+    @contextlib.contextmanager
+    def batchUpdate(self):
+        """beginUpdate and endUpdate around a block."""
+        self.beginUpdate()
+        try:
+            yield self
+        finally:
+            self.endUpdate()
+
+    def emitPendingChanges(self):
+        """Emit the cell changes collected so far, e.g. to show progress
+        during a long update: one dataChanged per run of adjacent changed
+        rows, spanning the columns changed in those rows."""
+        pending, self._pendingChanges = self._pendingChanges, {}
+        run = None
+        for row in sorted(pending):
+            first, last = pending[row]
+            if run is not None and row == run[1] + 1:
+                run = [run[0], row, min(run[2], first), max(run[3], last)]
+                continue
+            if run is not None:
+                self.dataChanged.emit(self.index(run[0], run[2]), self.index(run[1], run[3]))
+            run = [row, row, first, last]
+        if run is not None:
+            self.dataChanged.emit(self.index(run[0], run[2]), self.index(run[1], run[3]))
+
+    def _cellsChanged(self, firstRow, lastRow, firstColumn, lastColumn=None):
+        """Report changed cells now, or with the open batch update."""
+        if lastColumn is None:
+            lastColumn = firstColumn
+        if not self._updateDepth:
+            self.dataChanged.emit(self.index(firstRow, firstColumn),
+                                  self.index(lastRow, lastColumn))
+            return
+        pending = self._pendingChanges
+        for row in range(firstRow, lastRow + 1):
+            span = pending.get(row)
+            if span is None:
+                pending[row] = (firstColumn, lastColumn)
+            else:
+                pending[row] = (min(span[0], firstColumn), max(span[1], lastColumn))
 
     def rowCount(self, parent=None):
         return len(self._data)
@@ -586,63 +1071,65 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
         return len(self._headers)
 
     def setBackupStatus(self, index, value):
-        self._data[index.row()][Columns.BackupStatus.value] = value
-        self.dataChanged.emit(index, index)
+        self._data.set(index.row(), Columns.BackupStatus.value, value)
+        self._cellsChanged(index.row(), index.row(), Columns.BackupStatus.value)
 
     def setSrcSize(self, index, value):
-        self._data[index.row()][Columns.SrcSize.value] = value
-        self.dataChanged.emit(index, index)
+        self._data.set(index.row(), Columns.SrcSize.value, value)
+        self._cellsChanged(index.row(), index.row(), Columns.SrcSize.value)
 
     def setDstSize(self, index, value):
-        self._data[index.row()][Columns.DstSize.value] = value
-        self.dataChanged.emit(index, index)
+        self._data.set(index.row(), Columns.DstSize.value, value)
+        self._cellsChanged(index.row(), index.row(), Columns.DstSize.value)
 
     def setSizeDiff(self, index, value):
-        self._data[index.row()][Columns.SizeDiff.value] = value
-        self.dataChanged.emit(index, index)
+        self._data.set(index.row(), Columns.SizeDiff.value, value)
+        self._cellsChanged(index.row(), index.row(), Columns.SizeDiff.value)
 
     def setSize(self, index, value):
-        self._data[index.row()][Columns.Size.value] = value
-        self.dataChanged.emit(index, index)
+        self._data.set(index.row(), Columns.Size.value, value)
+        self._cellsChanged(index.row(), index.row(), Columns.Size.value)
 
     def setDimensions(self, index, width, height):
-        self._data[index.row()][Columns.Width.value] = width
-        self._data[index.row()][Columns.Height.value] = height
-        self.dataChanged.emit(index, index)
+        self._data.set(index.row(), Columns.Width.value, width)
+        self._data.set(index.row(), Columns.Height.value, height)
+        self._cellsChanged(index.row(), index.row(), Columns.Width.value, Columns.Height.value)
 
     def setChannels(self, index, channels):
-        self._data[index.row()][Columns.Channels.value] = channels
-        self.dataChanged.emit(index, index)
+        self._data.set(index.row(), Columns.Channels.value, channels)
+        self._cellsChanged(index.row(), index.row(), Columns.Channels.value)
 
     def setDuplicate(self, index, value):
-        self._data[index.row()][Columns.Duplicate.value] = value
-        self.dataChanged.emit(index, index)
+        self._data.set(index.row(), Columns.Duplicate.value, value)
+        self._cellsChanged(index.row(), index.row(), Columns.Duplicate.value)
 
     def setRank(self, index, value):
-        self._data[index.row()][Columns.Rank.value] = int(value)
-        self.dataChanged.emit(index, index)
+        self._data.set(index.row(), Columns.Rank.value, int(value))
+        self._cellsChanged(index.row(), index.row(), Columns.Rank.value)
 
     def setMpaaRating(self, index, value):
-        self._data[index.row()][Columns.MpaaRating.value] = value
-        self.dataChanged.emit(index, index)
+        self._data.set(index.row(), Columns.MpaaRating.value, value)
+        self._cellsChanged(index.row(), index.row(), Columns.MpaaRating.value)
 
     def setDateWatched(self, index, dateWatched):
-        self._data[index.row()][Columns.DateWatched.value] = dateWatched
-        self.dataChanged.emit(index, index)
+        self._data.set(index.row(), Columns.DateWatched.value, dateWatched)
+        self._cellsChanged(index.row(), index.row(), Columns.DateWatched.value)
 
     def setData(self, index, value, role=QtCore.Qt.EditRole):
         if role == QtCore.Qt.EditRole:
-            self._data[index.row()][index.column()] = value
-            self.dataChanged.emit(index, index)
+            self._data.set(index.row(), index.column(), value)
+            self._cellsChanged(index.row(), index.row(), index.column())
         return True
 
     def data(self, index, role):
         if role == QtCore.Qt.DisplayRole:
-            return self._data[index.row()][index.column()]
+            return self._data.get(index.row(), index.column())
+        elif role == SortKeyRole:
+            return self.getSortRanks(index.column())[index.row()]
         elif role == QtCore.Qt.TextAlignmentRole:
             return QtCore.Qt.AlignLeft
         elif role == QtCore.Qt.BackgroundRole:
-            backupStatus = self._data[index.row()][Columns.BackupStatus.value]
+            backupStatus = self._data.get(index.row(), Columns.BackupStatus.value)
             if not backupStatus:
                 return
             elif backupStatus == "Found":
@@ -657,17 +1144,14 @@ class MoviesTableModel(QtCore.QAbstractTableModel):
                 return QtGui.QBrush(QtGui.QColor("darkgoldenrod"))
         elif role == QtCore.Qt.DecorationRole :
             if index.column() == Columns.Cover.value:
-                row = index.row()
-                folderName = self.getFolderName(row)
-                moviePath = self.getPath(row)
-                coverFile = os.path.join(moviePath, '%s.jpg' % folderName)
-                if os.path.exists(coverFile):
-                    pm = QtGui.QPixmap(coverFile)
-                    if not pm.isNull():
-                        return pm.scaled(200, 200,
-                                         QtCore.Qt.KeepAspectRatio,
-                                         QtCore.Qt.SmoothTransformation)
-                return None
+                # Thumbnails load in the background; the cell is updated
+                # when its thumbnail is ready
+                coverFile = self.getThumbnailPath(index.row())
+                thumbnails = self.thumbnails()
+                pixmap = thumbnails.thumbnail(coverFile)
+                if pixmap is thumbnails.placeholder:
+                    self._coverCells[coverFile] = QtCore.QPersistentModelIndex(index)
+                return pixmap
 
     def headerData(self, section, orientation, role):
         if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
@@ -1,5 +1,6 @@
 from PyQt5 import QtGui, QtWidgets, QtCore
 import os
+from .thumbnail_cache import sharedThumbnailCache
 
 
 # Define available columns for similar movies
@@ -926,14 +927,11 @@ class SimilarMoviesWidget(QtWidgets.QFrame):
                 
                 coverLabel = QtWidgets.QLabel()
                 if os.path.exists(coverFile):
-                    pm = QtGui.QPixmap(coverFile)
-                    if not pm.isNull():
-                        # Scale based on slider value
-                        scale_size = self.coverScaleSlider.value()
-                        scaled_pm = pm.scaled(scale_size, scale_size, 
-                                             QtCore.Qt.KeepAspectRatio,
-                                             QtCore.Qt.SmoothTransformation)
-                        coverLabel.setPixmap(scaled_pm)
+                    # Scale based on slider value, through the thumbnail cache
+                    scale_size = self.coverScaleSlider.value()
+                    image = sharedThumbnailCache().loadImage(coverFile, scale_size)
+                    if not image.isNull():
+                        coverLabel.setPixmap(QtGui.QPixmap.fromImage(image))
                         coverLabel.setAlignment(QtCore.Qt.AlignCenter)
                 else:
                     coverLabel.setText("No Cover")
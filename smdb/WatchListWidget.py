@@ -4,6 +4,7 @@ import os
 
 from .MoviesTableModel import MoviesTableModel, Columns, defaultColumnWidths
 from .MovieTableView import MovieTableView
+from .smdb_journal import setFieldsRecord
 
 
 class MoveTo(Enum):
@@ -196,16 +197,13 @@ class WatchListWidget(QtWidgets.QFrame):
     
     def listAdd(self):
         """Add selected movies from main list to watch list."""
-        self.listTableModel.aboutToChangeLayout()
+        moviePaths = []
         for modelIndex in self.parent.moviesTableView.selectionModel().selectedRows():
             if not self.parent.moviesTableView.isRowHidden(modelIndex.row()):
                 sourceIndex = self.parent.moviesTableProxyModel.mapToSource(modelIndex)
                 sourceRow = sourceIndex.row()
-                moviePath = self.parent.moviesTableModel.getPath(sourceRow)
-                self.listTableModel.addMovie(self.parent.moviesSmdbData,
-                                            moviePath)
-        
-        self.listTableModel.changedLayout()
+                moviePaths.append(self.parent.moviesTableModel.getPath(sourceRow))
+        self.listTableModel.addMovies(self.parent.moviesSmdbData, moviePaths)
         self.parent.writeSmdbFile(self.listSmdbFile,
                                  self.listTableModel,
                                  titlesOnly=True)
@@ -295,6 +293,10 @@ class WatchListWidget(QtWidgets.QFrame):
         self.listTableView.selectionModel().select(selection,
                                                    QtCore.QItemSelectionModel.ClearAndSelect)
         
-        self.parent.writeSmdbFile(self.listSmdbFile,
-                                 self.listTableModel,
-                                 titlesOnly=True)
+        # Only the ranks of the rows between the old and new positions change
+        firstRow = min(minSourceRow, dstRow)
+        lastRow = max(maxSourceRow, dstRow + maxSourceRow - minSourceRow)
+        records = [setFieldsRecord(self.listTableModel.getPath(row),
+                                   {'rank': self.listTableModel.getRank(row)})
+                   for row in range(firstRow, lastRow + 1)]
+        self.parent.journalSmdbEdits(self.listSmdbFile, self.listSmdbData, records)
@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import sys
 from pathlib import Path
@@ -15,6 +16,8 @@ except ImportError:
     from smdb.MainWindow import MainWindow
 
 def main():
+    # Needed for the rebuild process pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     app.setStyle(QtWidgets.QStyleFactory.create('Fusion'))
     MainWindow()
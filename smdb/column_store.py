@@ -0,0 +1,299 @@
+"""Column-oriented row storage for the table models.
+
+`MoviesTableModel` used to keep every row as a Python list of its 30 cell
+values.  `ColumnStore` keeps one sequence per column instead:
+
+- numeric columns are typed `array.array`s (8 bytes or less per cell, and
+  viewable as numpy arrays); a codec converts between the displayed value,
+  e.g. the runtime string '095', and the stored number
+- the other columns are lists; strings of columns with many repeated
+  values (e.g. joined genres) go through the string pool
+
+Values a codec cannot store exactly are kept aside per row, so every cell
+reads back exactly as it was written.  Rows can also be added unbuilt, as a
+row number in a titles store, and are built the first time they are read.
+"""
+import array
+
+from .string_pool import internString
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+class IntCodec:
+    """Non-negative ints stored as-is."""
+
+    def __init__(self, typecode='i'):
+        self.typecode = typecode
+        self.limit = 2 ** (array.array(typecode).itemsize * 8 - 1) - 1
+
+    def encode(self, value):
+        if type(value) is int and 0 <= value <= self.limit:
+            return value
+        return None
+
+    def decode(self, number):
+        return number
+
+
+class FormattedIntCodec(IntCodec):
+    """Strings of a non-negative int in a fixed format, e.g. '095' for '%03d'."""
+
+    def __init__(self, fmt, typecode='i'):
+        super().__init__(typecode)
+        self.fmt = fmt
+
+    def encode(self, value):
+        if not isinstance(value, str):
+            return None
+        try:
+            number = int(value.split()[0])
+        except (ValueError, IndexError):
+            return None
+        if 0 <= number <= self.limit and self.fmt % number == value:
+            return number
+        return None
+
+    def decode(self, number):
+        return self.fmt % number
+
+
+class FloatTextCodec:
+    """Strings of a non-negative float, e.g. '7.5'."""
+
+    typecode = 'd'
+
+    def encode(self, value):
+        if not isinstance(value, str):
+            return None
+        try:
+            number = float(value)
+        except ValueError:
+            return None
+        if number >= 0 and str(number) == value:
+            return number
+        return None
+
+    def decode(self, number):
+        return str(number)
+
+
+# Common values no codec encodes, stored as negative sentinels
+_SPECIAL_VALUES = ('', None, 0)
+
+
+def _specialIndex(value):
+    for i, special in enumerate(_SPECIAL_VALUES):
+        if value is special or (type(value) is type(special) and value == special):
+            return i
+    return None
+
+
+class ColumnStore:
+    """Table rows stored column by column.
+
+    Args:
+        numColumns: Number of columns
+        codecs: Dict of column -> codec for the numeric columns
+        count: Number of unbuilt rows to start with
+        buildRow: Called with a row's store number to get its cell values
+        pooledColumns: Text columns whose strings are pooled
+    """
+
+    def __init__(self, numColumns, codecs, count=0, buildRow=None,
+                 pooledColumns=()):
+        self._numColumns = numColumns
+        self._codecs = [codecs.get(column) for column in range(numColumns)]
+        self._encoders = [self._numericEncoder(column, codec) if codec
+                          else internString if column in pooledColumns
+                          else None
+                          for column, codec in enumerate(self._codecs)]
+        self._columns = [array.array(codec.typecode) if codec else []
+                         for codec in self._codecs]
+        # Values a codec could not encode, by row id
+        self._overflow = [{} if codec else None for codec in self._codecs]
+        self._ids = array.array('q')
+        self._nextId = 0
+        # Bumped on every change to the stored values, for callers caching
+        # things computed from them
+        self.version = 0
+        # Store row of unbuilt rows, -1 once built
+        self._source = array.array('q')
+        self._buildRow = buildRow
+        if count:
+            for column, codec in enumerate(self._codecs):
+                if codec:
+                    self._columns[column].extend(array.array(codec.typecode, bytes(
+                        count * self._columns[column].itemsize)))
+                else:
+                    self._columns[column].extend([None] * count)
+            self._ids.extend(range(count))
+            self._nextId = count
+            self._source.extend(range(count))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _numericEncoder(self, column, codec):
+        encode = codec.encode
+        overflowNumber = -1 - len(_SPECIAL_VALUES)
+
+        def encoder(value, rowId):
+            number = encode(value)
+            if number is not None:
+                return number
+            special = _specialIndex(value)
+            if special is not None:
+                return -1 - special
+            self._overflow[column][rowId] = value
+            return overflowNumber
+        return encoder
+
+    def _encode(self, row, column, value):
+        encoder = self._encoders[column]
+        if encoder is None:
+            self._columns[column][row] = value
+            return
+        rowId = self._ids[row]
+        overflow = self._overflow[column]
+        if overflow:
+            overflow.pop(rowId, None)
+        if encoder is internString:
+            self._columns[column][row] = internString(value)
+        else:
+            self._columns[column][row] = encoder(value, rowId)
+
+    def _build(self, row):
+        source = self._source[row]
+        self._source[row] = -1
+        self._setValues(row, self._buildRow(source))
+
+    def _setValues(self, row, values):
+        for column in range(self._numColumns):
+            self._encode(row, column, values[column])
+
+    def get(self, row, column):
+        if self._source[row] >= 0:
+            self._build(row)
+        codec = self._codecs[column]
+        if codec is None:
+            return self._columns[column][row]
+        number = self._columns[column][row]
+        if number >= 0:
+            return codec.decode(number)
+        special = -1 - int(number)
+        if special < len(_SPECIAL_VALUES):
+            return _SPECIAL_VALUES[special]
+        return self._overflow[column][self._ids[row]]
+
+    def set(self, row, column, value):
+        if self._source[row] >= 0:
+            self._build(row)
+        self._encode(row, column, value)
+        self.version += 1
+
+    def rowId(self, row):
+        """Id of a row that stays the same when rows are moved or deleted."""
+        return self._ids[row]
+
+    def rowIds(self):
+        """Copy of the row ids of all rows as a numpy array, or None."""
+        if np is None:
+            return None
+        return np.array(self._ids, dtype=np.int64)
+
+    def row(self, row):
+        """All cell values of a row as a list."""
+        return [self.get(row, column) for column in range(self._numColumns)]
+
+    def setRow(self, row, values):
+        self._source[row] = -1
+        self._setValues(row, values)
+        self.version += 1
+
+    def append(self, values):
+        self.extend([values])
+
+    def extend(self, rows):
+        columns = list(zip(range(self._numColumns), self._columns, self._encoders))
+        for values in rows:
+            rowId = self._nextId
+            self._nextId += 1
+            for column, sequence, encoder in columns:
+                value = values[column]
+                if encoder is None:
+                    sequence.append(value)
+                elif encoder is internString:
+                    sequence.append(internString(value))
+                else:
+                    sequence.append(encoder(value, rowId))
+            self._ids.append(rowId)
+            self._source.append(-1)
+        self.version += 1
+
+    def deleteRows(self, first, last):
+        """Delete rows `first` to `last`, exclusive."""
+        for column, overflow in enumerate(self._overflow):
+            if overflow:
+                for rowId in self._ids[first:last]:
+                    overflow.pop(rowId, None)
+        for sequence in self._sequences():
+            del sequence[first:last]
+        self.version += 1
+
+    def moveRows(self, first, last, destination):
+        """Move rows `first` to `last` (exclusive) so they start at
+        `destination` of the rows that remain."""
+        for sequence in self._sequences():
+            moved = sequence[first:last]
+            del sequence[first:last]
+            sequence[destination:destination] = moved
+        self.version += 1
+
+    def permute(self, order):
+        """Reorder the rows so that row i is the old row `order[i]`."""
+        for sequence in self._sequences():
+            if isinstance(sequence, array.array):
+                sequence[:] = array.array(sequence.typecode, map(sequence.__getitem__, order))
+            else:
+                sequence[:] = list(map(sequence.__getitem__, order))
+        self.version += 1
+
+    def setColumn(self, column, values):
+        """Set a column for every row, building unbuilt rows first."""
+        for row, value in enumerate(values):
+            self.set(row, column, value)
+
+    def column(self, column):
+        """The values of a column for every row."""
+        return [self.get(row, column) for row in range(len(self))]
+
+    def columnArray(self, column):
+        """Copy of a numeric column as a numpy array, or None.
+
+        Rows whose value is not a plain number hold a negative sentinel.
+        """
+        if np is None or self._codecs[column] is None:
+            return None
+        for row, source in self.unbuiltRows():
+            self._build(row)
+        return np.array(self._columns[column])
+
+    def unbuiltRows(self):
+        """Yield (row, store row) for rows that have not been built yet."""
+        for row, source in enumerate(self._source):
+            if source >= 0:
+                yield row, source
+
+    def builtRows(self):
+        for row, source in enumerate(self._source):
+            if source < 0:
+                yield row
+
+    def _sequences(self):
+        yield from self._columns
+        yield self._ids
+        yield self._source
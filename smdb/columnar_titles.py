@@ -0,0 +1,444 @@
+"""Memory-mapped columnar storage for the SMDB `titles` section.
+
+The `.mpk` file has to be decoded in full before the first row can be shown.
+This store keeps the same title records in a folder of per-field columns next
+to it (`smdb_data_titles/`):
+
+- fixed-width numeric fields are `.npy` arrays opened with `mmap_mode='r'`
+- string and list fields are an offsets array plus a UTF-8 blob
+- anything that does not fit a typed column goes to a per-row JSON column
+
+`ColumnarTitles` exposes the store as a read-only mapping of movie path ->
+title record, decoding a record only when it is first accessed.
+"""
+import os
+import re
+import json
+import bisect
+import shutil
+import collections.abc
+
+import ujson
+
+from .string_pool import internList
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+COLUMNAR_VERSION = 2
+
+# Separator used to store list fields in a string column
+_LIST_SEPARATOR = '\x1f'
+
+_reSizeMb = re.compile(r'^\d{5,} Mb$')
+
+
+def _encodeInt(value):
+    if type(value) is int and -2**31 < value < 2**31:
+        return True, value
+    return False, -1
+
+
+def _encodeRank(value):
+    # Ranks are non-negative ints, or '' for movies of the main table which
+    # are not ranked
+    if value == '':
+        return True, -1
+    if value is None:
+        return True, -2
+    if type(value) is int and 0 <= value < 2**31:
+        return True, value
+    return False, -2
+
+
+def _decodeRank(value):
+    if value < 0:
+        return '' if value == -1 else None
+    return int(value)
+
+
+def _encodeBool(value):
+    if value is None:
+        return True, -1
+    if type(value) is bool:
+        return True, int(value)
+    return False, -1
+
+
+def _decodeBool(value):
+    return None if value < 0 else bool(value)
+
+
+def _encodeRating(value):
+    if value is None:
+        return True, np.nan
+    if type(value) is float:
+        return True, value
+    return False, np.nan
+
+
+def _decodeRating(value):
+    return None if np.isnan(value) else float(value)
+
+
+def _encodeRuntime(value):
+    # Runtimes are stored as strings like '120'
+    if value is None:
+        return True, -1
+    if isinstance(value, str) and value.isdigit() and str(int(value)) == value:
+        return True, int(value)
+    return False, -1
+
+
+def _decodeRuntime(value):
+    return None if value < 0 else str(int(value))
+
+
+def _encodeSize(value):
+    # Sizes are stored as strings like '01234 Mb', or 0 when unknown
+    if type(value) is int and value == 0:
+        return True, -1
+    if isinstance(value, str) and _reSizeMb.match(value):
+        return True, int(value.split()[0])
+    return False, -1
+
+
+def _decodeSize(value):
+    return 0 if value < 0 else '%05d Mb' % value
+
+
+# field -> (dtype, encode, decode)
+NUMERIC_COLUMNS = {
+    'year': ('<i4', _encodeInt, int),
+    'rating': ('<f8', _encodeRating, _decodeRating),
+    'runtime': ('<i4', _encodeRuntime, _decodeRuntime),
+    'size': ('<i8', _encodeSize, _decodeSize),
+    'width': ('<i4', _encodeInt, int),
+    'height': ('<i4', _encodeInt, int),
+    'channels': ('<i4', _encodeInt, int),
+    'rank': ('<i4', _encodeRank, _decodeRank),
+    'known duplicate': ('i1', _encodeBool, _decodeBool),
+}
+
+STRING_COLUMNS = ['folder', 'id', 'title', 'mpaa rating', 'box office', 'path',
+                  'date', 'subtitles exist', 'date watched', 'plot', 'synopsis']
+
+LIST_COLUMNS = ['directors', 'genres', 'user tags', 'countries', 'companies',
+                'actors', 'writers', 'producers', 'composers']
+
+# Field order of a title record, as written by MainWindow.writeSmdbFile
+RECORD_FIELDS = ['folder', 'id', 'title', 'year', 'rating', 'mpaa rating',
+                 'runtime', 'box office', 'directors', 'genres', 'user tags',
+                 'countries', 'companies', 'actors', 'writers', 'producers',
+                 'composers', 'rank', 'width', 'height', 'channels', 'size',
+                 'path', 'date', 'subtitles exist', 'date watched',
+                 'known duplicate', 'plot', 'synopsis']
+
+_KEY_COLUMN = '_key'
+_EXTRA_COLUMN = '_extra'
+
+
+def columnarPath(fileName):
+    """Folder holding the columnar titles store for an SMDB file."""
+    return f"{os.path.splitext(fileName)[0]}_titles"
+
+
+def _columnFile(folder, name, suffix):
+    return os.path.join(folder, f"{name.replace(' ', '_')}{suffix}")
+
+
+def _writeStrings(folder, name, values):
+    """Write a string column as offsets, null flags and a UTF-8 blob."""
+    offsets = np.zeros(len(values) + 1, dtype='<i8')
+    nulls = np.zeros(len(values), dtype='u1')
+    with open(_columnFile(folder, name, '.blob'), 'wb') as blob:
+        position = 0
+        for i, value in enumerate(values):
+            if value is None:
+                nulls[i] = 1
+            else:
+                encoded = value.encode('utf-8')
+                blob.write(encoded)
+                position += len(encoded)
+            offsets[i + 1] = position
+    np.save(_columnFile(folder, name, '.offsets.npy'), offsets)
+    np.save(_columnFile(folder, name, '.nulls.npy'), nulls)
+
+
+def _sourceStamp(sourceFile):
+    st = os.stat(sourceFile)
+    return {'mtime': st.st_mtime, 'size': st.st_size}
+
+
+def writeColumnarTitles(folder, titles, sourceFile):
+    """Write the `titles` mapping to a columnar store.
+
+    Args:
+        folder: Destination folder, replaced atomically once complete
+        titles: Mapping of movie path -> title record
+        sourceFile: The `.mpk` the store was derived from; its size and mtime
+            are recorded so stale stores are ignored on load
+    """
+    if np is None:
+        return
+
+    keys = list(titles.keys())
+    numRows = len(keys)
+    numeric = {name: np.zeros(numRows, dtype=dtype)
+               for name, (dtype, _, _) in NUMERIC_COLUMNS.items()}
+    strings = {name: [None] * numRows for name in STRING_COLUMNS + LIST_COLUMNS}
+    extras = [None] * numRows
+
+    for row, key in enumerate(keys):
+        record = titles[key]
+        extra = {}
+        for name, (_, encode, _) in NUMERIC_COLUMNS.items():
+            value = record.get(name)
+            ok, number = encode(value)
+            numeric[name][row] = number
+            if not ok:
+                extra[name] = value
+        for name in STRING_COLUMNS:
+            value = record.get(name)
+            if value is None or isinstance(value, str):
+                strings[name][row] = value
+            else:
+                extra[name] = value
+        for name in LIST_COLUMNS:
+            value = record.get(name)
+            if value is None:
+                continue
+            if (isinstance(value, list) and
+                    all(isinstance(v, str) and _LIST_SEPARATOR not in v for v in value) and
+                    (len(value) != 1 or value[0])):
+                strings[name][row] = _LIST_SEPARATOR.join(value)
+            else:
+                extra[name] = value
+        for name, value in record.items():
+            if name not in NUMERIC_COLUMNS and name not in strings:
+                extra[name] = value
+        if extra:
+            extras[row] = ujson.dumps(extra)
+
+    tmpFolder = folder + '.tmp'
+    shutil.rmtree(tmpFolder, ignore_errors=True)
+    os.makedirs(tmpFolder)
+    for name, values in numeric.items():
+        np.save(_columnFile(tmpFolder, name, '.npy'), values)
+    for name, values in strings.items():
+        _writeStrings(tmpFolder, name, values)
+    _writeStrings(tmpFolder, _KEY_COLUMN, keys)
+    _writeStrings(tmpFolder, _EXTRA_COLUMN, extras)
+
+    meta = {'version': COLUMNAR_VERSION,
+            'rows': numRows,
+            'sorted': all(keys[i] <= keys[i + 1] for i in range(numRows - 1)),
+            'source': _sourceStamp(sourceFile)}
+    with open(os.path.join(tmpFolder, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+    # Swap the new store in place of the old one
+    oldFolder = folder + '.old'
+    shutil.rmtree(oldFolder, ignore_errors=True)
+    if os.path.exists(folder):
+        os.replace(folder, oldFolder)
+    os.replace(tmpFolder, folder)
+    shutil.rmtree(oldFolder, ignore_errors=True)
+
+
+def openColumnarTitles(fileName):
+    """Open the columnar store for an SMDB file.
+
+    Returns:
+        A `ColumnarTitles`, or None when the store is missing, unreadable or
+        older than the `.mpk` it was derived from.
+    """
+    if np is None:
+        return None
+    folder = columnarPath(fileName)
+    sourceFile = f"{os.path.splitext(fileName)[0]}.mpk"
+    try:
+        with open(os.path.join(folder, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != COLUMNAR_VERSION:
+            return None
+        if meta.get('source') != _sourceStamp(sourceFile):
+            return None
+        return ColumnarTitles(folder, meta)
+    except Exception:
+        return None
+
+
+class _StringColumn:
+    """Memory-mapped string column; values are decoded on access."""
+
+    def __init__(self, folder, name):
+        self.offsets = np.load(_columnFile(folder, name, '.offsets.npy'), mmap_mode='r')
+        self.nulls = np.load(_columnFile(folder, name, '.nulls.npy'), mmap_mode='r')
+        blobFile = _columnFile(folder, name, '.blob')
+        # np.memmap cannot map an empty file
+        if os.path.getsize(blobFile):
+            self.blob = np.memmap(blobFile, dtype='u1', mode='r')
+        else:
+            self.blob = np.zeros(0, dtype='u1')
+
+    def __getitem__(self, row):
+        if self.nulls[row]:
+            return None
+        return self.blob[self.offsets[row]:self.offsets[row + 1]].tobytes().decode('utf-8')
+
+
+class TitleChanges:
+    """Titles added, replaced or removed on top of a read-only title store.
+
+    Titles the library watcher adds or removes are journaled (see
+    `smdb_journal`) and applied here by `setRecord` for the session, until
+    the store is rewritten.  The row interface (`keyAt`, `value`,
+    `recordAt`) keeps reading the store as written, which is what the
+    lazily built rows of the movies model refer to.
+    """
+    _changes = None
+
+    def setRecord(self, key, record):
+        """Add or replace the title record of a movie path; None removes it."""
+        if self._changes is None:
+            self._changes = {}
+        self._changes[key] = record
+
+    def storeLength(self):
+        """Number of rows of the store as written."""
+        return self._rows
+
+    def changedRecords(self):
+        """Movie path -> title record (None when removed) of the titles
+        changed since the store was written."""
+        return dict(self._changes or {})
+
+    def __len__(self):
+        length = self._rows
+        for key, record in (self._changes or {}).items():
+            length += (record is not None) - (self.rowOf(key) is not None)
+        return length
+
+    def __iter__(self):
+        changes = self._changes or {}
+        for key in self._storeKeys():
+            if key not in changes or changes[key] is not None:
+                yield key
+        for key, record in changes.items():
+            if record is not None and self.rowOf(key) is None:
+                yield key
+
+    def __contains__(self, key):
+        if self._changes and key in self._changes:
+            return self._changes[key] is not None
+        return self.rowOf(key) is not None
+
+    def __getitem__(self, key):
+        if self._changes and key in self._changes:
+            record = self._changes[key]
+        else:
+            row = self.rowOf(key)
+            record = self.recordAt(row) if row is not None else None
+        if record is None:
+            raise KeyError(key)
+        return record
+
+
+class ColumnarTitles(TitleChanges, collections.abc.Mapping):
+    """Read-only mapping of movie path -> title record backed by a columnar store.
+
+    Decoded records are cached, so in-place edits such as
+    `titles[path]['date watched'] = ...` persist for the session.
+    """
+
+    def __init__(self, folder, meta):
+        self.folder = folder
+        self._rows = meta['rows']
+        self._sorted = meta.get('sorted', False)
+        self._numeric = {name: np.load(_columnFile(folder, name, '.npy'), mmap_mode='r')
+                         for name in NUMERIC_COLUMNS}
+        self._strings = {name: _StringColumn(folder, name)
+                         for name in STRING_COLUMNS + LIST_COLUMNS}
+        self._keys = _StringColumn(folder, _KEY_COLUMN)
+        self._extras = _StringColumn(folder, _EXTRA_COLUMN)
+        self._records = {}
+        self._keyToRow = None
+
+    def _storeKeys(self):
+        for row in range(self._rows):
+            yield self._keys[row]
+
+    def keyAt(self, row):
+        return self._keys[row]
+
+    def rowOf(self, key):
+        """Row of a movie path; a binary search over the sorted key column."""
+        if not isinstance(key, str):
+            return None
+        if self._sorted:
+            keys = _KeyView(self._keys, self._rows)
+            row = bisect.bisect_left(keys, key)
+            if row < self._rows and keys[row] == key:
+                return row
+            return None
+        if self._keyToRow is None:
+            self._keyToRow = {k: row for row, k in enumerate(self._storeKeys())}
+        return self._keyToRow.get(key)
+
+    def value(self, row, field):
+        """Read a single field of a row without decoding the whole record."""
+        if row in self._records:
+            return self._records[row].get(field)
+        extra = self._extras[row]
+        if extra is not None:
+            extra = ujson.loads(extra)
+            if field in extra:
+                return extra[field]
+        if field in NUMERIC_COLUMNS:
+            return NUMERIC_COLUMNS[field][2](self._numeric[field][row])
+        if field in self._strings:
+            value = self._strings[field][row]
+            if field in LIST_COLUMNS and value is not None:
+                return internList(value.split(_LIST_SEPARATOR)) if value else []
+            return value
+        return None
+
+    def recordAt(self, row):
+        """Decode (and cache) the full title record of a row."""
+        record = self._records.get(row)
+        if record is not None:
+            return record
+        extra = self._extras[row]
+        extra = ujson.loads(extra) if extra is not None else {}
+        record = {}
+        for name in RECORD_FIELDS:
+            if name in extra:
+                record[name] = extra.pop(name)
+            elif name in NUMERIC_COLUMNS:
+                record[name] = NUMERIC_COLUMNS[name][2](self._numeric[name][row])
+            elif name in LIST_COLUMNS:
+                value = self._strings[name][row]
+                record[name] = (internList(value.split(_LIST_SEPARATOR)) if value else []) if value is not None else None
+            elif name in self._strings:
+                record[name] = self._strings[name][row]
+        record.update(extra)
+        self._records[row] = record
+        return record
+
+
+class _KeyView:
+    """Sequence view over the key column for `bisect`."""
+
+    def __init__(self, column, length):
+        self._column = column
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, row):
+        return self._column[row]
@@ -0,0 +1,134 @@
+"""Row sets of filter facet values for the primary and secondary filters.
+
+A filter selection used to be turned into a list of (title, year) pairs,
+which the filter proxy then looked up for every row.  `FacetBitmaps` keeps,
+for each facet value (an index section key, e.g. a director or a year), the
+rows of the movies table it covers, by row id (see `ColumnStore.rowId`), so
+the sets stay valid when the table is sorted or rows are moved.
+
+Each set is stored like a Roaring bitmap container: a sorted array of row
+ids for values covering few rows, a packed bitmap for the rest.  Selections
+combine as OR within a facet and AND across facets into a boolean mask over
+row ids, which the filter proxy takes as is (see
+`MovieFilterProxyModel.setRowIdFilter`).  A filter click costs the size of
+the selected sets, not a pass over the library.
+
+Sets are built on first use and dropped when rows are added, removed or
+reset, or their title or year changes.
+"""
+from PyQt5 import QtCore
+
+from .MoviesTableModel import Columns
+from .smdb_records import indexEntryKeys, MOVIE_IDS_SECTION
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Share of all row ids above which a set is stored as a bitmap rather than
+# an array: 4 bytes per array entry against 1 bit per row id
+BITMAP_DENSITY = 1 / 32
+
+
+def _yearInt(year):
+    try:
+        return int(year) if year else 0
+    except (ValueError, TypeError):
+        return 0
+
+
+class FacetBitmaps(QtCore.QObject):
+    """Row sets of the index section keys of SMDB data over a movies model.
+    Needs numpy; `selectionMask` returns None without it."""
+
+    def __init__(self, smdbData, model):
+        super().__init__(model)
+        self.smdbData = smdbData
+        self.model = model
+        # (section, key) -> sorted int32 row ids, or packed bits
+        self._sets = {}
+        # (title, year) -> row ids, and the number of row ids
+        self._rowsByMovie = None
+        self._numIds = 0
+        for signal in (model.rowsInserted, model.rowsRemoved, model.modelReset):
+            signal.connect(self.invalidate)
+        model.dataChanged.connect(self._dataChanged)
+
+    def invalidate(self, *args):
+        self._sets = {}
+        self._rowsByMovie = None
+
+    def _dataChanged(self, topLeft, bottomRight, roles=()):
+        for column in (Columns.Title.value, Columns.Year.value):
+            if topLeft.column() <= column <= bottomRight.column():
+                self.invalidate()
+                return
+
+    def _movieRows(self):
+        if self._rowsByMovie is None:
+            rowIds = self.model.getRowIds()
+            titles = self.model.getColumnValues(Columns.Title.value)
+            years = self.model.getColumnValues(Columns.Year.value)
+            self._rowsByMovie = {}
+            for rowId, title, year in zip(rowIds.tolist(), titles, years):
+                self._rowsByMovie.setdefault((title, _yearInt(year)), []).append(rowId)
+            self._numIds = int(rowIds.max()) + 1 if len(rowIds) else 0
+        return self._rowsByMovie
+
+    def rowSet(self, section, key):
+        """Row ids of the movies of an index entry, as a sorted int32 array
+        or a packed bitmap (uint8)."""
+        rowSet = self._sets.get((section, key))
+        if rowSet is not None:
+            return rowSet
+        rowsByMovie = self._movieRows()
+        entry = (self.smdbData.get(section) or {}).get(key)
+        rowIds = []
+        if entry:
+            titleYears = None
+            for movie in indexEntryKeys(entry):
+                if type(movie) is int:
+                    if titleYears is None:
+                        titleYears = self.smdbData[MOVIE_IDS_SECTION]
+                    movie = titleYears[movie]
+                rowIds.extend(rowsByMovie.get((movie[0], _yearInt(movie[1])), ()))
+        rowIds = np.unique(np.array(rowIds, dtype=np.int32))
+        if len(rowIds) > self._numIds * BITMAP_DENSITY:
+            bits = np.zeros(self._numIds, dtype=bool)
+            bits[rowIds] = True
+            rowSet = np.packbits(bits)
+        else:
+            rowSet = rowIds
+        self._sets[(section, key)] = rowSet
+        return rowSet
+
+    def _orInto(self, mask, rowSet):
+        if rowSet.dtype == np.uint8:
+            mask |= np.unpackbits(rowSet, count=len(mask)).view(bool)
+        else:
+            mask[rowSet] = True
+
+    def selectionMask(self, selections):
+        """Mask over row ids of the movies matching filter selections.
+
+        Args:
+            selections: List of (index section, keys) pairs; a movie matches
+                when it has one of the keys of every pair
+
+        Returns:
+            A boolean numpy array indexed by row id, or None without numpy.
+        """
+        if np is None:
+            return None
+        self._movieRows()
+        mask = None
+        for section, keys in selections:
+            facetMask = np.zeros(self._numIds, dtype=bool)
+            for key in keys:
+                self._orInto(facetMask, self.rowSet(section, key))
+            if mask is None:
+                mask = facetMask
+            else:
+                mask &= facetMask
+        return mask if mask is not None else np.zeros(self._numIds, dtype=bool)
@@ -0,0 +1,303 @@
+"""Live watching of the movies folders.
+
+`LibraryWatcher` reports movie folders that were added, removed or renamed
+under the movies roots, and movie folders whose files changed (e.g. a new
+JSON file or cover), so the movie list can be updated without a rescan.
+
+Local roots are watched with a `QFileSystemWatcher`: the root itself for
+movie folders coming and going, and each movie folder and its JSON file for
+changed files.  Network shares do not report changes made by other machines,
+so those roots, and roots with more movies than the watch budget, are polled
+instead: a background thread lists the root and stats the files of each
+movie folder, and the snapshot is compared with the previous one.
+
+Events arrive in bursts (copying a movie folder touches many files), so they
+are collected and reported together once things have been quiet for
+`debounceMs`, as one `libraryChanged(added, removed, changed)` of movie
+folder paths.  A renamed folder is reported as removed and added.
+"""
+import os
+import sys
+import fnmatch
+import threading
+import concurrent.futures
+
+from PyQt5 import QtCore
+
+# Quiet time before collected changes are reported
+DEBOUNCE_MS = 2000
+# Interval between polls of roots that are not watched
+POLL_SECONDS = 120
+# Watched paths (roots, movie folders and JSON files) before falling back
+# to polling; inotify and Windows handles are limited
+MAX_WATCHED_PATHS = 8000
+# Concurrent movie folder listings while polling
+POLL_WORKERS = 16
+
+# File systems that do not notify about changes made by other machines
+NETWORK_FILE_SYSTEMS = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', '9p', 'afpfs',
+                        'davfs', 'fuse.sshfs', 'fuse.rclone', 'sshfs'}
+
+
+def _mountType(path):
+    """File system type of the mount a path is on, from /proc/mounts."""
+    try:
+        with open('/proc/mounts') as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return None
+    path = os.path.realpath(path)
+    best, bestType = '', None
+    for mountPoint, fsType in mounts:
+        mountPoint = mountPoint.replace('\\040', ' ')
+        prefix = os.path.join(mountPoint, '')
+        if ((path == mountPoint or path.startswith(prefix)) and
+                len(mountPoint) > len(best)):
+            best, bestType = mountPoint, fsType
+    return bestType
+
+
+def isNetworkPath(path):
+    """Whether a path is on a network share."""
+    if sys.platform == 'win32':
+        if path.startswith('\\\\') or path.startswith('//'):
+            return True
+        drive = os.path.splitdrive(os.path.abspath(path))[0]
+        if not drive:
+            return False
+        try:
+            import ctypes
+            DRIVE_REMOTE = 4
+            return ctypes.windll.kernel32.GetDriveTypeW(drive + '\\') == DRIVE_REMOTE
+        except (ImportError, AttributeError, OSError):
+            return False
+    return _mountType(path) in NETWORK_FILE_SYSTEMS
+
+
+def listMovieFolders(root):
+    """Movie folder path -> folder name of the movie folders in a root."""
+    folders = {}
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir() and fnmatch.fnmatch(entry.name, '*(*)'):
+                        folders[entry.path] = entry.name
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return folders
+
+
+def movieFolderFingerprint(moviePath):
+    """Name, size and mtime of the files in a movie folder, which change
+    whenever one of its files is added, removed or rewritten."""
+    files = []
+    try:
+        with os.scandir(moviePath) as entries:
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((entry.name, stat.st_size, stat.st_mtime_ns))
+    except OSError:
+        return None
+    return tuple(sorted(files))
+
+
+def snapshotRoots(roots):
+    """Movie folder path -> fingerprint for all movie folders of the roots."""
+    folders = []
+    for root in roots:
+        folders.extend(listMovieFolders(root))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=POLL_WORKERS) as executor:
+        return dict(zip(folders, executor.map(movieFolderFingerprint, folders)))
+
+
+class LibraryWatcher(QtCore.QObject):
+    # Added, removed and changed movie folder paths
+    libraryChanged = QtCore.pyqtSignal(list, list, list)
+    # Snapshot of the polled roots, from the poll thread
+    _polled = QtCore.pyqtSignal(object)
+
+    def __init__(self, roots, parent=None,
+                 debounceMs=DEBOUNCE_MS,
+                 pollSeconds=POLL_SECONDS,
+                 maxWatchedPaths=MAX_WATCHED_PATHS):
+        super().__init__(parent)
+        self.roots = list(roots)
+        self.maxWatchedPaths = maxWatchedPaths
+        # Watched root -> {movie folder path: folder name}
+        self._listings = {}
+        self._pollRoots = []
+        self._snapshot = None
+        self._polling = False
+        self._dirtyRoots = set()
+        self._dirtyFolders = set()
+        self._added = set()
+        self._removed = set()
+        self._changed = set()
+
+        self._watcher = QtCore.QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._directoryChanged)
+        self._watcher.fileChanged.connect(self._fileChanged)
+
+        self._debounceTimer = QtCore.QTimer(self)
+        self._debounceTimer.setSingleShot(True)
+        self._debounceTimer.setInterval(debounceMs)
+        self._debounceTimer.timeout.connect(self._flush)
+
+        self._pollTimer = QtCore.QTimer(self)
+        self._pollTimer.setInterval(pollSeconds * 1000)
+        self._pollTimer.timeout.connect(self._poll)
+        self._polled.connect(self._pollDone, QtCore.Qt.QueuedConnection)
+
+    def start(self):
+        """Start watching; roots that do not exist are skipped."""
+        numWatched = 0
+        for root in self.roots:
+            if not os.path.isdir(root):
+                continue
+            if isNetworkPath(root):
+                self._pollRoots.append(root)
+                continue
+            listing = listMovieFolders(root)
+            paths = self._folderPaths(listing)
+            if numWatched + len(paths) + 1 > self.maxWatchedPaths:
+                self._pollRoots.append(root)
+                continue
+            self._listings[root] = listing
+            self._watcher.addPath(root)
+            if paths:
+                self._watcher.addPaths(paths)
+            numWatched += len(paths) + 1
+        if self._pollRoots:
+            # The first poll is the baseline the later ones are compared with
+            self._poll()
+            self._pollTimer.start()
+
+    def stop(self):
+        self._pollTimer.stop()
+        self._debounceTimer.stop()
+        paths = self._watcher.directories() + self._watcher.files()
+        if paths:
+            self._watcher.removePaths(paths)
+        self._listings = {}
+        self._pollRoots = []
+        self._snapshot = None
+
+    def watchedRoots(self):
+        return list(self._listings)
+
+    def polledRoots(self):
+        return list(self._pollRoots)
+
+    def requeue(self, added, removed, changed):
+        """Report changes again with the next batch, e.g. when they could
+        not be applied yet."""
+        self._added.update(added)
+        self._removed.update(removed)
+        self._changed.update(changed)
+        self._debounceTimer.start()
+
+    @staticmethod
+    def _folderPaths(listing):
+        paths = []
+        for moviePath, folderName in listing.items():
+            paths.append(moviePath)
+            jsonFile = os.path.join(moviePath, f"{folderName}.json")
+            if os.path.exists(jsonFile):
+                paths.append(jsonFile)
+        return paths
+
+    def _rootOf(self, path):
+        parent = os.path.dirname(path)
+        return parent if parent in self._listings else None
+
+    def _directoryChanged(self, path):
+        if path in self._listings:
+            self._dirtyRoots.add(path)
+        else:
+            self._dirtyFolders.add(path)
+        self._debounceTimer.start()
+
+    def _fileChanged(self, path):
+        self._dirtyFolders.add(os.path.dirname(path))
+        self._debounceTimer.start()
+
+    def _flush(self):
+        # Folders that disappeared are picked up by listing their root
+        for moviePath in self._dirtyFolders:
+            root = self._rootOf(moviePath)
+            if root is not None and not os.path.isdir(moviePath):
+                self._dirtyRoots.add(root)
+
+        added, removed = set(), set()
+        for root in self._dirtyRoots:
+            oldListing = self._listings[root]
+            listing = listMovieFolders(root)
+            self._listings[root] = listing
+            newPaths = [path for path in listing if path not in oldListing]
+            oldPaths = [path for path in oldListing if path not in listing]
+            added.update(newPaths)
+            removed.update(oldPaths)
+            if newPaths:
+                self._watcher.addPaths(self._folderPaths(
+                    {path: listing[path] for path in newPaths}))
+            if oldPaths:
+                watched = set(self._watcher.directories() + self._watcher.files())
+                stale = [path for path in self._folderPaths(
+                    {path: oldListing[path] for path in oldPaths}) if path in watched]
+                if stale:
+                    self._watcher.removePaths(stale)
+
+        changed = set()
+        watchedFiles = set(self._watcher.files())
+        for moviePath in self._dirtyFolders:
+            root = self._rootOf(moviePath)
+            if root is None or moviePath not in self._listings[root]:
+                continue
+            changed.add(moviePath)
+            # A JSON file replaced by a rename is no longer watched
+            jsonFile = os.path.join(moviePath, f"{self._listings[root][moviePath]}.json")
+            if jsonFile not in watchedFiles and os.path.exists(jsonFile):
+                self._watcher.addPath(jsonFile)
+        self._dirtyRoots.clear()
+        self._dirtyFolders.clear()
+
+        # Merge with changes found by polling or queued again
+        added |= self._added
+        removed |= self._removed
+        changed |= self._changed
+        self._added, self._removed, self._changed = set(), set(), set()
+        # A folder removed and added again within the batch is a change
+        changed |= added & removed
+        added -= changed
+        removed -= changed
+        changed -= added | removed
+        if added or removed or changed:
+            self.libraryChanged.emit(sorted(added), sorted(removed), sorted(changed))
+
+    def _poll(self):
+        if self._polling:
+            return
+        self._polling = True
+        roots = list(self._pollRoots)
+        threading.Thread(target=lambda: self._polled.emit(snapshotRoots(roots)),
+                         daemon=True).start()
+
+    def _pollDone(self, snapshot):
+        self._polling = False
+        if not self._pollRoots:
+            return
+        previous, self._snapshot = self._snapshot, snapshot
+        if previous is None:
+            return
+        added = [path for path in snapshot if path not in previous]
+        removed = [path for path in previous if path not in snapshot]
+        changed = [path for path in snapshot
+                   if path in previous and snapshot[path] != previous[path]]
+        if added or removed or changed:
+            self.requeue(added, removed, changed)
@@ -0,0 +1,219 @@
+"""Media info of movie files, probed in worker processes and cached.
+
+`probeMovieMedia` finds the movie file of each movie folder and the folder's
+size with a thread pool (one scandir per directory, which is what matters on
+network shares), then runs `MediaInfo.parse` on the movie files in a process
+pool, since parsing is CPU bound and the GIL would serialize it in threads.
+
+The media info of each movie file is kept in a sidecar next to the SMDB file
+(`<base>.media.json`), keyed by file path, size and mtime, so probing a
+selection or the whole library again only parses new or changed files.
+"""
+import os
+import collections
+import concurrent.futures
+
+import ujson
+from pymediainfo import MediaInfo
+
+VIDEO_EXTENSIONS = ('.mkv', '.mpg', '.mp4', '.avi', '.flv', '.wmv', '.m4v', '.divx', '.ogm')
+
+# Concurrent folder listings
+SCAN_WORKERS = 16
+# Movie files per worker process task, and the fewest worth a process pool
+PROBE_CHUNK_SIZE = 8
+MIN_PROCESS_FILES = 16
+
+FolderMedia = collections.namedtuple(
+    'FolderMedia', ['movieFile', 'fileSize', 'fileMtime', 'folderSize'])
+
+
+def mediaCachePath(fileName):
+    return f"{os.path.splitext(fileName)[0]}.media.json"
+
+
+def formatFolderSize(numBytes):
+    """Folder size as stored in movie JSON files, e.g. '01234 Mb'."""
+    return '%05d Mb' % (numBytes / (2**20))
+
+
+def scanMovieFolder(moviePath):
+    """The first movie file in a movie folder, its size and mtime, and the
+    total size of the folder's files.  None when the folder is missing."""
+    movieFile = None
+    fileSize = fileMtime = 0
+    folderSize = 0
+    folders = [moviePath]
+    while folders:
+        folder = folders.pop()
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_symlink():
+                            continue
+                        if entry.is_dir():
+                            folders.append(entry.path)
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    folderSize += stat.st_size
+                    if (movieFile is None and folder == moviePath and
+                            os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS):
+                        movieFile = entry.path
+                        fileSize = stat.st_size
+                        fileMtime = stat.st_mtime_ns
+        except OSError:
+            if folder == moviePath:
+                return None
+    return FolderMedia(movieFile, fileSize, fileMtime, folderSize)
+
+
+def probeMediaFile(movieFile):
+    """Width, height, audio channels, video codec and duration (ms) of a
+    movie file, or None when it could not be parsed."""
+    try:
+        media = MediaInfo.parse(movieFile)
+    except Exception:
+        return None
+    info = {'width': 0, 'height': 0, 'channels': 0, 'codec': '', 'duration': 0}
+    for track in media.tracks:
+        if track.track_type == 'Video':
+            info['width'] = track.width or 0
+            info['height'] = track.height or 0
+            info['codec'] = track.format or ''
+        elif track.track_type == 'Audio':
+            info['channels'] = track.channel_s or 0
+        elif track.track_type == 'General' and track.duration:
+            try:
+                info['duration'] = int(float(track.duration))
+            except (TypeError, ValueError):
+                pass
+    return info
+
+
+def _probeMediaFiles(movieFiles):
+    return [probeMediaFile(movieFile) for movieFile in movieFiles]
+
+
+class MediaProbeCache:
+    """Media info by movie file path, valid while the file's size and mtime
+    are unchanged."""
+
+    def __init__(self, fileName):
+        self.fileName = fileName
+        # Movie file -> [size, mtime, info]
+        self._entries = {}
+        self._dirty = False
+        try:
+            with open(fileName, 'r', encoding='utf-8') as f:
+                self._entries = ujson.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, movieFile, size, mtime):
+        entry = self._entries.get(movieFile)
+        if entry and entry[0] == size and entry[1] == mtime:
+            return entry[2]
+        return None
+
+    def put(self, movieFile, size, mtime, info):
+        self._entries[movieFile] = [size, mtime, info]
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        tmpFile = f"{self.fileName}.tmp"
+        with open(tmpFile, 'w', encoding='utf-8') as f:
+            ujson.dump(self._entries, f)
+        os.replace(tmpFile, self.fileName)
+        self._dirty = False
+
+
+def probeMovieMedia(moviePaths, cache=None, progress=None):
+    """Media info of the movie file of each movie folder.
+
+    Args:
+        moviePaths: Movie folder paths
+        cache: MediaProbeCache to read and update, or None
+        progress: Called with (done, total) as files are parsed; returning
+            False cancels
+
+    Returns:
+        Dict of movie folder path -> dict with 'width', 'height', 'channels',
+        'codec', 'duration', 'file size' and 'folder size' (bytes); the media
+        fields are empty when the folder has no movie file or it could not
+        be parsed.  Folders that do not exist are left out.  None if cancelled.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        folders = dict(zip(moviePaths, executor.map(scanMovieFolder, moviePaths)))
+
+    infos = {}
+    misses = []
+    for folder in folders.values():
+        if folder is None or folder.movieFile is None or folder.movieFile in infos:
+            continue
+        info = cache.get(folder.movieFile, folder.fileSize, folder.fileMtime) if cache else None
+        if info is not None:
+            infos[folder.movieFile] = info
+        else:
+            infos[folder.movieFile] = None
+            misses.append(folder)
+
+    # Parse the new and changed movie files, in worker processes for larger
+    # batches, falling back to this process if the pool cannot start
+    missFiles = [folder.movieFile for folder in misses]
+    chunks = [missFiles[i:i + PROBE_CHUNK_SIZE]
+              for i in range(0, len(missFiles), PROBE_CHUNK_SIZE)]
+    parsed = {}
+    numWorkers = os.cpu_count() or 1
+    if len(missFiles) >= MIN_PROCESS_FILES and numWorkers > 1:
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=numWorkers) as executor:
+                futures = {executor.submit(_probeMediaFiles, chunk): chunk for chunk in chunks}
+                pending = set(futures)
+                while pending:
+                    finished, pending = concurrent.futures.wait(
+                        pending, timeout=0.1,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in finished:
+                        parsed.update(zip(futures[future], future.result()))
+                    if progress and progress(len(parsed), len(missFiles)) is False:
+                        for future in pending:
+                            future.cancel()
+                        return None
+        except Exception:
+            parsed = {}
+    for chunk in chunks:
+        if chunk[0] in parsed:
+            continue
+        parsed.update(zip(chunk, _probeMediaFiles(chunk)))
+        if progress and progress(len(parsed), len(missFiles)) is False:
+            return None
+
+    for folder in misses:
+        info = parsed.get(folder.movieFile)
+        infos[folder.movieFile] = info
+        if info is not None and cache is not None:
+            cache.put(folder.movieFile, folder.fileSize, folder.fileMtime, info)
+    if cache is not None:
+        try:
+            cache.save()
+        except OSError:
+            pass
+
+    empty = {'width': 0, 'height': 0, 'channels': 0, 'codec': '', 'duration': 0}
+    results = {}
+    for moviePath, folder in folders.items():
+        if folder is None:
+            continue
+        media = dict(infos.get(folder.movieFile) or empty)
+        media['file size'] = folder.fileSize
+        media['folder size'] = folder.folderSize
+        results[moviePath] = media
+    return results
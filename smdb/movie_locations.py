@@ -0,0 +1,116 @@
+"""In-memory index of where movie folders are.
+
+`MainWindow.findMovie` is called for every movie by whole-library loops
+(rebuilding the SMDB file, finding duplicates, backups).  Checking the stored
+path and then each movies root on disk costs several round trips per movie on
+a network share.  `MovieLocationIndex` lists each root once and answers from
+memory:
+
+- folder name -> movie folder paths with that name, over all roots
+- the set of movie folder paths, to confirm a stored path without a stat
+
+A root's listing is redone when it is older than `LISTING_SECONDS`, when the
+roots change, or after `invalidate()`; the library watcher patches it with
+folders it sees added or removed.
+"""
+import os
+import time
+import fnmatch
+
+from .library_watcher import listMovieFolders
+from .smdb_shards import rootOf, availableRoots
+
+# Age after which a root is listed again on the next lookup
+LISTING_SECONDS = 300
+
+
+def _key(path):
+    return os.path.normcase(path)
+
+
+class MovieLocationIndex:
+    def __init__(self, listingSeconds=LISTING_SECONDS):
+        self.listingSeconds = listingSeconds
+        self._roots = []
+        # Root -> (time listed, {movie folder path: folder name})
+        self._listings = {}
+        # Folder name key -> {path key: path}
+        self._byName = {}
+
+    def invalidate(self):
+        """List the roots again on the next lookup, e.g. after a rescan."""
+        self._listings = {}
+        self._byName = {}
+
+    def _update(self, roots):
+        if roots != self._roots:
+            self._roots = list(roots)
+            self.invalidate()
+        now = time.monotonic()
+        stale = [root for root in self._roots
+                 if root not in self._listings or now - self._listings[root][0] >= self.listingSeconds]
+        # Unavailable roots are tried again on later lookups
+        for root in availableRoots(stale):
+            listing = self._listings.get(root)
+            if listing is not None:
+                for moviePath, folderName in listing[1].items():
+                    self._forget(moviePath, folderName)
+            folders = listMovieFolders(root)
+            self._listings[root] = (now, folders)
+            for moviePath, folderName in folders.items():
+                self._remember(moviePath, folderName)
+
+    def _remember(self, moviePath, folderName):
+        self._byName.setdefault(_key(folderName), {})[_key(moviePath)] = moviePath
+
+    def _forget(self, moviePath, folderName):
+        paths = self._byName.get(_key(folderName))
+        if paths is not None:
+            paths.pop(_key(moviePath), None)
+            if not paths:
+                del self._byName[_key(folderName)]
+
+    def listed(self, moviePath, roots):
+        """Whether the index can tell if a path is a movie folder: True or
+        False when its root has been listed, or None."""
+        self._update(roots)
+        root = rootOf(moviePath, self._roots)
+        if root is None or root not in self._listings:
+            return None
+        if os.path.dirname(os.path.normpath(moviePath)) != os.path.normpath(root):
+            return None
+        folderName = os.path.basename(os.path.normpath(moviePath))
+        if not fnmatch.fnmatch(folderName, '*(*)'):
+            return None
+        return _key(moviePath) in self._byName.get(_key(folderName), {})
+
+    def pathsFor(self, folderName, roots):
+        """Paths of the movie folders named `folderName` in listed roots, in
+        roots order, or None when the name cannot be in a listing."""
+        self._update(roots)
+        if not fnmatch.fnmatch(folderName, '*(*)'):
+            return None
+        paths = list(self._byName.get(_key(folderName), {}).values())
+        order = {root: i for i, root in enumerate(self._roots)}
+        return sorted(paths, key=lambda path: order.get(rootOf(path, self._roots), len(order)))
+
+    def unlistedRoots(self, roots):
+        """Roots that could not be listed, e.g. because they are offline."""
+        self._update(roots)
+        return [root for root in self._roots if root not in self._listings]
+
+    def addFolders(self, moviePaths):
+        for moviePath in moviePaths:
+            root = rootOf(moviePath, self._roots)
+            if root in self._listings:
+                folderName = os.path.basename(moviePath)
+                self._listings[root][1][moviePath] = folderName
+                self._remember(moviePath, folderName)
+
+    def removeFolders(self, moviePaths):
+        for moviePath in moviePaths:
+            root = rootOf(moviePath, self._roots)
+            if root in self._listings:
+                folderName = self._listings[root][1].pop(moviePath, None)
+                if folderName is not None:
+                    self._forget(moviePath, folderName)
@@ -0,0 +1,375 @@
+"""Inverted index over the title, plot and synopsis of each movie.
+
+The plot search used to join the text of every movie and run the search
+regexes over all of it.  `PlotIndex` answers the same queries from postings
+instead: for each normalized token (lowercased `\\w+` runs), the movies it
+occurs in and its word positions in each, so quoted phrases are matched by
+position.
+
+The index is a folder next to the SMDB file (`smdb_data_plots/`) of
+memory-mapped arrays:
+
+- `terms.txt`: the sorted vocabulary, one token per line
+- `term_starts.npy`: offsets of each token's postings
+- `docs.npy`: movie numbers of the postings
+- `position_starts.npy`, `positions.npy`: word positions of each posting
+- `paths.txt`, `titles.txt`: movie paths and titles by movie number, NUL
+  separated, and `years.npy` their years, for the table filter
+- `texts.blob`, `text_starts.npy`: the searched text of each movie as UTF-8,
+  for regex scans (see `plot_scan`)
+
+Like the columnar titles it records the size and mtime of the `.mpk` it was
+built from and is ignored once that changes.
+
+Query syntax is that of the plot search: `|` separates alternatives, and the
+words and quoted phrases of an alternative must all match.  An alternative
+with `*`, `?` or `[` wildcards is matched with its regex, but only against
+movies that contain all of its literal fragments, which are looked up in the
+vocabulary.
+"""
+import os
+import re
+import json
+import bisect
+import fnmatch
+import shlex
+import shutil
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+PLOT_INDEX_VERSION = 2
+
+_reToken = re.compile(r'\w+')
+
+
+def plotIndexPath(fileName):
+    """Folder holding the plot index for an SMDB file."""
+    return f"{os.path.splitext(fileName)[0]}_plots"
+
+
+def tokenize(text):
+    return _reToken.findall(text.lower())
+
+
+def plotText(record):
+    """The searched text of a title record: title, plot and synopsis."""
+    return ' '.join(filter(None, [record.get('title'), record.get('plot'),
+                                  record.get('synopsis')]))
+
+
+def _sourceStamp(sourceFile):
+    st = os.stat(sourceFile)
+    return {'mtime': st.st_mtime, 'size': st.st_size}
+
+
+def _wildcardRegex(group):
+    """The regex the plot search matches a wildcard alternative with."""
+    pattern = fnmatch.translate(group).replace(r'\Z', '')
+    if pattern.startswith('(?:'):
+        pattern = pattern[4:]
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _literalFragments(group):
+    """Runs of word characters of a wildcard pattern, each of which has to
+    be part of a single token of a matching text."""
+    fragments = []
+    current = []
+    i = 0
+    while i < len(group):
+        c = group[i]
+        if c == '[':
+            # Skip the bracket expression, as fnmatch reads it
+            end = i + 1
+            if end < len(group) and group[end] in '!]':
+                end += 1
+            while end < len(group) and group[end] != ']':
+                end += 1
+            if end < len(group):
+                i = end
+            c = None
+        if c is not None and _reToken.fullmatch(c):
+            current.append(c)
+        elif current:
+            fragments.append(''.join(current).lower())
+            current = []
+        i += 1
+    if current:
+        fragments.append(''.join(current).lower())
+    return fragments
+
+
+def parsePlotQuery(searchText):
+    """Parse plot search text into alternatives.
+
+    Returns:
+        A list of alternatives, each either ('phrases', [[word, ...], ...])
+        or ('wildcard', regex, fragments), or None when the text has a term
+        without any word characters, which only the regex search handles.
+    """
+    alternatives = []
+    for group in searchText.split('|'):
+        group = group.strip()
+        if not group:
+            continue
+        try:
+            tokens = shlex.split(group)
+        except ValueError:
+            tokens = group.split()
+        if any('*' in t or '?' in t or '[' in t for t in tokens):
+            try:
+                regex = _wildcardRegex(group)
+            except re.error:
+                continue
+            alternatives.append(('wildcard', regex, _literalFragments(group)))
+            continue
+        phrases = []
+        for token in tokens:
+            words = tokenize(token)
+            if not words:
+                return None
+            phrases.append(words)
+        if phrases:
+            alternatives.append(('phrases', phrases))
+    return alternatives
+
+
+def writePlotIndex(folder, titles, sourceFile):
+    """Build the plot index of a `titles` mapping and write it.
+
+    Args:
+        folder: Destination folder, replaced atomically once complete
+        titles: Mapping of movie path -> title record
+        sourceFile: The `.mpk` the index was derived from, or None for an
+            index that is always considered stale
+
+    Returns:
+        False when the index cannot be built without numpy
+    """
+    if np is None:
+        return False
+    paths = list(titles.keys())
+    years = np.zeros(len(paths), dtype='<i4')
+    movieTitles = []
+    texts = []
+    # Token -> [(doc, [positions])]
+    postings = {}
+    for doc, moviePath in enumerate(paths):
+        record = titles[moviePath]
+        movieTitles.append((record.get('title') or '').replace('\0', ''))
+        year = record.get('year')
+        years[doc] = year if type(year) is int else 0
+        text = plotText(record)
+        texts.append(text.encode('utf-8'))
+        docPositions = {}
+        for position, token in enumerate(tokenize(text)):
+            docPositions.setdefault(token, []).append(position)
+        for token, positions in docPositions.items():
+            postings.setdefault(token, []).append((doc, positions))
+
+    terms = sorted(postings)
+    termStarts = np.zeros(len(terms) + 1, dtype='<i8')
+    numPostings = 0
+    for i, term in enumerate(terms):
+        numPostings += len(postings[term])
+        termStarts[i + 1] = numPostings
+    docs = np.zeros(numPostings, dtype='<i4')
+    positionStarts = np.zeros(numPostings + 1, dtype='<i8')
+    allPositions = []
+    posting = 0
+    numPositions = 0
+    for term in terms:
+        for doc, positions in postings[term]:
+            docs[posting] = doc
+            numPositions += len(positions)
+            posting += 1
+            positionStarts[posting] = numPositions
+            allPositions.extend(positions)
+    positions = np.array(allPositions, dtype='<i4')
+
+    tmpFolder = folder + '.tmp'
+    shutil.rmtree(tmpFolder, ignore_errors=True)
+    os.makedirs(tmpFolder)
+    with open(os.path.join(tmpFolder, 'terms.txt'), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(terms))
+    with open(os.path.join(tmpFolder, 'paths.txt'), 'w', encoding='utf-8') as f:
+        f.write('\0'.join(paths))
+    with open(os.path.join(tmpFolder, 'titles.txt'), 'w', encoding='utf-8') as f:
+        f.write('\0'.join(movieTitles))
+    np.save(os.path.join(tmpFolder, 'years.npy'), years)
+    textStarts = np.zeros(len(texts) + 1, dtype='<i8')
+    np.cumsum([len(text) for text in texts], out=textStarts[1:])
+    with open(os.path.join(tmpFolder, 'texts.blob'), 'wb') as f:
+        f.write(b''.join(texts))
+    np.save(os.path.join(tmpFolder, 'text_starts.npy'), textStarts)
+    np.save(os.path.join(tmpFolder, 'term_starts.npy'), termStarts)
+    np.save(os.path.join(tmpFolder, 'docs.npy'), docs)
+    np.save(os.path.join(tmpFolder, 'position_starts.npy'), positionStarts)
+    np.save(os.path.join(tmpFolder, 'positions.npy'), positions)
+    meta = {'version': PLOT_INDEX_VERSION,
+            'docs': len(paths),
+            'source': _sourceStamp(sourceFile) if sourceFile else None}
+    with open(os.path.join(tmpFolder, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+    oldFolder = folder + '.old'
+    shutil.rmtree(oldFolder, ignore_errors=True)
+    if os.path.exists(folder):
+        os.replace(folder, oldFolder)
+    os.replace(tmpFolder, folder)
+    shutil.rmtree(oldFolder, ignore_errors=True)
+    return True
+
+
+def openPlotIndex(fileName):
+    """Open the plot index of an SMDB file.
+
+    Returns:
+        A `PlotIndex`, or None when the index is missing, unreadable or
+        older than the `.mpk` it was derived from.
+    """
+    if np is None:
+        return None
+    folder = plotIndexPath(fileName)
+    sourceFile = f"{os.path.splitext(fileName)[0]}.mpk"
+    try:
+        with open(os.path.join(folder, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != PLOT_INDEX_VERSION:
+            return None
+        if meta.get('source') is None or meta['source'] != _sourceStamp(sourceFile):
+            return None
+        return PlotIndex(folder)
+    except Exception:
+        return None
+
+
+class PlotIndex:
+    def __init__(self, folder):
+        self.folder = folder
+        with open(os.path.join(folder, 'terms.txt'), 'r', encoding='utf-8') as f:
+            self._vocabulary = f.read()
+        with open(os.path.join(folder, 'paths.txt'), 'r', encoding='utf-8') as f:
+            text = f.read()
+        self.paths = text.split('\0') if text else []
+        with open(os.path.join(folder, 'titles.txt'), 'r', encoding='utf-8') as f:
+            text = f.read()
+        self._titles = text.split('\0') if self.paths else []
+        self._years = np.load(os.path.join(folder, 'years.npy'))
+        terms = self._vocabulary.split('\n') if self._vocabulary else []
+        self._termIds = {term: i for i, term in enumerate(terms)}
+        # Offset of each term in the vocabulary text, for fragment lookups
+        self._termOffsets = []
+        offset = 0
+        for term in terms:
+            self._termOffsets.append(offset)
+            offset += len(term) + 1
+        self._termStarts = np.load(os.path.join(folder, 'term_starts.npy'), mmap_mode='r')
+        self._docs = np.load(os.path.join(folder, 'docs.npy'), mmap_mode='r')
+        self._positionStarts = np.load(os.path.join(folder, 'position_starts.npy'), mmap_mode='r')
+        self._positions = np.load(os.path.join(folder, 'positions.npy'), mmap_mode='r')
+
+    def __len__(self):
+        return len(self.paths)
+
+    def titleYear(self, doc):
+        """(title, year) of a movie number, as the table filter takes them."""
+        return self._titles[doc] or None, int(self._years[doc])
+
+    def _termRange(self, term):
+        termId = self._termIds.get(term)
+        if termId is None:
+            return 0, 0
+        return int(self._termStarts[termId]), int(self._termStarts[termId + 1])
+
+    def _termDocs(self, term):
+        start, end = self._termRange(term)
+        return self._docs[start:end]
+
+    def _termPositions(self, term, docs):
+        """Positions of a term in each of `docs`, which all contain it."""
+        start, end = self._termRange(term)
+        postings = start + np.searchsorted(self._docs[start:end], docs)
+        return [self._positions[self._positionStarts[p]:self._positionStarts[p + 1]]
+                for p in postings]
+
+    def _phraseDocs(self, words):
+        docs = self._termDocs(words[0])
+        for word in words[1:]:
+            if not len(docs):
+                break
+            docs = np.intersect1d(docs, self._termDocs(word), assume_unique=True)
+        if len(words) == 1 or not len(docs):
+            return docs
+        # Keep the movies where the words follow each other
+        starts = self._termPositions(words[0], docs)
+        for offset, word in enumerate(words[1:], 1):
+            for i, positions in enumerate(self._termPositions(word, docs)):
+                if len(starts[i]):
+                    starts[i] = np.intersect1d(starts[i], positions - offset,
+                                               assume_unique=True)
+        return docs[[i for i, positions in enumerate(starts) if len(positions)]]
+
+    def _fragmentDocs(self, fragment):
+        """Movies with a token containing `fragment`."""
+        termIds = set()
+        for match in re.finditer(re.escape(fragment), self._vocabulary):
+            termIds.add(bisect.bisect_right(self._termOffsets, match.start()) - 1)
+        if not termIds:
+            return np.zeros(0, dtype=self._docs.dtype)
+        return np.unique(np.concatenate(
+            [self._docs[self._termStarts[i]:self._termStarts[i + 1]] for i in termIds]))
+
+    def _wildcardCandidates(self, fragments):
+        """Movies with all fragments of a wildcard alternative, or None for
+        all movies."""
+        docs = None
+        for fragment in fragments:
+            fragmentDocs = self._fragmentDocs(fragment)
+            docs = fragmentDocs if docs is None else np.intersect1d(
+                docs, fragmentDocs, assume_unique=True)
+            if not len(docs):
+                break
+        return docs
+
+    def verifyCount(self, alternatives):
+        """Number of texts `search` would match wildcard regexes against."""
+        count = 0
+        for alternative in alternatives:
+            if alternative[0] == 'wildcard':
+                docs = self._wildcardCandidates(alternative[2])
+                count += len(self.paths) if docs is None else len(docs)
+        return count
+
+    def search(self, alternatives, textOf):
+        """Numbers of the movies matching parsed query alternatives (see
+        `parsePlotQuery`), in order.
+
+        Args:
+            alternatives: Parsed query
+            textOf: Called with a movie path to get its searched text, to
+                verify the candidates of wildcard alternatives
+        """
+        matches = set()
+        for alternative in alternatives:
+            if alternative[0] == 'phrases':
+                docs = None
+                for words in alternative[1]:
+                    phraseDocs = self._phraseDocs(words)
+                    docs = phraseDocs if docs is None else np.intersect1d(
+                        docs, phraseDocs, assume_unique=True)
+                    if not len(docs):
+                        break
+                matches.update(int(doc) for doc in docs)
+            else:
+                _, regex, fragments = alternative
+                docs = self._wildcardCandidates(fragments)
+                candidates = range(len(self.paths)) if docs is None else docs
+                for doc in candidates:
+                    doc = int(doc)
+                    if doc not in matches and regex.search(textOf(self.paths[doc])):
+                        matches.add(doc)
+        return sorted(matches)
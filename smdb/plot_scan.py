@@ -0,0 +1,151 @@
+"""Regex scan of the plot corpus, sharded over worker processes.
+
+Plot searches the plot index cannot answer from its postings, or whose
+wildcards it cannot narrow to a few candidates, are a regex match against
+the text of every movie.  `PlotScan` splits the movies into shards of
+`SHARD_SIZE` and scans them in a process pool driven from a background
+thread, so the GUI stays responsive and the scan uses every core.
+
+The workers read the movie texts from the plot index folder (`texts.blob`
+and `text_starts.npy`) through memory maps, so a shard is sent as a range of
+movie numbers rather than its text and all workers share one copy of the
+corpus in the page cache.
+
+Matches are reported per shard as they come in.  `cancel()` stops handing
+out shards and drops the results of shards still running.
+"""
+import os
+import mmap
+import threading
+import concurrent.futures
+
+from PyQt5 import QtCore
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Movies per worker task
+SHARD_SIZE = 256
+# The fewest movies worth a process pool
+MIN_PROCESS_MOVIES = 2048
+# Wildcard candidates above which a plot search is scanned in the
+# background rather than verified from the plot index on the GUI thread
+MAX_INDEX_CANDIDATES = 1000
+
+
+def textMatches(searchRegex, searchTextLower, text):
+    """Whether a movie's text matches the plot search.
+
+    Args:
+        searchRegex: A compiled regex, a list of regexes that must all
+            match, or a list of such lists of which one must match; None to
+            search for `searchTextLower` as plain text
+        searchTextLower: The lowercased search text
+        text: The searched text of the movie
+    """
+    if not text:
+        return False
+    if searchRegex is None:
+        return searchTextLower in text.lower()
+    if isinstance(searchRegex, list):
+        if searchRegex and isinstance(searchRegex[0], list):
+            return any(all(regex.search(text) for regex in group) for group in searchRegex)
+        return all(regex.search(text) for regex in searchRegex)
+    return searchRegex.search(text) is not None
+
+
+def readCorpusTexts(folder, start, end):
+    """Texts of movies `start` to `end` (exclusive) of a plot index."""
+    starts = np.load(os.path.join(folder, 'text_starts.npy'), mmap_mode='r')
+    offsets = [int(offset) for offset in starts[start:end + 1]]
+    if offsets[-1] == offsets[0]:
+        return [''] * (end - start)
+    with open(os.path.join(folder, 'texts.blob'), 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as blob:
+            return [blob[offsets[i]:offsets[i + 1]].decode('utf-8')
+                    for i in range(end - start)]
+
+
+def scanShard(folder, start, end, searchRegex, searchTextLower):
+    """Numbers of the matching movies among `start` to `end` (exclusive)."""
+    texts = readCorpusTexts(folder, start, end)
+    return [start + i for i, text in enumerate(texts)
+            if textMatches(searchRegex, searchTextLower, text)]
+
+
+class PlotScan(QtCore.QObject):
+    """A plot search over every movie of a plot index, run in the
+    background.
+
+    Args:
+        folder: The plot index folder holding the corpus
+        numMovies: Number of movies in the index
+        searchRegex, searchTextLower: The search, see `textMatches`
+    """
+    # Numbers of matching movies, one list per shard with matches
+    matchesFound = QtCore.pyqtSignal(list)
+    # Movies scanned, total
+    progress = QtCore.pyqtSignal(int, int)
+    # True when the scan completed, False when it was cancelled
+    finished = QtCore.pyqtSignal(bool)
+
+    def __init__(self, folder, numMovies, searchRegex, searchTextLower, parent=None):
+        super().__init__(parent)
+        self.folder = folder
+        self.numMovies = numMovies
+        self.searchRegex = searchRegex
+        self.searchTextLower = searchTextLower
+        self._cancelled = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _run(self):
+        shards = [(start, min(start + SHARD_SIZE, self.numMovies))
+                  for start in range(0, self.numMovies, SHARD_SIZE)]
+        scanned = set()
+        done = 0
+        numWorkers = os.cpu_count() or 1
+        if self.numMovies >= MIN_PROCESS_MOVIES and numWorkers > 1:
+            executor = None
+            try:
+                executor = concurrent.futures.ProcessPoolExecutor(max_workers=numWorkers)
+                futures = {executor.submit(scanShard, self.folder, start, end,
+                                           self.searchRegex, self.searchTextLower): (start, end)
+                           for start, end in shards}
+                pending = set(futures)
+                while pending and not self._cancelled.is_set():
+                    finished, pending = concurrent.futures.wait(
+                        pending, timeout=0.05,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in finished:
+                        matches = future.result()
+                        start, end = futures[future]
+                        scanned.add(start)
+                        done += end - start
+                        if matches and not self._cancelled.is_set():
+                            self.matchesFound.emit(matches)
+                    self.progress.emit(done, self.numMovies)
+            except Exception:
+                # Scan the remaining shards in this thread
+                pass
+            finally:
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+
+        for start, end in shards:
+            if self._cancelled.is_set():
+                break
+            if start in scanned:
+                continue
+            matches = scanShard(self.folder, start, end, self.searchRegex, self.searchTextLower)
+            done += end - start
+            if matches:
+                self.matchesFound.emit(matches)
+            self.progress.emit(done, self.numMovies)
+        self.finished.emit(not self._cancelled.is_set())
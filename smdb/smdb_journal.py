@@ -0,0 +1,205 @@
+"""Append-only journal of small edits to an SMDB file.
+
+Edits such as adding a user tag or recording a date watched are appended to
+`<base>.journal` (e.g. `smdb_data.journal`) as one JSON record per line
+instead of rewriting the whole SMDB file.  `readSmdbFile` replays the journal
+on load, and it is folded back into the `.mpk` once it grows large.
+
+Record types:
+
+- `{'op': 'set', 'path': moviePath, 'fields': {...}}` updates fields of a
+  title record
+- `{'op': 'title', 'path': moviePath, 'record': {...}}` adds or replaces a
+  title record, or removes it when `record` is None
+- `{'op': 'index add' | 'index remove', 'section': 'user tags', 'key': key,
+  'title': title, 'year': year}` adds or removes a movie from an index entry
+"""
+import os
+import threading
+
+import ujson
+
+from .smdb_records import addToIndex, removeFromIndex, movieIdOf
+
+
+# Journals larger than this are compacted into the SMDB file
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
+_appendLock = threading.Lock()
+
+
+def journalPath(fileName):
+    return f"{os.path.splitext(fileName)[0]}.journal"
+
+
+def setFieldsRecord(moviePath, fields):
+    return {'op': 'set', 'path': moviePath, 'fields': fields}
+
+
+def titleRecord(moviePath, record):
+    return {'op': 'title', 'path': moviePath, 'record': record}
+
+
+def indexRecord(op, section, key, titleYear):
+    return {'op': f"index {op}", 'section': section, 'key': key,
+            'title': titleYear[0], 'year': titleYear[1]}
+
+
+def applyJournalRecord(data, record):
+    """Apply one journal record to in-memory SMDB data."""
+    op = record.get('op')
+    if op == 'set':
+        titles = data.get('titles')
+        if titles is not None and record['path'] in titles:
+            titles[record['path']].update(record['fields'])
+    elif op == 'title':
+        titles = data.get('titles')
+        if titles is None:
+            return
+        if isinstance(titles, dict):
+            if record['record'] is None:
+                titles.pop(record['path'], None)
+            else:
+                titles[record['path']] = record['record']
+        else:
+            # Read-only title stores keep the change for the session
+            titles.setRecord(record['path'], record['record'])
+    elif op in ('index add', 'index remove'):
+        section = record['section']
+        if section not in data:
+            if op == 'index remove':
+                return
+            data[section] = {}
+        titleYear = (record['title'], record['year'])
+        # Index entries hold movie ids unless the data predates them
+        movieId = movieIdOf(data, titleYear, create=(op == 'index add'))
+        movie = titleYear if movieId is None else movieId
+        if op == 'index add':
+            # Entries read from disk hold their movies in a list
+            data[section].setdefault(record['key'], {'num movies': 0, 'movies': []})
+            addToIndex(data[section], record['key'], movie)
+        else:
+            removeFromIndex(data[section], record['key'], movie)
+
+
+def appendJournal(fileName, records):
+    """Append records to the journal of an SMDB file and fsync it.
+
+    A torn last line left by an interrupted append is dropped first, so the
+    new records do not run on from it.
+
+    Returns:
+        The journal size in bytes after the append.
+    """
+    lines = ''.join(ujson.dumps(record) + '\n' for record in records).encode('utf-8')
+    path = journalPath(fileName)
+    with _appendLock:
+        with open(path, 'a+b') as f:
+            _dropTornLine(f)
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+            return f.tell()
+
+
+def _dropTornLine(f):
+    size = f.seek(0, os.SEEK_END)
+    if not size:
+        return
+    f.seek(size - 1)
+    if f.read(1) == b'\n':
+        return
+    # Find the end of the last complete line
+    end = size - 1
+    while end > 0:
+        start = max(0, end - 4096)
+        f.seek(start)
+        newline = f.read(end - start).rfind(b'\n')
+        if newline >= 0:
+            f.truncate(start + newline + 1)
+            return
+        end = start
+    f.truncate(0)
+
+
+def readJournal(fileName, limit=None):
+    """Read journal records, ignoring a torn last line from an interrupted append.
+
+    Args:
+        limit: Only read the first `limit` bytes of the journal
+    """
+    path = journalPath(fileName)
+    if not os.path.exists(path):
+        return []
+    with open(path, 'rb') as f:
+        raw = f.read() if limit is None else f.read(limit)
+    records = []
+    for line in raw.splitlines():
+        try:
+            records.append(ujson.loads(line))
+        except ValueError:
+            continue
+    return records
+
+
+def replayJournal(data, fileName, sections=None):
+    """Apply the journal of an SMDB file to data read from it.
+
+    Args:
+        sections: Only apply records touching these sections ('titles' for
+            `set` and `title` records); all records when None
+
+    Returns:
+        The number of records applied.
+    """
+    count = 0
+    for record in readJournal(fileName):
+        section = 'titles' if record.get('op') in ('set', 'title') else record.get('section')
+        if sections is not None and section not in sections:
+            continue
+        applyJournalRecord(data, record)
+        count += 1
+    return count
+
+
+def journalHasTitleRecords(fileName):
+    """Whether the journal adds or removes titles, which streamed titles do
+    not pick up."""
+    return any(record.get('op') == 'title' for record in readJournal(fileName))
+
+
+def journalTitleEdits(fileName):
+    """Merge the journal's title edits into {moviePath: fields} so records
+    can be patched as they are streamed in."""
+    edits = {}
+    for record in readJournal(fileName):
+        if record.get('op') == 'set':
+            edits.setdefault(record['path'], {}).update(record['fields'])
+    return edits
+
+
+def truncateJournal(fileName, upTo=None):
+    """Drop journal records that have been written into the SMDB file.
+
+    Args:
+        upTo: Drop only the first `upTo` bytes, keeping records appended
+            since; drop everything when None
+    """
+    path = journalPath(fileName)
+    with _appendLock:
+        if not os.path.exists(path):
+            return
+        if upTo is None:
+            os.remove(path)
+            return
+        with open(path, 'rb') as f:
+            f.seek(upTo)
+            tail = f.read()
+        if not tail:
+            os.remove(path)
+            return
+        with open(path + '.tmp', 'wb') as f:
+            f.write(tail)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
@@ -0,0 +1,520 @@
+"""Per-movie SMDB title records, index maintenance and the rebuild manifest.
+
+`MainWindow.writeSmdbFile` turns every `<folder>.json` in the library into a
+title record and aggregates those records into the `directors`, `actors`,
+`genres`, ... index sections.  The helpers here keep that logic free of any Qt
+state so it can be reused for full and incremental rebuilds.
+"""
+import os
+import re
+import json
+import bisect
+import datetime
+import concurrent.futures
+
+import ujson
+
+# Optional binary serialization (MessagePack) for the manifest
+try:
+    import msgpack  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    msgpack = None
+
+
+MANIFEST_VERSION = 1
+
+# Movie JSON files parsed per worker task, and the fewest files worth a
+# process pool
+PARSE_CHUNK_SIZE = 64
+MIN_PROCESS_JOBS = 4 * PARSE_CHUNK_SIZE
+
+# Index sections and the title record field that feeds each of them
+INDEX_SECTIONS = [
+    ('years', 'year'),
+    ('genres', 'genres'),
+    ('directors', 'directors'),
+    ('actors', 'actors'),
+    ('writers', 'writers'),
+    ('producers', 'producers'),
+    ('composers', 'composers'),
+    ('companies', 'companies'),
+    ('countries', 'countries'),
+    ('user tags', 'user tags'),
+    ('mpaa ratings', 'mpaa rating'),
+    ('ratings', 'rating'),
+]
+
+# Scalar record fields; every other indexed field is a list
+_SCALAR_INDEX_FIELDS = {'year', 'mpaa rating', 'rating'}
+
+# Section listing the (title, year) of each movie id.  Index entries store
+# sorted lists of these ids; files written before it existed store
+# (title, year) pairs instead.
+MOVIE_IDS_SECTION = 'movie ids'
+
+# For box office $
+_reMoneyValue = re.compile(r'(\d+(?:,\d+)*(?:\.\d+)?)')
+_reCurrency = re.compile(r'^([A-Z][A-Z][A-Z])(.*)')
+
+
+def _firstParagraph(value):
+    """Return the first entry of a plot/synopsis field without the author."""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if value:
+        # Remove the author's name
+        value = value.split('::')[0]
+    return value
+
+
+def _formatBoxOffice(boxOffice):
+    try:
+        currency = 'USD'
+        if boxOffice:
+            boxOffice = boxOffice.replace(' (estimated)', '')
+            match = re.match(_reCurrency, boxOffice)
+            if match:
+                currency = match.group(1)
+                boxOffice = '$%s' % match.group(2)
+            results = re.findall(_reMoneyValue, boxOffice)
+            if results:
+                amount = ('$' + results[0]) if currency == 'USD' else results[0]
+            else:
+                amount = '$0'
+        else:
+            amount = '$0'
+        return '%-3s %15s' % (currency, amount)
+    except Exception:
+        return boxOffice
+
+
+def _parseYear(year):
+    if not year:
+        return 0
+    try:
+        return int(year)
+    except ValueError:
+        try:
+            return int(str(year).split('–')[0])
+        except Exception:
+            return 0
+
+
+def readMovieJson(jsonFile):
+    """Load a per-movie JSON file, returning None if it cannot be decoded."""
+    with open(jsonFile, encoding="utf-8") as f:
+        try:
+            return ujson.load(f)
+        except UnicodeDecodeError:
+            return None
+
+
+def buildTitleRecord(jsonData, moviePath, folderName):
+    """Build the SMDB `titles` entry for one movie from its JSON data.
+
+    The `rank`, `subtitles exist` and `date watched` fields come from the
+    table model rather than the JSON file, so they are left as placeholders
+    for the caller to fill in.
+
+    Returns:
+        The title record dict, or None if the JSON lacks a title or year.
+    """
+    if 'title' not in jsonData or 'year' not in jsonData:
+        return None
+
+    # Use 'date' from JSON if available, otherwise fall back to file modification time
+    if 'date' in jsonData:
+        # Date from JSON is already in YYYY-MM-DD format, convert to YYYY/MM/DD
+        dateModified = jsonData.get('date').replace('-', '/')
+    else:
+        dateModified = datetime.datetime.fromtimestamp(os.stat(moviePath).st_mtime)
+        dateModified = f"{dateModified.year}/{str(dateModified.month).zfill(2)}/{str(dateModified.day).zfill(2)}"
+
+    jsonRating = None
+    if jsonData.get('rating'):
+        try:
+            jsonRating = float(jsonData.get('rating'))
+        except ValueError:
+            jsonRating = 0.0
+
+    jsonBoxOffice = None
+    if jsonData.get('box office'):
+        jsonBoxOffice = _formatBoxOffice(jsonData.get('box office'))
+
+    jsonGenres = jsonData.get('genres') or []
+    jsonUserTags = jsonData.get('user tags') or []
+    jsonCountries = jsonData.get('countries') or []
+    jsonCompanies = jsonData.get('companies') or []
+
+    # NOTE: Embeddings are stored in a separate binary file (smdb_embeddings.npz)
+    # and are not part of the title record
+    return {
+        'folder': folderName,
+        'id': jsonData.get('id') or None,
+        'title': jsonData.get('title'),
+        'year': _parseYear(jsonData.get('year')),
+        'rating': jsonRating,
+        'mpaa rating': jsonData.get('mpaa rating') or None,
+        'runtime': jsonData.get('runtime') or None,
+        'box office': jsonBoxOffice,
+        'directors': list(jsonData.get('directors') or []),
+        'genres': jsonGenres or None,
+        'user tags': jsonUserTags or None,
+        'countries': jsonCountries or None,
+        'companies': jsonCompanies or None,
+        'actors': list(jsonData.get('cast') or []),
+        'writers': list(jsonData.get('writers') or []),
+        'producers': list(jsonData.get('producers') or []),
+        'composers': list(jsonData.get('composers') or []),
+        'rank': None,
+        'width': jsonData.get('width') or 0,
+        'height': jsonData.get('height') or 0,
+        'channels': jsonData.get('channels') or 0,
+        'size': jsonData.get('size') or 0,
+        'path': moviePath,
+        'date': dateModified,
+        'subtitles exist': 'unknown',
+        'date watched': None,
+        'known duplicate': jsonData.get('known duplicate', False),
+        'plot': _firstParagraph(jsonData.get('plot')),
+        'synopsis': _firstParagraph(jsonData.get('synopsis')),
+    }
+
+
+def recordIndexKeys(record):
+    """Return the (title, year) tuple and the (section, key) pairs a record
+    contributes to the index sections."""
+    titleYear = (record.get('title'), record.get('year') or 0)
+    keys = []
+    for section, field in INDEX_SECTIONS:
+        value = record.get(field)
+        if field in _SCALAR_INDEX_FIELDS:
+            # Years of 0 are never indexed; ratings of 0.0 are
+            if value is not None and (value or field != 'year'):
+                keys.append((section, value))
+        else:
+            for key in value or []:
+                if key is not None:
+                    keys.append((section, key))
+    return titleYear, keys
+
+
+def addToIndex(indexDict, key, movie):
+    """Add a movie, given as a (title, year) tuple or a movie id, to an index entry.
+
+    Entries built during a rebuild hold their movies in a dict-as-set for O(1)
+    membership; entries loaded from disk hold a list, kept sorted for ids.
+    """
+    if key is None:
+        return
+    entry = indexDict.get(key)
+    if entry is None:
+        entry = {'num movies': 0, 'movies': {}}
+        indexDict[key] = entry
+    movies = entry.get('movies')
+    if isinstance(movies, list):
+        if type(movie) is int:
+            i = bisect.bisect_left(movies, movie)
+            if i == len(movies) or movies[i] != movie:
+                movies.insert(i, movie)
+        elif not any(tuple(m) == movie for m in movies):
+            movies.append(movie)
+        entry['num movies'] = len(movies)
+    elif movie not in movies:
+        movies[movie] = None
+        entry['num movies'] += 1
+
+
+def removeFromIndex(indexDict, key, movie):
+    """Remove a movie from an index entry, dropping the entry once empty."""
+    entry = indexDict.get(key)
+    if entry is None:
+        return
+    movies = entry.get('movies')
+    if isinstance(movies, list):
+        if type(movie) is int:
+            movies[:] = [m for m in movies if m != movie]
+        else:
+            movies[:] = [m for m in movies if tuple(m) != movie]
+    else:
+        movies.pop(movie, None)
+    entry['num movies'] = len(movies)
+    if not movies:
+        del indexDict[key]
+
+
+def addRecordToIndexes(indexes, record):
+    titleYear, keys = recordIndexKeys(record)
+    for section, key in keys:
+        addToIndex(indexes[section], key, titleYear)
+
+
+def removeRecordFromIndexes(indexes, record, others=()):
+    """Remove a record from the index sections.
+
+    Index entries list movies by (title, year), which copies of a movie in
+    several folders share, so keys still contributed by one of `others`,
+    the remaining records with the same title and year, are kept.
+    """
+    titleYear, keys = recordIndexKeys(record)
+    kept = set()
+    for other in others:
+        kept.update(recordIndexKeys(other)[1])
+    for section, key in keys:
+        if (section, key) not in kept:
+            removeFromIndex(indexes[section], key, titleYear)
+
+
+def indexChanges(oldRecord, newRecord, others=()):
+    """Index entries to add and remove when a title record is replaced.
+
+    Args:
+        oldRecord, newRecord: The record before and after; None for a title
+            that is added or removed
+        others: The remaining records with the title and year of
+            `oldRecord`, whose keys are kept (see `removeRecordFromIndexes`)
+
+    Returns:
+        List of ('add' | 'remove', section, key, (title, year)) tuples.
+    """
+    oldTitleYear, oldKeys = recordIndexKeys(oldRecord) if oldRecord else (None, [])
+    newTitleYear, newKeys = recordIndexKeys(newRecord) if newRecord else (None, [])
+    changes = []
+    if oldRecord:
+        kept = set(newKeys) if newTitleYear == oldTitleYear else set()
+        for other in others:
+            kept.update(recordIndexKeys(other)[1])
+        changes.extend(('remove', section, key, oldTitleYear)
+                       for section, key in dict.fromkeys(oldKeys) if (section, key) not in kept)
+    if newRecord:
+        existing = set(oldKeys) if newTitleYear == oldTitleYear else set()
+        changes.extend(('add', section, key, newTitleYear)
+                       for section, key in dict.fromkeys(newKeys) if (section, key) not in existing)
+    return changes
+
+
+def recordsByTitleYear(titles):
+    """Map (title, year) tuples to the records of a titles section."""
+    byTitleYear = {}
+    for record in titles.values():
+        titleYear = (record.get('title'), record.get('year') or 0)
+        byTitleYear.setdefault(titleYear, []).append(record)
+    return byTitleYear
+
+
+def normalizeIndex(indexDict):
+    """Convert dict-as-set movie collections to lists before serializing."""
+    for entry in indexDict.values():
+        movies = entry.get('movies')
+        if isinstance(movies, dict):
+            entry['movies'] = list(movies.keys())
+        entry['num movies'] = len(entry['movies'])
+
+
+def encodeMovieIds(data):
+    """Assign dense movie ids and store them in the index sections.
+
+    Ids number the distinct (title, year) pairs of the titles section in
+    sorted order; `data[MOVIE_IDS_SECTION]` maps them back.  Index entries
+    must already be normalized to lists of (title, year) pairs.
+    """
+    titleYears = sorted({(record.get('title'), record.get('year') or 0)
+                         for record in data['titles'].values()},
+                        key=lambda titleYear: (str(titleYear[0]), titleYear[1]))
+    movieIds = {titleYear: i for i, titleYear in enumerate(titleYears)}
+    for section, _ in INDEX_SECTIONS:
+        for entry in data.get(section, {}).values():
+            entry['movies'] = sorted(movieIds[tuple(m)] for m in entry['movies'])
+    data[MOVIE_IDS_SECTION] = [list(titleYear) for titleYear in titleYears]
+
+
+def decodeMovieIds(data):
+    """Turn movie ids in the index sections back into (title, year) tuples."""
+    titleYears = data.pop(MOVIE_IDS_SECTION, None)
+    if titleYears is None:
+        return
+    for section, _ in INDEX_SECTIONS:
+        for entry in data.get(section, {}).values():
+            entry['movies'] = [tuple(titleYears[m]) if type(m) is int else tuple(m)
+                               for m in entry['movies']]
+
+
+_movieIdCache = (None, 0, {})
+
+
+def movieIdOf(data, titleYear, create=False):
+    """Id of a (title, year) pair, or None when the data predates movie ids.
+
+    With `create`, a pair without an id is given the next free one.
+    """
+    global _movieIdCache
+    titleYears = data.get(MOVIE_IDS_SECTION)
+    if titleYears is None:
+        return None
+    cachedList, cachedLength, lookup = _movieIdCache
+    if cachedList is not titleYears or cachedLength != len(titleYears):
+        lookup = {tuple(t): i for i, t in enumerate(titleYears)}
+        _movieIdCache = (titleYears, len(titleYears), lookup)
+    movieId = lookup.get(tuple(titleYear))
+    if movieId is None and create:
+        movieId = len(titleYears)
+        titleYears.append(list(titleYear))
+        lookup[tuple(titleYear)] = movieId
+        _movieIdCache = (titleYears, len(titleYears), lookup)
+    return movieId
+
+
+def indexEntryKeys(entry):
+    """Movies of an index entry as hashable keys for set operations: movie
+    ids, or (title, year) tuples for files written before movie ids."""
+    movies = entry.get('movies') or []
+    if movies and type(movies[0]) is int:
+        return movies
+    return [tuple(m) for m in movies]
+
+
+def moviesForKeys(data, keys):
+    """(title, year) tuples for keys returned by indexEntryKeys."""
+    titleYears = None
+    movies = []
+    for key in keys:
+        if type(key) is int:
+            if titleYears is None:
+                titleYears = data[MOVIE_IDS_SECTION]
+            movies.append(tuple(titleYears[key]))
+        else:
+            movies.append(key)
+    return movies
+
+
+def manifestPath(fileName):
+    """Manifest file stored next to `smdb_data.mpk`."""
+    base = os.path.splitext(fileName)[0]
+    return f"{base}_manifest.mpk" if msgpack else f"{base}_manifest.json"
+
+
+def readManifest(fileName):
+    """Read the rebuild manifest for an SMDB file.
+
+    Returns:
+        Dict of json file path -> {'mtime', 'size', 'path', 'record'}, or an
+        empty dict when there is no usable manifest.
+    """
+    path = manifestPath(fileName)
+    if not os.path.exists(path):
+        return {}
+    try:
+        if msgpack:
+            with open(path, "rb") as f:
+                manifest = msgpack.unpack(f, raw=False, strict_map_key=False)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+    except Exception:
+        return {}
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('entries') or {}
+
+
+def writeManifest(fileName, entries):
+    path = manifestPath(fileName)
+    manifest = {'version': MANIFEST_VERSION, 'entries': entries}
+    tmpPath = path + ".tmp"
+    if msgpack:
+        with open(tmpPath, "wb") as f:
+            msgpack.pack(manifest, f, use_bin_type=True)
+    else:
+        with open(tmpPath, "w", encoding="utf-8") as f:
+            ujson.dump(manifest, f)
+    os.replace(tmpPath, path)
+
+
+def loadTitleRecords(jobs):
+    """Parse a chunk of movie JSON files into title records.
+
+    This is a pure function so it can run in a worker process.
+
+    Args:
+        jobs: List of (jsonFile, moviePath, folderName) tuples
+
+    Returns:
+        List of (ok, record) tuples in the same order as `jobs`; `ok` is False
+        when the JSON file could not be read or decoded.
+    """
+    results = []
+    for jsonFile, moviePath, folderName in jobs:
+        try:
+            jsonData = readMovieJson(jsonFile)
+            if jsonData is None:
+                results.append((False, None))
+                continue
+            results.append((True, buildTitleRecord(jsonData, moviePath, folderName)))
+        except Exception:
+            results.append((False, None))
+    return results
+
+
+def parseTitleRecords(jobs, progress=None, numWorkers=None,
+                      minProcessJobs=MIN_PROCESS_JOBS, output=None):
+    """Parse movie JSON files into title records.
+
+    Large batches are split into chunks and parsed by a process pool so
+    throughput scales with the number of cores; small batches, or a pool
+    that fails to start, use the same code serially.  Results are keyed
+    by json file so callers can merge them in their own order.
+
+    Args:
+        jobs: List of (jsonFile, moviePath, folderName) tuples
+        progress: Called with (files parsed, total); parsing is cancelled
+            when it returns False
+        numWorkers: Worker processes, the number of cores by default; 1
+            parses serially
+        minProcessJobs: The fewest jobs parsed by a process pool
+        output: Called with a warning when the pool fails
+
+    Returns:
+        Dict of json file -> (ok, record), or None if cancelled.
+    """
+    parsed = {}
+    if not jobs:
+        return parsed
+
+    chunks = [jobs[i:i + PARSE_CHUNK_SIZE] for i in range(0, len(jobs), PARSE_CHUNK_SIZE)]
+    if numWorkers is None:
+        numWorkers = os.cpu_count() or 1
+    done = 0
+
+    if len(jobs) >= minProcessJobs and numWorkers > 1:
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=numWorkers) as executor:
+                futures = {executor.submit(loadTitleRecords, chunk): chunk for chunk in chunks}
+                pending = set(futures)
+                while pending:
+                    finished, pending = concurrent.futures.wait(
+                        pending,
+                        timeout=0.1,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in finished:
+                        chunk = futures[future]
+                        for job, result in zip(chunk, future.result()):
+                            parsed[job[0]] = result
+                        done += len(chunk)
+                    if progress is not None and not progress(max(done, 1), len(jobs)):
+                        for future in pending:
+                            future.cancel()
+                        return None
+            return parsed
+        except Exception as e:
+            if output is not None:
+                output(f"Warning: parallel JSON parsing failed ({e}), continuing serially")
+            parsed = {}
+            done = 0
+
+    for chunk in chunks:
+        for job, result in zip(chunk, loadTitleRecords(chunk)):
+            parsed[job[0]] = result
+        done += len(chunk)
+        if progress is not None and not progress(done, len(jobs)):
+            return None
+    return parsed
@@ -0,0 +1,203 @@
+"""Per-root shards of the main SMDB file.
+
+Every movies root (the movies folder and each additional movies folder) keeps
+the title records of its movies, and the rebuild manifest for them, in a
+shard of its own under `<base>_shards/` (e.g. `smdb_data_shards/`).
+`smdb_data.mpk` remains the merged view the window reads, with the index
+sections built over all roots.
+
+A rebuild limited to some roots only looks at the JSON files under those
+roots and rewrites their shards; the titles of the other roots, and of roots
+that are unavailable, are taken from their shards as they are.
+"""
+import os
+import re
+import collections
+import time
+import hashlib
+import threading
+import concurrent.futures
+
+from .utilities import readSmdbFile, writeSmdbMpk, writeSmdbJson, msgpack
+from .smdb_records import readManifest, writeManifest
+
+# Seconds to wait for a root to answer before treating it as unavailable
+ROOT_PROBE_TIMEOUT = 2.0
+# Seconds an availability result is reused for
+ROOT_PROBE_TTL = 30.0
+
+_availability = {}
+_availabilityLock = threading.Lock()
+
+
+def shardFolder(fileName):
+    return f"{os.path.splitext(fileName)[0]}_shards"
+
+
+def shardFile(fileName, root):
+    """SMDB file name of a root's shard; its data is in the matching `.mpk`."""
+    key = os.path.normcase(os.path.abspath(root))
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=6).hexdigest()
+    label = re.sub(r'[^\w.-]+', '_', os.path.basename(key.rstrip('\\/')) or 'root')
+    return os.path.join(shardFolder(fileName), f"{label}_{digest}.json")
+
+
+def _shardDataPath(shard):
+    return f"{os.path.splitext(shard)[0]}.mpk" if msgpack else shard
+
+
+def _mergedPath(fileName):
+    return f"{os.path.splitext(fileName)[0]}.mpk" if msgpack else fileName
+
+
+def rootOf(moviePath, roots):
+    """The root a movie folder is in, or None."""
+    path = os.path.normcase(os.path.abspath(moviePath))
+    best, bestLength = None, -1
+    for root in roots:
+        prefix = os.path.join(os.path.normcase(os.path.abspath(root)), '')
+        if path.startswith(prefix) and len(prefix) > bestLength:
+            best, bestLength = root, len(prefix)
+    return best
+
+
+def rootAvailable(root, timeout=ROOT_PROBE_TIMEOUT):
+    """Whether a root can be reached, waiting at most `timeout` seconds.
+
+    Offline network shares can block a stat for a long time, so the probe
+    runs on a daemon thread; a late answer is still recorded for next time.
+    """
+    now = time.monotonic()
+    with _availabilityLock:
+        cached = _availability.get(root)
+        if cached is not None and now - cached[1] < ROOT_PROBE_TTL:
+            return cached[0]
+
+    done = threading.Event()
+
+    def probe():
+        available = os.path.isdir(root)
+        with _availabilityLock:
+            _availability[root] = (available, time.monotonic())
+        done.set()
+
+    threading.Thread(target=probe, daemon=True).start()
+    if done.wait(timeout):
+        with _availabilityLock:
+            return _availability[root][0]
+    with _availabilityLock:
+        _availability[root] = (False, now)
+    return False
+
+
+def availableRoots(roots, timeout=ROOT_PROBE_TIMEOUT):
+    """The roots that can be reached, in order.  They are probed in
+    parallel, so offline roots cost at most `timeout` seconds together."""
+    roots = [root for root in roots if root]
+    if not roots:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(roots)) as pool:
+        available = list(pool.map(lambda root: rootAvailable(root, timeout), roots))
+    return [root for root, ok in zip(roots, available) if ok]
+
+
+def readShard(fileName, root):
+    """Titles of a root's shard, or None when it has none."""
+    shard = shardFile(fileName, root)
+    if not os.path.exists(_shardDataPath(shard)):
+        return None
+    data = readSmdbFile(shard, replayJournal=False)
+    if not data or data.get('shard', {}).get('root') != root:
+        return None
+    return data.get('titles') or {}
+
+
+def readShards(fileName, roots):
+    """Read the shards of several roots in parallel.
+
+    Returns:
+        Dict of root -> titles for the roots that have a shard.
+    """
+    if not roots:
+        return {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(roots))) as pool:
+        results = dict(zip(roots, pool.map(lambda root: readShard(fileName, root), roots)))
+    return {root: titles for root, titles in results.items() if titles is not None}
+
+
+def readShardManifests(fileName, roots):
+    """The rebuild manifests of the given roots' shards, merged."""
+    manifest = {}
+    for root in roots:
+        manifest.update(readManifest(shardFile(fileName, root)))
+    return manifest
+
+
+def writeShard(fileName, root, titles, manifest=None):
+    """Write a root's shard and, when given, its rebuild manifest."""
+    shard = shardFile(fileName, root)
+    os.makedirs(shardFolder(fileName), exist_ok=True)
+    data = {'shard': {'root': root}, 'titles': titles}
+    if msgpack:
+        writeSmdbMpk(_shardDataPath(shard), data)
+    else:
+        writeSmdbJson(shard, data)
+    if manifest is not None:
+        writeManifest(shard, manifest)
+
+
+def patchShards(fileName, roots, titleChanges):
+    """Apply title records that were added, replaced or removed (None) to the
+    shards of the roots they are under.
+
+    The shard manifests are left as they are: their entries for the changed
+    JSON files no longer match and are re-read by the next rebuild.
+
+    The changes are expected to be journaled, so the merged file and its
+    journal hold everything the patched shards do; shards that were not
+    newer than the merged file keep its mtime, or `shardsNewerThan` would
+    have the merged file rebuilt from them.
+    """
+    try:
+        mergedTime = os.path.getmtime(_mergedPath(fileName))
+    except OSError:
+        mergedTime = None
+    changesByRoot = {}
+    for moviePath, record in titleChanges.items():
+        root = rootOf(moviePath, roots)
+        if root is not None:
+            changesByRoot.setdefault(root, {})[moviePath] = record
+    for root, changes in changesByRoot.items():
+        titles = readShard(fileName, root)
+        if titles is None:
+            # The next rebuild of the root writes its shard
+            continue
+        for moviePath, record in changes.items():
+            if record is None:
+                titles.pop(moviePath, None)
+            else:
+                titles[moviePath] = record
+        dataPath = _shardDataPath(shardFile(fileName, root))
+        wasNewer = mergedTime is None or os.path.getmtime(dataPath) > mergedTime
+        writeShard(fileName, root, collections.OrderedDict(sorted(titles.items())))
+        if not wasNewer:
+            os.utime(dataPath, (mergedTime, mergedTime))
+
+
+def shardsNewerThan(fileName, roots):
+    """True when a shard was written after the merged SMDB file, e.g. when a
+    rebuild was interrupted before the merged view was written."""
+    try:
+        mergedTime = os.path.getmtime(_mergedPath(fileName))
+    except OSError:
+        mergedTime = None
+    found = False
+    for root in roots:
+        try:
+            shardTime = os.path.getmtime(_shardDataPath(shardFile(fileName, root)))
+        except OSError:
+            continue
+        found = True
+        if mergedTime is not None and shardTime > mergedTime:
+            return True
+    return found and mergedTime is None
@@ -0,0 +1,410 @@
+"""SQLite storage for the movie library.
+
+The `.mpk` stays the file SMDB writes and exports, but with the SQLite
+library enabled the same data is also kept in `<base>.sqlite`
+(e.g. `smdb_data.sqlite`) so the main window can query it instead of holding
+every record in memory:
+
+- `titles`: one row per movie folder with the title record as JSON
+- `movies`: one row per distinct (title, year)
+- `facets` / `facet_movies`: the index sections (directors, actors, genres,
+  companies, ...) as indexed link tables
+- `plots`: an FTS5 table over title, plot and synopsis, when the SQLite
+  build has FTS5
+
+The library is stamped with the size and mtime of the `.mpk` it was built
+from and ignored once that changes.  Journaled edits are applied to it as
+they are made and again on open, which is safe since they are idempotent.
+"""
+import os
+import re
+import json
+import shlex
+import threading
+import collections.abc
+
+import ujson
+
+from .smdb_records import INDEX_SECTIONS, indexEntryKeys, moviesForKeys
+from .string_pool import internList
+from .columnar_titles import TitleChanges
+
+try:
+    import sqlite3
+except ImportError:  # pragma: no cover - optional dependency
+    sqlite3 = None
+
+
+SQLITE_LIBRARY_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS movies (
+    id INTEGER PRIMARY KEY,
+    title TEXT,
+    year INTEGER,
+    UNIQUE (title, year));
+CREATE TABLE IF NOT EXISTS titles (
+    row INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    folder TEXT,
+    movie INTEGER,
+    record TEXT);
+CREATE INDEX IF NOT EXISTS titles_movie ON titles (movie);
+CREATE TABLE IF NOT EXISTS facets (
+    id INTEGER PRIMARY KEY,
+    section TEXT NOT NULL,
+    key,
+    UNIQUE (section, key));
+CREATE TABLE IF NOT EXISTS facet_movies (
+    facet INTEGER NOT NULL,
+    movie INTEGER NOT NULL,
+    PRIMARY KEY (facet, movie)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS facet_movies_movie ON facet_movies (movie);
+"""
+
+_TABLES = ('meta', 'movies', 'titles', 'facets', 'facet_movies', 'plots')
+
+
+def sqlitePath(fileName):
+    return f"{os.path.splitext(fileName)[0]}.sqlite"
+
+
+def _mpkStamp(fileName):
+    st = os.stat(f"{os.path.splitext(fileName)[0]}.mpk")
+    return {'mtime': st.st_mtime, 'size': st.st_size}
+
+
+def _connect(path):
+    db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+def _createPlots(db):
+    """Create the FTS5 table; returns False when SQLite was built without it."""
+    try:
+        db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS plots USING "
+                   "fts5(title, plot, synopsis, tokenize='unicode61 remove_diacritics 2')")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _hasTable(db, name):
+    return db.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+
+def _text(value):
+    if isinstance(value, list):
+        return ' '.join(str(v) for v in value if v)
+    return value if isinstance(value, str) else None
+
+
+def _year(value):
+    try:
+        return int(value) if value else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def _movieId(db, title, year):
+    db.execute("INSERT OR IGNORE INTO movies (title, year) VALUES (?, ?)", (title, year))
+    return db.execute("SELECT id FROM movies WHERE title = ? AND year = ?",
+                      (title, year)).fetchone()[0]
+
+
+def _facetId(db, section, key):
+    db.execute("INSERT OR IGNORE INTO facets (section, key) VALUES (?, ?)", (section, key))
+    return db.execute("SELECT id FROM facets WHERE section = ? AND key = ?",
+                      (section, key)).fetchone()[0]
+
+
+def writeSqliteLibrary(fileName, data):
+    """Rebuild the SQLite library of an SMDB file from its data.
+
+    The database is rewritten in place in one transaction, so a window that
+    has it open keeps working and sees the new rows once it is committed.
+
+    Args:
+        fileName: The SMDB file; its `.mpk` must already be written
+        data: SMDB data with a `titles` section and the index sections
+    """
+    if sqlite3 is None:
+        return
+    db = _connect(sqlitePath(fileName))
+    try:
+        with db:
+            for table in _TABLES:
+                db.execute(f"DROP TABLE IF EXISTS {table}")
+            # executescript() would commit the drops on its own
+            for statement in _SCHEMA.split(';'):
+                if statement.strip():
+                    db.execute(statement)
+            hasPlots = _createPlots(db)
+
+            movieIds = {}
+            titleRows = []
+            plotRows = []
+            for row, (moviePath, record) in enumerate(data['titles'].items()):
+                titleYear = (record.get('title'), _year(record.get('year')))
+                movie = movieIds.get(titleYear)
+                if movie is None:
+                    movie = movieIds[titleYear] = len(movieIds)
+                titleRows.append((row, moviePath, record.get('folder'), movie, ujson.dumps(record)))
+                if hasPlots:
+                    plotRows.append((row, titleYear[0], _text(record.get('plot')),
+                                     _text(record.get('synopsis'))))
+            db.executemany("INSERT INTO movies (id, title, year) VALUES (?, ?, ?)",
+                           ((movie, title, year) for (title, year), movie in movieIds.items()))
+            db.executemany("INSERT INTO titles VALUES (?, ?, ?, ?, ?)", titleRows)
+            if hasPlots:
+                db.executemany("INSERT INTO plots (rowid, title, plot, synopsis) VALUES (?, ?, ?, ?)",
+                               plotRows)
+
+            facetId = 0
+            for section, _ in INDEX_SECTIONS:
+                for key, entry in data.get(section, {}).items():
+                    links = set()
+                    for title, year in moviesForKeys(data, indexEntryKeys(entry)):
+                        movie = movieIds.get((title, _year(year)))
+                        if movie is None:
+                            movie = _movieId(db, title, _year(year))
+                        links.add(movie)
+                    db.execute("INSERT INTO facets VALUES (?, ?, ?)", (facetId, section, key))
+                    db.executemany("INSERT INTO facet_movies VALUES (?, ?)",
+                                   ((facetId, movie) for movie in links))
+                    facetId += 1
+
+            db.executemany("INSERT INTO meta VALUES (?, ?)",
+                           [('version', json.dumps(SQLITE_LIBRARY_VERSION)),
+                            ('source', json.dumps(_mpkStamp(fileName)))])
+    finally:
+        db.close()
+
+
+def openSqliteLibrary(fileName):
+    """Open the SQLite library of an SMDB file.
+
+    Returns:
+        A `SqliteLibrary`, or None when it is missing, unreadable or older
+        than the `.mpk`.
+    """
+    if sqlite3 is None or not os.path.exists(sqlitePath(fileName)):
+        return None
+    try:
+        db = _connect(sqlitePath(fileName))
+        meta = dict(db.execute("SELECT name, value FROM meta"))
+        if (json.loads(meta.get('version', 'null')) != SQLITE_LIBRARY_VERSION or
+                json.loads(meta.get('source', 'null')) != _mpkStamp(fileName)):
+            db.close()
+            return None
+        return SqliteLibrary(db)
+    except Exception:
+        return None
+
+
+def restampSqliteLibrary(fileName, previousStamp, records):
+    """Carry the library over to a rewritten `.mpk`.
+
+    Used when the journal is compacted: the new `.mpk` is the old one plus
+    `records`, so applying them is all the library needs.  A library that
+    did not match `previousStamp`, or records that add or remove titles,
+    which would renumber its rows, leave it stale and rebuilt on next load.
+    """
+    if sqlite3 is None or not os.path.exists(sqlitePath(fileName)):
+        return
+    if any(record.get('op') == 'title' for record in records):
+        return
+    db = _connect(sqlitePath(fileName))
+    try:
+        with db:
+            row = db.execute("SELECT value FROM meta WHERE name = 'source'").fetchone()
+            if row is None or json.loads(row[0]) != previousStamp:
+                return
+            _applyJournalRecords(db, records)
+            db.execute("UPDATE meta SET value = ? WHERE name = 'source'",
+                       (json.dumps(_mpkStamp(fileName)),))
+    finally:
+        db.close()
+
+
+def _applyJournalRecords(db, records):
+    hasPlots = _hasTable(db, 'plots')
+    for record in records:
+        op = record.get('op')
+        if op == 'set':
+            found = db.execute("SELECT row, record FROM titles WHERE path = ?",
+                               (record['path'],)).fetchone()
+            if found is None:
+                continue
+            row, text = found
+            fields = ujson.loads(text)
+            fields.update(record['fields'])
+            db.execute("UPDATE titles SET record = ? WHERE row = ?", (ujson.dumps(fields), row))
+            if hasPlots and ('plot' in record['fields'] or 'synopsis' in record['fields']):
+                db.execute("DELETE FROM plots WHERE rowid = ?", (row,))
+                db.execute("INSERT INTO plots (rowid, title, plot, synopsis) VALUES (?, ?, ?, ?)",
+                           (row, fields.get('title'), _text(fields.get('plot')),
+                            _text(fields.get('synopsis'))))
+        elif op in ('index add', 'index remove'):
+            movie = _movieId(db, record['title'], _year(record['year']))
+            if op == 'index add':
+                facet = _facetId(db, record['section'], record['key'])
+                db.execute("INSERT OR IGNORE INTO facet_movies VALUES (?, ?)", (facet, movie))
+            else:
+                db.execute("DELETE FROM facet_movies WHERE movie = ? AND facet IN "
+                           "(SELECT id FROM facets WHERE section = ? AND key = ?)",
+                           (movie, record['section'], record['key']))
+
+
+def ftsQuery(searchText):
+    """Translate plot search text into an FTS5 query.
+
+    Follows the plot search syntax: `|` separates alternatives, the words
+    and quoted phrases of an alternative must all match.
+
+    Returns:
+        The query, or None when the text uses wildcards or anything else
+        only the regex search handles.
+    """
+    groups = []
+    for group in searchText.split('|'):
+        group = group.strip()
+        if not group:
+            continue
+        if any(c in group for c in '*?['):
+            return None
+        try:
+            tokens = shlex.split(group)
+        except ValueError:
+            tokens = group.split()
+        terms = []
+        for token in tokens:
+            words = re.findall(r'\w+', token)
+            if not words:
+                return None
+            terms.append('"%s"' % ' '.join(words))
+        if terms:
+            groups.append('(%s)' % ' AND '.join(terms))
+    return ' OR '.join(groups) if groups else None
+
+
+class SqliteLibrary:
+    """Queries over the SQLite library of an SMDB file."""
+
+    def __init__(self, db):
+        self._db = db
+        self._lock = threading.Lock()
+        self.hasFullTextSearch = _hasTable(db, 'plots')
+        self.titles = SqliteTitles(self)
+
+    def query(self, sql, parameters=()):
+        with self._lock:
+            return self._db.execute(sql, parameters).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def applyJournalRecords(self, records):
+        """Apply journal records (see `smdb_journal`) to the library."""
+        with self._lock, self._db:
+            _applyJournalRecords(self._db, records)
+
+    def _selection(self, table, keys):
+        # Selections can be larger than the SQL variable limit
+        self._db.execute(f"CREATE TEMP TABLE IF NOT EXISTS {table} (key)")
+        self._db.execute(f"DELETE FROM {table}")
+        self._db.executemany(f"INSERT INTO {table} VALUES (?)", ((key,) for key in keys))
+        return (f"SELECT fm.movie FROM facet_movies fm JOIN facets f ON f.id = fm.facet "
+                f"WHERE f.section = ? AND f.key IN (SELECT key FROM {table})")
+
+    def facetCounts(self, section, within=None):
+        """[(key, number of movies)] for an index section.
+
+        Args:
+            within: Optional (section, keys) selection; only movies in at
+                least one of those entries are counted
+        """
+        with self._lock:
+            if within is None:
+                return self._db.execute(
+                    "SELECT f.key, COUNT(fm.movie) FROM facets f "
+                    "LEFT JOIN facet_movies fm ON fm.facet = f.id "
+                    "WHERE f.section = ? GROUP BY f.id", (section,)).fetchall()
+            selection = self._selection('selection_a', within[1])
+            return self._db.execute(
+                "SELECT f.key, COUNT(fm.movie) FROM facets f "
+                f"LEFT JOIN facet_movies fm ON fm.facet = f.id AND fm.movie IN ({selection}) "
+                "WHERE f.section = ? GROUP BY f.id", (within[0], section)).fetchall()
+
+    def filterMovies(self, primary, secondary=None):
+        """(title, year) of movies in any entry of `primary` and, if given,
+        any entry of `secondary`; both are (section, keys) selections."""
+        with self._lock:
+            sql = f"SELECT title, year FROM movies WHERE id IN ({self._selection('selection_a', primary[1])})"
+            parameters = [primary[0]]
+            if secondary is not None:
+                sql += f" AND id IN ({self._selection('selection_b', secondary[1])})"
+                parameters.append(secondary[0])
+            return self._db.execute(sql, parameters).fetchall()
+
+    def searchText(self, query):
+        """(title, year) of movies whose title, plot or synopsis match an
+        FTS5 query (see `ftsQuery`)."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT DISTINCT m.title, m.year FROM plots "
+                "JOIN titles t ON t.row = plots.rowid JOIN movies m ON m.id = t.movie "
+                "WHERE plots MATCH ?", (query,)).fetchall()
+
+
+class SqliteTitles(TitleChanges, collections.abc.Mapping):
+    """Read-only mapping of movie path -> title record backed by the library.
+
+    Offers the row interface of `ColumnarTitles`, so the movies model can
+    build its rows lazily from either.  Decoded records are cached, so
+    in-place edits persist for the session.
+    """
+
+    def __init__(self, library):
+        self._library = library
+        self._rows = library.query("SELECT COUNT(*) FROM titles")[0][0]
+        self._records = {}
+
+    def _storeKeys(self):
+        for (moviePath,) in self._library.query("SELECT path FROM titles ORDER BY row"):
+            yield moviePath
+
+    def keyAt(self, row):
+        return self._library.query("SELECT path FROM titles WHERE row = ?", (row,))[0][0]
+
+    def rowOf(self, key):
+        if not isinstance(key, str):
+            return None
+        found = self._library.query("SELECT row FROM titles WHERE path = ?", (key,))
+        return found[0][0] if found else None
+
+    def value(self, row, field):
+        """Read a single field of a row without caching the record."""
+        if row in self._records:
+            return self._records[row].get(field)
+        if field == 'folder':
+            return self._library.query("SELECT folder FROM titles WHERE row = ?", (row,))[0][0]
+        return self._decode(row).get(field)
+
+    def recordAt(self, row):
+        """Decode (and cache) the full title record of a row."""
+        record = self._records.get(row)
+        if record is None:
+            record = self._records[row] = self._decode(row)
+        return record
+
+    def _decode(self, row):
+        record = ujson.loads(self._library.query("SELECT record FROM titles WHERE row = ?", (row,))[0][0])
+        for name, value in record.items():
+            if isinstance(value, list):
+                record[name] = internList(value)
+        return record
@@ -0,0 +1,46 @@
+"""Shared pool of short strings for decoded SMDB data.
+
+Every title record repeats the same field names and the same director, actor,
+genre, country and company names, and the index sections repeat them again.
+Decoders route strings found in arrays (name lists, (title, year) pairs)
+through this pool so equal strings share one object for the whole session.
+Map keys need no pooling; msgpack already interns them.
+"""
+# Longer strings (plots, synopses) are almost never repeated
+MAX_POOLED_LENGTH = 128
+
+_pool = {}
+
+
+def internString(value):
+    if type(value) is not str or len(value) > MAX_POOLED_LENGTH:
+        return value
+    return _pool.setdefault(value, value)
+
+
+def internList(items):
+    """msgpack `list_hook`: pool the strings of a decoded array."""
+    pool = _pool.setdefault
+    return [pool(item, item) if type(item) is str and len(item) <= MAX_POOLED_LENGTH else item
+            for item in items]
+
+
+def poolSize():
+    return len(_pool)
+
+
+def residentMemoryMb():
+    """Current resident set size of the process in MB, or None if unknown."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        pass
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except Exception:
+        pass
+    return None
@@ -0,0 +1,91 @@
+"""Packed store of cover thumbnails in one file.
+
+With thousands of covers, a thumbnail file per cover is slow to stat and open,
+especially when the cache is on a network share.  `ThumbnailAtlas` keeps the
+encoded thumbnails concatenated in `thumbnails.atlas`, with one JSON line per
+thumbnail in `thumbnails.atlas.index`:
+
+    [key, offset, length]
+
+where the key is the cover path, its mtime and the thumbnail size.  The data
+file is memory-mapped for reads and only ever appended to; entries for
+covers that changed are simply no longer looked up.  An interrupted append
+leaves an index line past the end of the data, or a torn last line, and both
+are ignored on load.
+"""
+import os
+import mmap
+import threading
+
+import ujson
+
+ATLAS_FILE = 'thumbnails.atlas'
+
+
+def atlasKey(coverPath, mtime, size):
+    return f"{os.path.normcase(os.path.abspath(coverPath))}|{mtime}|{size}"
+
+
+class ThumbnailAtlas:
+    def __init__(self, folder):
+        self.dataFile = os.path.join(folder, ATLAS_FILE)
+        self.indexFile = self.dataFile + '.index'
+        self._lock = threading.Lock()
+        # Key -> (offset, length)
+        self._index = {}
+        self._map = None
+        os.makedirs(folder, exist_ok=True)
+        self._readIndex()
+
+    def _readIndex(self):
+        try:
+            dataSize = os.path.getsize(self.dataFile)
+        except OSError:
+            dataSize = 0
+        if not os.path.exists(self.indexFile):
+            return
+        with open(self.indexFile, 'rb') as f:
+            for line in f.read().splitlines():
+                try:
+                    key, offset, length = ujson.loads(line)
+                except ValueError:
+                    continue
+                if offset + length <= dataSize:
+                    self._index[key] = (offset, length)
+
+    def __len__(self):
+        return len(self._index)
+
+    def get(self, coverPath, mtime, size):
+        """Encoded thumbnail bytes, or None when the atlas does not have it."""
+        key = atlasKey(coverPath, mtime, size)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            offset, length = entry
+            if self._map is None or offset + length > len(self._map):
+                # The data file has grown since it was mapped
+                self._remap()
+            return self._map[offset:offset + length]
+
+    def put(self, coverPath, mtime, size, data):
+        """Append an encoded thumbnail."""
+        key = atlasKey(coverPath, mtime, size)
+        with self._lock:
+            with open(self.dataFile, 'ab') as f:
+                offset = f.tell()
+                f.write(data)
+            with open(self.indexFile, 'a', encoding='utf-8') as f:
+                f.write(ujson.dumps([key, offset, len(data)]) + '\n')
+            self._index[key] = (offset, len(data))
+
+    def _remap(self):
+        self.close()
+        with open(self.dataFile, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
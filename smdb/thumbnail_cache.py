@@ -0,0 +1,184 @@
+"""Cover thumbnails for the Cover column of the movie tables.
+
+Decoding and smooth-scaling a cover on the GUI thread every time a cell is
+painted makes scrolling stutter.  `ThumbnailCache` decodes covers on a
+`QThreadPool`, keeps the scaled pixmaps in an in-memory LRU and the scaled
+images in a disk cache keyed by cover path, mtime and size, so later runs
+skip the decode of the full-size cover as well.  The disk cache is a file
+per thumbnail, or a packed `ThumbnailAtlas` when one is set.
+
+`thumbnail()` returns at once: the cached pixmap, a placeholder while the
+cover is loading, or None when there is no cover.  `thumbnailReady` is
+emitted with the cover path once a thumbnail has loaded.
+"""
+import os
+import hashlib
+import collections
+
+from PyQt5 import QtCore, QtGui
+
+# Side of the square the thumbnails are scaled to fit in
+THUMBNAIL_SIZE = 200
+# In-memory LRU budget
+THUMBNAIL_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def thumbnailCacheFolder():
+    location = QtCore.QStandardPaths.writableLocation(
+        QtCore.QStandardPaths.GenericCacheLocation)
+    return os.path.join(location, 'SMDB', 'thumbnails')
+
+
+def _diskCacheFile(folder, coverPath, mtime, size):
+    key = f"{os.path.normcase(os.path.abspath(coverPath))}|{mtime}|{size}"
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(folder, digest[:2], f"{digest}.jpg")
+
+
+def _encodeImage(image):
+    data = QtCore.QByteArray()
+    buffer = QtCore.QBuffer(data)
+    buffer.open(QtCore.QIODevice.WriteOnly)
+    image.save(buffer, 'JPG', 90)
+    buffer.close()
+    return bytes(data)
+
+
+def loadThumbnailImage(coverPath, size, folder, atlas=None):
+    """Scaled image of a cover from the disk cache (or atlas), scaling the
+    cover and adding it to the cache on a miss.  Null when there is no cover.
+    Safe to call from worker threads."""
+    image = QtGui.QImage()
+    try:
+        mtime = os.stat(coverPath).st_mtime_ns
+    except OSError:
+        return image
+    cacheFile = None
+    if atlas is not None:
+        data = atlas.get(coverPath, mtime, size)
+        if data is not None:
+            image = QtGui.QImage.fromData(data)
+    else:
+        cacheFile = _diskCacheFile(folder, coverPath, mtime, size)
+        if os.path.exists(cacheFile):
+            image = QtGui.QImage(cacheFile)
+    if not image.isNull():
+        return image
+    cover = QtGui.QImage(coverPath)
+    if cover.isNull():
+        return image
+    image = cover.scaled(size, size,
+                         QtCore.Qt.KeepAspectRatio,
+                         QtCore.Qt.SmoothTransformation)
+    try:
+        if atlas is not None:
+            atlas.put(coverPath, mtime, size, _encodeImage(image))
+        else:
+            os.makedirs(os.path.dirname(cacheFile), exist_ok=True)
+            image.save(cacheFile, 'JPG', 90)
+    except OSError:
+        pass
+    return image
+
+
+class _ThumbnailSignals(QtCore.QObject):
+    # Cover path, scaled image (null when there is no cover)
+    loaded = QtCore.pyqtSignal(str, QtGui.QImage)
+
+
+class _ThumbnailLoader(QtCore.QRunnable):
+    """Loads one thumbnail on the thread pool."""
+
+    def __init__(self, coverPath, size, folder, atlas, signals):
+        super().__init__()
+        self.coverPath = coverPath
+        self.size = size
+        self.folder = folder
+        self.atlas = atlas
+        self.signals = signals
+
+    def run(self):
+        image = loadThumbnailImage(self.coverPath, self.size, self.folder, self.atlas)
+        self.signals.loaded.emit(self.coverPath, image)
+
+
+class ThumbnailCache(QtCore.QObject):
+    thumbnailReady = QtCore.pyqtSignal(str)
+
+    def __init__(self,
+                 size=THUMBNAIL_SIZE,
+                 maxBytes=THUMBNAIL_CACHE_BYTES,
+                 folder=None,
+                 parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.maxBytes = maxBytes
+        self.folder = folder or thumbnailCacheFolder()
+        self.atlas = None
+        # Cover path -> QPixmap, or None when there is no cover
+        self._pixmaps = collections.OrderedDict()
+        self._bytes = 0
+        self._pending = set()
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(max(2, min(4, QtCore.QThread.idealThreadCount())))
+        self._signals = _ThumbnailSignals()
+        # Queued to the GUI thread, where the QPixmap is created
+        self._signals.loaded.connect(self._loaded, QtCore.Qt.QueuedConnection)
+        self.placeholder = QtGui.QPixmap(size * 2 // 3, size)
+        self.placeholder.fill(QtGui.QColor(40, 40, 40))
+
+    def thumbnail(self, coverPath):
+        """The thumbnail of a cover, the placeholder while it loads, or None."""
+        if coverPath in self._pixmaps:
+            self._pixmaps.move_to_end(coverPath)
+            return self._pixmaps[coverPath]
+        if coverPath not in self._pending:
+            self._pending.add(coverPath)
+            self._pool.start(_ThumbnailLoader(coverPath, self.size, self.folder,
+                                              self.atlas, self._signals))
+        return self.placeholder
+
+    def loadImage(self, coverPath, size):
+        """Load a thumbnail of any size right away, through the disk cache."""
+        return loadThumbnailImage(coverPath, size, self.folder, self.atlas)
+
+    def setAtlas(self, atlas):
+        """Keep thumbnails on disk in a packed atlas, or as files when None."""
+        if self.atlas is not None and self.atlas is not atlas:
+            self._pool.waitForDone()
+            self.atlas.close()
+        self.atlas = atlas
+
+    def invalidate(self, coverPath):
+        """Forget a cover's thumbnail, e.g. after the cover was downloaded."""
+        pixmap = self._pixmaps.pop(coverPath, None)
+        if pixmap is not None:
+            self._bytes -= self._pixmapBytes(pixmap)
+
+    @staticmethod
+    def _pixmapBytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
+
+    def _loaded(self, coverPath, image):
+        self._pending.discard(coverPath)
+        self.invalidate(coverPath)
+        pixmap = None if image.isNull() else QtGui.QPixmap.fromImage(image)
+        self._pixmaps[coverPath] = pixmap
+        if pixmap is not None:
+            self._bytes += self._pixmapBytes(pixmap)
+        while self._bytes > self.maxBytes and len(self._pixmaps) > 1:
+            oldPixmap = self._pixmaps.popitem(last=False)[1]
+            if oldPixmap is not None:
+                self._bytes -= self._pixmapBytes(oldPixmap)
+        self.thumbnailReady.emit(coverPath)
+
+
+_sharedCache = None
+
+
+def sharedThumbnailCache():
+    """The thumbnail cache shared by all movie tables."""
+    global _sharedCache
+    if _sharedCache is None:
+        _sharedCache = ThumbnailCache()
+    return _sharedCache
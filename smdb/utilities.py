@@ -11,12 +11,17 @@ import platform
 import re
 
 import webbrowser
+import threading
+import time
+import collections.abc
 import imdb
 
 from PyQt5.QtWidgets import QMessageBox
 from PyQt5 import QtCore
 
 import re
+import hashlib
+import ujson
 from unidecode import unidecode
 
 # Optional binary serialization (MessagePack) for faster SMDB IO
@@ -25,8 +30,15 @@ try:
 except Exception:  # pragma: no cover - optional dependency
     msgpack = None
 
+from .smdb_journal import (JOURNAL_COMPACT_BYTES, journalPath, appendJournal,
+                           readJournal, applyJournalRecord, truncateJournal)
+from .smdb_journal import replayJournal as _replayJournal
+from .columnar_titles import columnarPath, writeColumnarTitles
+from .smdb_sqlite import sqlitePath, restampSqliteLibrary
+from .string_pool import internList
+
 # Track how SMDB was last read (for logging/reporting)
-_last_smdb_read_format = None  # 'msgpack' | 'json' | None
+_last_smdb_read_format = None  # 'msgpack' | 'json' | None, plus check details
 _last_smdb_read_path = None
 
 
@@ -37,6 +49,22 @@ def get_last_smdb_read_format():
 def get_last_smdb_read_path():
     return _last_smdb_read_path
 
+
+# Share repeated strings of decoded SMDB data through the string pool
+_intern_smdb_strings = True
+
+
+def set_intern_smdb_strings(enabled):
+    global _intern_smdb_strings
+    _intern_smdb_strings = enabled
+
+
+def _smdb_unpack_options():
+    options = dict(raw=False, strict_map_key=False)
+    if _intern_smdb_strings:
+        options['list_hook'] = internList
+    return options
+
 import re
 from unidecode import unidecode
 
@@ -139,37 +167,311 @@ def _read_smdb_json(path: str):
         return json.load(f)
 
 
+SMDB_TOC_VERSION = 1
+
+
+def _smdb_toc_path(mpkPath: str) -> str:
+    return f"{os.path.splitext(mpkPath)[0]}_toc.json"
+
+
+def _smdb_file_stamp(path: str):
+    st = os.stat(path)
+    return {'mtime': st.st_mtime, 'size': st.st_size}
+
+
+def writeSmdbMpk(path, data):
+    """Write SMDB data as a MessagePack map plus a section table of contents.
+
+    The .mpk is an ordinary map, readable with a single `msgpack.unpack`.  The
+    table of contents (`<base>_toc.json`) records the byte offset and length
+    of each top-level section so readers can decode sections independently.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    packer = msgpack.Packer(use_bin_type=True)
+    sections = {}
+    # Replace atomically so lazily loaded sections never see a partial file
+    with open(path + ".tmp", "wb") as f:
+        f.write(packer.pack_map_header(len(data)))
+        for key, value in data.items():
+            f.write(packer.pack(key))
+            packed = packer.pack(value)
+            sections[key] = [f.tell(), len(packed)]
+            f.write(packed)
+    os.replace(path + ".tmp", path)
+    toc = {'version': SMDB_TOC_VERSION,
+           'source': _smdb_file_stamp(path),
+           'sections': sections}
+    tocPath = _smdb_toc_path(path)
+    with open(tocPath + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(toc, f)
+    os.replace(tocPath + ".tmp", tocPath)
+
+
 def _write_smdb_mpk(path: str, data) -> None:
     if not msgpack:
         return
     try:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-        with open(path, "wb") as f:
-            msgpack.pack(data, f, use_bin_type=True)
+        writeSmdbMpk(path, data)
     except Exception as e:
         # Non-fatal; just log
         output(f"Warning: failed to write MessagePack SMDB '{path}': {e}")
 
 
-def readSmdbFile(fileName):
+def _smdb_source_path(mpkPath: str) -> str:
+    return f"{os.path.splitext(mpkPath)[0]}_source.json"
+
+
+def _fast_file_hash(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _write_smdb_source(mpkPath, mpkStamp, jsonPath, jsonHash=None):
+    """Record that the .mpk with `mpkStamp` holds the same data as the JSON."""
+    source = {'mpk': mpkStamp,
+              'json': dict(_smdb_file_stamp(jsonPath),
+                           hash=jsonHash or _fast_file_hash(jsonPath))}
+    path = _smdb_source_path(mpkPath)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(source, f)
+    os.replace(path + ".tmp", path)
+
+
+def isSmdbMpkCurrent(fileName):
+    """Return False when the JSON SMDB file holds newer data than its .mpk.
+
+    The `<base>_source.json` sidecar pairs an .mpk with the size, mtime and
+    hash of the JSON it matches, so the usual check is two stat calls. The
+    JSON is only hashed when its mtime changed but its size did not.
+    """
+    mpk_path = _smdb_mpk_path(fileName)
+    try:
+        jsonStamp = _smdb_file_stamp(fileName)
+        mpkStamp = _smdb_file_stamp(mpk_path)
+    except OSError:
+        return True
+    try:
+        with open(_smdb_source_path(mpk_path), "r", encoding="utf-8") as f:
+            source = json.load(f)
+    except Exception:
+        source = None
+    if not source or source.get('mpk') != mpkStamp:
+        # Nothing pairs this .mpk with a JSON copy; trust the newer file
+        return mpkStamp['mtime'] >= jsonStamp['mtime']
+    recorded = source['json']
+    if recorded['size'] != jsonStamp['size']:
+        return False
+    if recorded['mtime'] == jsonStamp['mtime']:
+        return True
+    # Touched but possibly unchanged
+    jsonHash = _fast_file_hash(fileName)
+    if jsonHash != recorded['hash']:
+        return False
+    _write_smdb_source(mpk_path, mpkStamp, fileName, jsonHash)
+    return True
+
+
+def _read_smdb_toc(mpkPath: str):
+    """Section offsets from the table of contents, or None if missing or stale."""
+    try:
+        with open(_smdb_toc_path(mpkPath), "r", encoding="utf-8") as f:
+            toc = json.load(f)
+        if toc.get('version') != SMDB_TOC_VERSION:
+            return None
+        if toc.get('source') != _smdb_file_stamp(mpkPath):
+            return None
+        return toc['sections']
+    except Exception:
+        return None
+
+
+def _scan_smdb_mpk_sections(mpkPath: str):
+    """Find section offsets by walking the .mpk map without decoding values.
+
+    Used for files written before the table of contents existed.
+    """
+    sections = {}
+    with open(mpkPath, "rb") as f:
+        unpacker = msgpack.Unpacker(f, raw=False, strict_map_key=False, max_buffer_size=0)
+        for _ in range(unpacker.read_map_header()):
+            key = unpacker.unpack()
+            offset = unpacker.tell()
+            unpacker.skip()
+            sections[key] = [offset, unpacker.tell() - offset]
+    return sections
+
+
+_UNLOADED = object()
+
+
+class LazySmdbData(collections.abc.MutableMapping):
+    """SMDB data whose sections are decoded from the .mpk on first access.
+
+    Behaves like the dict returned by a full read: every section name is
+    present, but a section's value is only unpacked the first time it is
+    looked up.  It is not a dict subclass, so `dict(data)`, json and msgpack
+    only ever see decoded sections.
+
+    Unless `replayJournal` is False, the journal records touching a section
+    are applied when it is loaded, so sections no journaled edit touches
+    are never decoded for it.
+
+    When the .mpk has been rewritten (e.g. by a journal compaction) by the
+    time a section is loaded, every section read from the old file is
+    dropped and read again from the new one, so sections of different files
+    are never mixed.  Sections set by the caller are kept.
+    """
+
+    def __init__(self, mpkPath, sections, eagerSections=(), replayJournal=True):
+        self._data = {}
+        self._mpkPath = mpkPath
+        self._sections = sections
+        self._stamp = _smdb_file_stamp(mpkPath)
+        self._replayJournal = replayJournal
+        # Sections read from the .mpk
+        self._fromFile = set()
+        for key in sections:
+            self._data[key] = _UNLOADED
+        for key in eagerSections:
+            if key in sections:
+                self[key]
+
+    def _checkStamp(self):
+        stamp = _smdb_file_stamp(self._mpkPath)
+        if stamp == self._stamp:
+            return
+        self._sections = _read_smdb_toc(self._mpkPath) or \
+            _scan_smdb_mpk_sections(self._mpkPath)
+        self._stamp = stamp
+        for key in self._fromFile:
+            if key in self._sections:
+                self._data[key] = _UNLOADED
+            else:
+                self._data.pop(key, None)
+        for key in self._sections:
+            self._data.setdefault(key, _UNLOADED)
+        self._fromFile.clear()
+
+    def _loadSection(self, key):
+        # The .mpk may have been rewritten since it was opened
+        self._checkStamp()
+        if self._data.get(key, _UNLOADED) is not _UNLOADED:
+            return self._data[key]
+        if key not in self._sections:
+            self._data.pop(key, None)
+            raise KeyError(key)
+        offset, length = self._sections[key]
+        with open(self._mpkPath, "rb") as f:
+            f.seek(offset)
+            value = msgpack.unpackb(f.read(length), **_smdb_unpack_options())
+        self._data[key] = value
+        self._fromFile.add(key)
+        if self._replayJournal:
+            # Edits journaled since the file was written
+            _replayJournal(self, self._mpkPath, sections=(key,))
+        return value
+
+    def isLoaded(self, key):
+        return self._data.get(key, _UNLOADED) is not _UNLOADED
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        if value is _UNLOADED:
+            value = self._loadSection(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._fromFile.discard(key)
+
+    def __delitem__(self, key):
+        del self._data[key]
+        self._fromFile.discard(key)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def copy(self):
+        return dict(self.items())
+
+
+def _read_smdb_mpk_sections(f, skipSections):
+    """Unpack the top-level SMDB map, skipping the named sections undecoded."""
+    # max_buffer_size=0 lifts the 100MB default so large sections can be skipped
+    unpacker = msgpack.Unpacker(f, max_buffer_size=0, **_smdb_unpack_options())
+    data = {}
+    for _ in range(unpacker.read_map_header()):
+        key = unpacker.unpack()
+        if key in skipSections:
+            unpacker.skip()
+        else:
+            data[key] = unpacker.unpack()
+    return data
+
+
+def readSmdbFile(fileName, skipSections=(), lazySections=False, replayJournal=True):
     """Read SMDB data with fast binary fallback.
 
     Prefers MessagePack (".mpk") if present and msgpack is available; otherwise
     reads the JSON file and, when possible, writes a one-time ".mpk" next to it
     to speed up future loads.
+
+    Sections named in `skipSections` are skipped without being decoded when
+    reading MessagePack, for callers that load them from elsewhere.
+
+    With `lazySections`, a MessagePack read returns a `LazySmdbData` that
+    decodes only `titles` up front and every other section on first access.
+
+    Edits recorded in the file's journal (see `smdb_journal`) are applied on
+    top of the data read unless `replayJournal` is False; for a
+    `LazySmdbData`, to each section as it is decoded.
     """
+    data = _read_smdb_file(fileName, skipSections, lazySections, replayJournal)
+    if data is not None and replayJournal and not isinstance(data, LazySmdbData):
+        _replayJournal(data, fileName)
+    return data
+
+
+def _read_smdb_file(fileName, skipSections, lazySections, replayJournal):
     global _last_smdb_read_format, _last_smdb_read_path
     _last_smdb_read_format, _last_smdb_read_path = None, None
 
     mpk_path = _smdb_mpk_path(fileName)
-    # 1) Prefer MessagePack if available
+    checked = None
+    current = False
+    # 1) Prefer MessagePack if available and not older than the JSON
     if msgpack and os.path.exists(mpk_path):
+        t0 = time.perf_counter()
+        current = isSmdbMpkCurrent(fileName)
+        checked = f"JSON check {(time.perf_counter() - t0) * 1000:.2f} ms"
+        if not current:
+            output(f"{fileName} is newer than {mpk_path}, regenerating it")
+    if current:
         try:
+            if lazySections:
+                sections = _read_smdb_toc(mpk_path) or _scan_smdb_mpk_sections(mpk_path)
+                for key in skipSections:
+                    sections.pop(key, None)
+                data = LazySmdbData(mpk_path, sections, eagerSections=('titles',),
+                                    replayJournal=replayJournal)
+                _last_smdb_read_format, _last_smdb_read_path = f"msgpack, {checked}", mpk_path
+                return data
             with open(mpk_path, "rb") as f:
-                # Allow non-string keys (e.g., years as ints) to match in-memory data
-                data = msgpack.unpack(f, raw=False, strict_map_key=False)
-                _last_smdb_read_format, _last_smdb_read_path = 'msgpack', mpk_path
+                if skipSections:
+                    data = _read_smdb_mpk_sections(f, skipSections)
+                else:
+                    # Allow non-string keys (e.g., years as ints) to match in-memory data
+                    data = msgpack.unpack(f, **_smdb_unpack_options())
+                _last_smdb_read_format, _last_smdb_read_path = f"msgpack, {checked}", mpk_path
                 return data
         except Exception as e:
             output(f"Warning: failed to read MessagePack SMDB '{mpk_path}': {e}")
@@ -180,6 +482,8 @@ def readSmdbFile(fileName):
         try:
             data = _read_smdb_json(fileName)
             _last_smdb_read_format, _last_smdb_read_path = 'json', fileName
+            if checked:
+                _last_smdb_read_format = f"json newer than msgpack, {checked}"
         except Exception as e:
             output(f"Could not open or parse file: {fileName}: {e}")
             return None
@@ -187,12 +491,171 @@ def readSmdbFile(fileName):
         # 3) If we have msgpack, migrate/write .mpk for next time
         if msgpack:
             _write_smdb_mpk(mpk_path, data)
+            try:
+                _write_smdb_source(mpk_path, _smdb_file_stamp(mpk_path), fileName)
+                if os.path.exists(columnarPath(fileName)):
+                    writeColumnarTitles(columnarPath(fileName), data['titles'], mpk_path)
+            except Exception as e:
+                output(f"Warning: failed to update caches for '{mpk_path}': {e}")
         return data
 
     # Nothing found
     return None
 
 
+def iterSmdbTitles(fileName):
+    """Yield (movie path, title record) pairs from the .mpk one at a time.
+
+    Lets the movie list fill in while the titles section is still being
+    decoded; callers read the other sections with skipSections=('titles',).
+    """
+    mpk_path = _smdb_mpk_path(fileName)
+    sections = _read_smdb_toc(mpk_path) or _scan_smdb_mpk_sections(mpk_path)
+    if 'titles' not in sections:
+        return
+    with open(mpk_path, "rb") as f:
+        f.seek(sections['titles'][0])
+        unpacker = msgpack.Unpacker(f, max_buffer_size=0, **_smdb_unpack_options())
+        for _ in range(unpacker.read_map_header()):
+            moviePath = unpacker.unpack()
+            yield moviePath, unpacker.unpack()
+
+
+# Held while an SMDB file is rewritten, so a journal compaction and a full
+# write never interleave
+smdbWriteLock = threading.RLock()
+_compacting = set()
+
+
+def compactSmdbJournal(fileName):
+    """Fold the journal of an SMDB file into the file itself.
+
+    Records appended while the compaction runs are kept for the next one.
+    """
+    path = journalPath(fileName)
+    with smdbWriteLock:
+        if not os.path.exists(path):
+            return
+        size = os.path.getsize(path)
+        data = readSmdbFile(fileName, replayJournal=False)
+        if data is None:
+            return
+        records = readJournal(fileName, limit=size)
+        for record in records:
+            applyJournalRecord(data, record)
+        mpk_path = _smdb_mpk_path(fileName)
+        if msgpack:
+            previousStamp = _smdb_file_stamp(mpk_path)
+            writeSmdbMpk(mpk_path, data)
+            # Keep the memory-mapped titles and the SQLite library in step
+            # with the new .mpk
+            if os.path.exists(columnarPath(fileName)):
+                writeColumnarTitles(columnarPath(fileName), data['titles'], mpk_path)
+            if os.path.exists(sqlitePath(fileName)):
+                restampSqliteLibrary(fileName, previousStamp, records)
+        else:
+            with open(fileName, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
+        truncateJournal(fileName, upTo=size)
+
+
+def appendSmdbJournal(fileName, records):
+    """Journal edits to an SMDB file, compacting in the background when the
+    journal gets large."""
+    size = appendJournal(fileName, records)
+    if size < JOURNAL_COMPACT_BYTES or fileName in _compacting:
+        return
+    _compacting.add(fileName)
+
+    def compact():
+        try:
+            compactSmdbJournal(fileName)
+        except Exception as e:
+            output(f"Warning: failed to compact SMDB journal for '{fileName}': {e}")
+        finally:
+            _compacting.discard(fileName)
+
+    threading.Thread(target=compact, daemon=True).start()
+
+
+_json_export_lock = threading.Lock()
+_json_export_run_lock = threading.Lock()
+_json_exports = {}  # fileName -> {'last': monotonic time, 'timer': pending Timer}
+
+
+def writeSmdbJson(fileName, data):
+    """Write SMDB data as indented JSON via a temp file and atomic rename."""
+    tmpPath = fileName + ".tmp"
+    with open(tmpPath, "w", encoding="utf-8") as f:
+        ujson.dump(data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmpPath, fileName)
+
+
+def exportSmdbJson(fileName):
+    """Write the human-readable JSON copy of an SMDB file from its .mpk.
+
+    The JSON is streamed to a temp file and renamed over the old copy, so an
+    interrupted export leaves the previous JSON intact.
+    """
+    mpk_path = _smdb_mpk_path(fileName)
+    with open(mpk_path, "rb") as f:
+        st = os.fstat(f.fileno())
+        mpkStamp = {'mtime': st.st_mtime, 'size': st.st_size}
+        data = msgpack.unpack(f, raw=False, strict_map_key=False)
+    writeSmdbJson(fileName, data)
+    # Pair the two files unless the .mpk was replaced during the export
+    if _smdb_file_stamp(mpk_path) == mpkStamp:
+        _write_smdb_source(mpk_path, mpkStamp, fileName)
+
+
+def _run_json_export(fileName):
+    with _json_export_lock:
+        state = _json_exports[fileName]
+        state['timer'] = None
+        state['last'] = time.monotonic()
+    try:
+        with _json_export_run_lock:
+            exportSmdbJson(fileName)
+    except Exception as e:
+        output(f"Warning: failed to export SMDB JSON '{fileName}': {e}")
+
+
+def scheduleSmdbJsonExport(fileName, minInterval=0):
+    """Export the JSON copy of an SMDB file on a background thread.
+
+    Exports run at most once every `minInterval` seconds per file; requests
+    made in between are folded into a single export when the interval ends.
+    """
+    with _json_export_lock:
+        state = _json_exports.setdefault(fileName, {'last': None, 'timer': None})
+        if state['timer'] is not None:
+            return
+        delay = 0.0
+        if state['last'] is not None:
+            delay = max(0.0, state['last'] + minInterval - time.monotonic())
+        timer = threading.Timer(delay, _run_json_export, args=(fileName,))
+        timer.daemon = True
+        state['timer'] = timer
+        timer.start()
+
+
+def flushSmdbJsonExports():
+    """Finish pending and running exports, e.g. before exiting."""
+    with _json_export_lock:
+        pending = []
+        for fileName, state in _json_exports.items():
+            if state['timer'] is not None:
+                state['timer'].cancel()
+                pending.append(fileName)
+    for fileName in pending:
+        _run_json_export(fileName)
+    # Wait for an export that was already running
+    with _json_export_run_lock:
+        pass
+
+
 def getMovieKey(movie, key):
     if not movie:
         return None
@@ -0,0 +1,53 @@
+import json
+
+from smdb.smdb_records import parseTitleRecords, PARSE_CHUNK_SIZE
+
+
+def makeJobs(folder, count):
+    jobs = []
+    for i in range(count):
+        folderName = f"Movie{i}({1950 + i % 50})"
+        movieDir = folder / folderName
+        movieDir.mkdir()
+        jsonFile = movieDir / f"{folderName}.json"
+        if i % 97 == 5:
+            # Unreadable JSON files are reported, not raised
+            jsonFile.write_bytes(b'\xff\xfe not json')
+        else:
+            jsonFile.write_text(json.dumps({
+                'title': f"Movie {i}",
+                'year': 1950 + i % 50,
+                'rating': str(5 + i % 5),
+                'mpaa rating': 'R' if i % 3 else None,
+                'runtime': str(80 + i % 60),
+                'box office': '$1,000',
+                'directors': [f"director{i % 13}"],
+                'cast': [f"actor{i % 7}", f"actor{i % 11}"],
+                'genres': ['Drama' if i % 2 else 'Comedy'],
+                'plot': [f"A story about number {i}::author"],
+            }), encoding='utf-8')
+        jobs.append((str(jsonFile), str(movieDir), folderName))
+    return jobs
+
+
+def test_pooled_matches_serial(tmp_path):
+    jobs = makeJobs(tmp_path, 5 * PARSE_CHUNK_SIZE + 7)
+
+    warnings = []
+    serial = parseTitleRecords(jobs, numWorkers=1)
+    pooled = parseTitleRecords(jobs, numWorkers=2, minProcessJobs=0, output=warnings.append)
+
+    # The pool ran rather than falling back to parsing serially
+    assert warnings == []
+    assert len(serial) == len(jobs)
+    assert pooled == serial
+    ok, record = serial[jobs[0][0]]
+    assert ok and record['title'] == 'Movie 0'
+    assert serial[jobs[5][0]] == (False, None)
+
+
+def test_cancelled(tmp_path):
+    jobs = makeJobs(tmp_path, 2 * PARSE_CHUNK_SIZE)
+
+    assert parseTitleRecords(jobs, lambda done, total: False, numWorkers=1) is None
+    assert parseTitleRecords(jobs, lambda done, total: False, numWorkers=2, minProcessJobs=0) is None
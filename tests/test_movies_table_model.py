@@ -0,0 +1,28 @@
+from smdb.MoviesTableModel import MoviesTableModel, Columns
+
+
+def test_typical_row_is_stored_in_typed_columns():
+    model = MoviesTableModel({}, [])
+    record = {
+        'folder': 'Movie(1999)',
+        'id': '0123456',
+        'title': 'Movie',
+        'year': 1999,
+        'rating': 7.5,
+        'mpaa rating': 'R',
+        'runtime': '120',
+        'box office': '$1,000',
+        'directors': ['A Director'],
+        'genres': ['Drama'],
+        'rank': 3,
+        'width': 1920,
+        'height': 1080,
+        'channels': 6,
+        'size': '04321 Mb',
+        'date': '2020-01-01',
+    }
+    model.appendMovieRows([model.createMovieData(record, '/movies/Movie(1999)', 'Movie(1999)')])
+
+    assert all(not overflow for overflow in model._data._overflow if overflow is not None)
+    assert model.getSize(0) == '04321 Mb'
+    assert model.getColumnValues(Columns.Runtime.value) == ['120']
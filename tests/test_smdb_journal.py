@@ -0,0 +1,29 @@
+import os
+
+from smdb.smdb_journal import appendJournal, readJournal, journalPath, setFieldsRecord
+
+
+def test_append_after_torn_line(tmp_path):
+    fileName = str(tmp_path / 'smdb_data.json')
+    first = setFieldsRecord('/movies/A', {'date watched': '2020-01-01'})
+    second = setFieldsRecord('/movies/B', {'date watched': '2021-01-01'})
+    appendJournal(fileName, [first])
+    # An append interrupted halfway through its line
+    with open(journalPath(fileName), 'ab') as f:
+        f.write(b'{"op": "set", "path": "/mov')
+
+    size = appendJournal(fileName, [second])
+
+    assert readJournal(fileName) == [first, second]
+    assert size == os.path.getsize(journalPath(fileName))
+
+
+def test_append_after_torn_only_line(tmp_path):
+    fileName = str(tmp_path / 'smdb_data.json')
+    with open(journalPath(fileName), 'wb') as f:
+        f.write(b'{"op": "set"')
+    record = setFieldsRecord('/movies/A', {'user tags': ['x']})
+
+    appendJournal(fileName, [record])
+
+    assert readJournal(fileName) == [record]